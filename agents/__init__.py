@@ -1 +1,14 @@
-from .agent import Agents, agent
\ No newline at end of file
+# Exports resolve lazily (PEP 562) so `import agents` stays cheap: nothing is
+# imported from google.adk and no MCP connection is opened until an agent is
+# requested. `agents.agent` is the submodule; `agents.agent.root_agent` is
+# what `adk eval` / `adk web` load.
+from importlib import import_module
+
+__all__ = ["Agents", "get_root_agent", "root_agent"]
+
+
+def __getattr__(name):
+    if name in __all__ or name == "agent":
+        module = import_module(".agent", __name__)
+        return module if name == "agent" else getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,35 +1,35 @@
 import os
-import asyncio
 import threading
-from concurrent.futures import ThreadPoolExecutor
 
-from dotenv import load_dotenv
-from google.genai import types
-from google.adk.agents.llm_agent import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
+# Importing this module builds nothing: google.adk, the MCP toolset, .env and
+# the prompt config are only touched when an agent is first requested.
+# `adk eval` / `adk web` read `agents.agent.root_agent`, which the module-level
+# __getattr__ below builds (once) on first access.
 
-from .tools import PromptLoader, MCPTools
+DEFAULT_MCP_SSE = 'http://localhost:8000/sse'
 
-# Modifying here to try with agent tools.
-from google.adk.tools.agent_tool import AgentTool
-from .sub_agents.unit_conversion import unit_conversion_agent
+# Memoized (root_agent, toolset), shared by every Agents instance
+_rag_agent = None
+_rag_agent_lock = threading.Lock()
+_env_loaded = False
 
 
-# Load environment variables from .env file in the parent directory
-load_dotenv('./docker/.env', override=True)
-
-# Global variable to store agent and toolset
-global_root_agent = None
-global_toolset = None
-
-# adding this to work with evals: 
-agent = None
+def _load_env():
+    """Load environment variables from the docker .env file (once)."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv('./docker/.env', override=True)
+        _env_loaded = True
 
 
 class Agents():
     """Manages agents"""
 
     def __init__(self):
+        from .tools import PromptLoader, MCPTools
+
+        _load_env()
         self.prompt_loaders = PromptLoader()
         self.prompt_configs = self.prompt_loaders._load_base_config()
         self.mcp_tools = MCPTools()
@@ -42,14 +42,19 @@ class Agents():
     def get_tool(self):
         """Synchronous version of get_tool_async."""
         return self.mcp_tools.get_tools(os.getenv('QRANT_MCP_SSE'))
-    
+
     # --- RAG Agent Definition ---
-    async def get_rag_agent_async(self):
-        """Creates an ADK Agent equipped with tools from the MCP Server asynchronously."""
-        toolset = await self.mcp_tools.get_tools_async(os.getenv('QRANT_MCP_SSE', 'http://localhost:8000/sse'))
-        root_agent = LlmAgent(
+    def _build_rag_agent(self, toolset):
+        """Creates the root LlmAgent around `toolset` and the unit conversion sub-agent."""
+        from google.genai import types
+        from google.adk.agents.llm_agent import LlmAgent
+        # from google.adk.models.lite_llm import LiteLlm
+        from google.adk.tools.agent_tool import AgentTool
+        from .sub_agents.unit_conversion import unit_conversion_agent
+
+        return LlmAgent(
             # model=LiteLlm(
-            #     model='gpt-4o-mini', 
+            #     model='gpt-4o-mini',
             # ),
             model='gemini-2.0-flash',
             name='ask_rag_agent',
@@ -62,52 +67,44 @@ class Agents():
                 temperature=0.2,
             )
         )
-        return root_agent, toolset
-    
+
+    async def get_rag_agent_async(self):
+        """Returns the shared (root_agent, toolset), creating them asynchronously on first use."""
+        global _rag_agent
+        if _rag_agent is not None:
+            return _rag_agent
+
+        toolset = await self.mcp_tools.get_tools_async(os.getenv('QRANT_MCP_SSE', DEFAULT_MCP_SSE))
+        root_agent = self._build_rag_agent(toolset)
+        with _rag_agent_lock:
+            # Another caller may have finished first; keep theirs so there is only one toolset.
+            if _rag_agent is None:
+                _rag_agent = (root_agent, toolset)
+        return _rag_agent
+
     def get_rag_agent(self):
-        """Creates an ADK Agent equipped with tools from the MCP Server synchronously."""
-        global global_root_agent, global_toolset
-        
-        # If agent already initialized, return it
-        if global_root_agent is not None and global_toolset is not None:
-            return global_root_agent, global_toolset
-            
-        # Use the persistent thread approach to get tools
-        toolset = self.mcp_tools.get_tools(os.getenv('QRANT_MCP_SSE', 'http://localhost:8000/sse'))
-        
-        # Create the agent
-        root_agent = LlmAgent(
-            # model=LiteLlm(
-            #     model='gpt-4o-mini', 
-            # ),
-            model='gemini-2.0-flash',
-            name='ask_rag_agent',
-            instruction=self.prompt_configs['ask_rag_agent']['instruction_prompt'],
-            tools=[
-                toolset,
-                AgentTool(agent=unit_conversion_agent)
-            ],
-            generate_content_config=types.GenerateContentConfig(
-                temperature=0.2,
-            )
-        )
-        
-        # Store in global variables for reuse
-        global_root_agent = root_agent
-        global_toolset = toolset
-        
-        return root_agent, toolset
-
-# Initialize the agent using the persistent thread approach
-try:
-    # Try to get the agent synchronously
-    agents = Agents()
-    root_agent, toolset = agents.get_rag_agent()
-    # Expose the agent instance at module level for `adk eval`
-    agent = root_agent
-except Exception as e:
-    # Log the error but don't crash
-    print(f"Error initializing agent: {e}")
-    # Set empty values to prevent further errors
-    root_agent = None
-    toolset = None
\ No newline at end of file
+        """Returns the shared (root_agent, toolset), creating them synchronously on first use."""
+        global _rag_agent
+        with _rag_agent_lock:
+            if _rag_agent is None:
+                # Pooled toolset: connects on the agent's first tool listing, not here
+                toolset = self.mcp_tools.get_tools(os.getenv('QRANT_MCP_SSE', DEFAULT_MCP_SSE))
+                _rag_agent = (self._build_rag_agent(toolset), toolset)
+        return _rag_agent
+
+
+def get_root_agent():
+    """The shared root agent, built on first call (what `adk eval` gets as root_agent)."""
+    if _rag_agent is not None:
+        return _rag_agent[0]
+    return Agents().get_rag_agent()[0]
+
+
+def __getattr__(name):
+    # PEP 562: `root_agent` (and the older `agent` / `toolset` names) resolve lazily.
+    if name in ('root_agent', 'agent'):
+        return get_root_agent()
+    if name == 'toolset':
+        get_root_agent()
+        return _rag_agent[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
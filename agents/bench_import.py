@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark `import agents` in fresh interpreters and check that it stays lazy.
+
+Each run starts a new Python process that blocks outbound socket
+connections and new threads, imports the package and reports its import time,
+whether any connection or thread was attempted, and which heavy modules got
+loaded. The script exits non-zero if an import touched the network, started a
+thread, pulled in a heavy module or exceeded --budget-ms.
+
+Usage:
+    python agents/bench_import.py [--runs 10] [--budget-ms 50]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("google.adk", "google.genai", "mcp", "litellm", "dotenv", "yaml", "pydantic")
+
+PROBE = f"""
+import json, socket, sys, threading, time
+attempts = []
+def _deny(kind):
+    def guard(*args, **kwargs):
+        attempts.append(kind)
+        raise RuntimeError(kind + " during import")
+    return guard
+socket.socket.connect = _deny("connect")
+socket.socket.connect_ex = _deny("connect")
+socket.create_connection = _deny("connect")
+socket.getaddrinfo = _deny("dns")
+threading.Thread.start = _deny("thread")
+start = time.perf_counter()
+import agents
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in sys.modules if any(m == h or m.startswith(h + ".") for h in {HEAVY_MODULES!r}))
+print(json.dumps({{"ms": elapsed * 1000, "attempts": attempts, "heavy": heavy}}))
+"""
+
+
+def run_once() -> dict:
+    proc = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise SystemExit(f"FAIL: `import agents` raised:\n{proc.stderr.strip()}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark `import agents` and check it does no work")
+    p.add_argument("--runs", type=int, default=10, help="Fresh interpreters to time (default: 10)")
+    p.add_argument("--budget-ms", type=float, default=50.0, help="Fail if the median import exceeds this (default: 50)")
+    args = p.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    times = sorted(r["ms"] for r in results)
+    attempts = sorted({a for r in results for a in r["attempts"]})
+    heavy = sorted({m for r in results for m in r["heavy"]})
+    median = statistics.median(times)
+
+    print(f"import agents: median {median:.2f} ms, min {times[0]:.2f} ms, max {times[-1]:.2f} ms over {args.runs} runs")
+    print(f"  network/thread attempts: {', '.join(attempts) or 'none'}")
+    print(f"  heavy modules loaded:    {', '.join(heavy) or 'none'}")
+
+    problems = []
+    if attempts:
+        problems.append(f"import attempted: {', '.join(attempts)}")
+    if heavy:
+        problems.append(f"import loaded heavy modules: {', '.join(heavy)}")
+    if median > args.budget_ms:
+        problems.append(f"median {median:.2f} ms exceeds budget {args.budget_ms:.0f} ms")
+    if problems:
+        raise SystemExit("FAIL: " + "; ".join(problems))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,17 @@
-from .mcp_tools import MCPTools
-from .prompts import PromptLoader
+# Resolved lazily (PEP 562) so importing agents.tools, or the dependency-free
+# agents.tools.mcp_pool, does not pull in google.adk.
+from importlib import import_module
+
+_EXPORTS = {
+    "MCPTools": ".mcp_tools",
+    "PooledMCPToolset": ".mcp_tools",
+    "MCPConnectionPool": ".mcp_pool",
+    "PromptLoader": ".prompts",
+}
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+_TRANSPORT_ERRORS: Optional[tuple] = None
+
+
+def _transport_errors() -> tuple:
+    # Resolved on first use so importing this module stays free of anyio / mcp / httpx.
+    global _TRANSPORT_ERRORS
+    if _TRANSPORT_ERRORS is None:
+        errors: List[type] = [ConnectionError, TimeoutError, asyncio.TimeoutError]
+        try:
+            import anyio
+            errors += [anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream]
+        except ImportError:
+            pass
+        try:
+            import httpx
+            errors.append(httpx.TransportError)
+        except ImportError:
+            pass
+        _TRANSPORT_ERRORS = tuple(errors)
+    return _TRANSPORT_ERRORS
+
+
+def is_connection_error(exc: BaseException) -> bool:
+    """True if `exc` means the session's transport is gone (retry elsewhere), not a tool error."""
+    if isinstance(exc, _transport_errors()):
+        return True
+    try:
+        from mcp.shared.exceptions import McpError
+        from mcp.types import CONNECTION_CLOSED
+    except ImportError:
+        return False
+    # The MCP client reports a dropped stream and an unanswered request as McpError codes.
+    return isinstance(exc, McpError) and exc.error.code in (CONNECTION_CLOSED, 408)
+
+
+@dataclass
+class _Session:
+    """One pooled toolset (one MCP session) and its state."""
+    id: int
+    standby: bool
+    toolset: Any = None
+    tools: Dict[str, Any] = field(default_factory=dict)
+    healthy: bool = False
+    in_flight: int = 0
+    calls: int = 0
+    failures: int = 0
+    owner_task: Optional[asyncio.Task] = None
+    stop: Optional[asyncio.Event] = None
+    reconnect_task: Optional[asyncio.Task] = None
+
+
+class MCPConnectionPool:
+    """
+    A small pool of MCP toolset sessions with health checks, reconnect with
+    backoff and warm standby.
+
+    `factory()` returns a new, unconnected toolset (an ADK MCPToolset, or
+    anything with async get_tools() / close()); a session counts as connected
+    once get_tools() has listed its tools. `size` sessions serve calls and
+    `standby` more are kept connected to take over when one fails. Each call
+    goes to the healthy active session with the fewest calls in flight (up to
+    `max_in_flight` each; MCP multiplexes requests over a session), so one
+    slow call does not hold up the others.
+
+    Calls failing with a connection error (see is_connection_error()), calls
+    taking longer than `call_timeout` (a half-open connection otherwise blocks
+    until the transport's read timeout) and failed periodic probes
+    (get_tools() on idle sessions every `health_interval` seconds) mark a
+    session unhealthy: a healthy standby
+    takes its place and it reconnects in the background with exponential
+    backoff (`backoff_base` doubling up to `backoff_max`, with jitter), then
+    rejoins as standby. metrics() reports connect latency, in-flight calls and
+    failure counts.
+
+    Each session is opened and closed by its own owner task; toolsets must
+    not silently re-open a dropped session in the caller's task (see
+    PooledMCPToolset, which makes ADK's session manager raise
+    ConnectionError instead).
+
+    The pool belongs to the event loop that started it; start() from another
+    loop (e.g. a second asyncio.run()) drops the old sessions and reconnects.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int = 2,
+        standby: int = 1,
+        max_in_flight: int = 8,
+        connect_timeout: float = 10.0,
+        health_interval: float = 15.0,
+        health_timeout: float = 5.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        acquire_timeout: float = 30.0,
+        call_timeout: Optional[float] = 30.0,
+        retries: int = 2,
+    ):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.factory = factory
+        self.size = size
+        self.standby = standby
+        self.max_in_flight = max_in_flight
+        self.connect_timeout = connect_timeout
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.acquire_timeout = acquire_timeout
+        self.call_timeout = call_timeout
+        self.retries = retries
+
+        self._sessions: List[_Session] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cond: Optional[asyncio.Condition] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._start_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._connect_ms: deque = deque(maxlen=200)
+        self._counters = {
+            "connects": 0,
+            "connect_failures": 0,
+            "reconnects": 0,
+            "failovers": 0,
+            "health_checks": 0,
+            "health_failures": 0,
+            "calls": 0,
+            "call_failures": 0,
+            "retries": 0,
+        }
+        self._peak_in_flight = 0
+
+    # --- Lifecycle ---
+    @property
+    def started(self) -> bool:
+        return self._loop is not None and self._loop is _running_loop() and not self._closed
+
+    async def start(self) -> None:
+        """Connect all sessions (idempotent). Raises ConnectionError if none connects."""
+        if self.started:
+            return
+        loop = asyncio.get_running_loop()
+        # Concurrent first callers share one start; a failed start is retried by the next caller.
+        if self._start_task is None or self._start_task.get_loop() is not loop or self._start_task.done():
+            self._start_task = loop.create_task(self._start())
+        await asyncio.shield(self._start_task)
+
+    async def _start(self) -> None:
+        self._reset()
+        self._cond = asyncio.Condition()
+        self._closed = False
+        self._sessions = [_Session(id=i, standby=i >= self.size) for i in range(self.size + self.standby)]
+        results = await asyncio.gather(*(self._connect(s) for s in self._sessions), return_exceptions=True)
+        if not any(s.healthy for s in self._sessions):
+            await self.close()
+            raise ConnectionError(f"Could not connect to the MCP server: {results[0]!r}")
+        for s in self._sessions:
+            if not s.healthy:
+                self._schedule_reconnect(s)
+        self._rebalance()
+        if self.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+        self._loop = asyncio.get_running_loop()
+
+    def _reset(self) -> None:
+        # Sessions started on a previous (possibly closed) loop cannot be awaited from this one.
+        if self._health_task is not None and not self._health_task.done():
+            self._health_task.cancel()
+        for s in self._sessions:
+            if s.reconnect_task is not None and not s.reconnect_task.done():
+                s.reconnect_task.cancel()
+        self._health_task = None
+        self._loop = None
+        self._sessions = []
+
+    async def close(self) -> None:
+        """Stop health checks and reconnects and close every session."""
+        self._closed = True
+        tasks = [self._health_task] + [s.reconnect_task for s in self._sessions]
+        for task in tasks:
+            if task is not None and not task.done():
+                task.cancel()
+        for s in self._sessions:
+            await self._close_toolset(s)
+            s.healthy = False
+        self._health_task = None
+
+    # --- Connections ---
+    async def _connect(self, s: _Session) -> None:
+        toolset = self.factory()
+        ready = asyncio.get_running_loop().create_future()
+        s.toolset, s.stop = toolset, asyncio.Event()
+        s.owner_task = asyncio.create_task(self._own(toolset, ready, s.stop))
+        start = time.perf_counter()
+        try:
+            tools = await asyncio.wait_for(asyncio.shield(ready), self.connect_timeout)
+        except BaseException:
+            self._counters["connect_failures"] += 1
+            await self._close_toolset(s)
+            raise
+        self._connect_ms.append((time.perf_counter() - start) * 1000)
+        self._counters["connects"] += 1
+        s.tools, s.healthy = {t.name: t for t in tools}, True
+
+    @staticmethod
+    async def _own(toolset: Any, ready: asyncio.Future, stop: asyncio.Event) -> None:
+        # MCP sessions (anyio cancel scopes) must be closed by the task that opened them,
+        # so each one lives in its own task from connect to close.
+        try:
+            tools = await toolset.get_tools()
+            ready.set_result(tools)
+            await stop.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e if isinstance(e, Exception) else ConnectionError("connect cancelled"))
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            try:
+                await toolset.close()
+            except Exception:
+                pass
+
+    async def _close_toolset(self, s: _Session) -> None:
+        owner, s.owner_task, s.toolset, s.tools = s.owner_task, None, None, {}
+        if owner is None:
+            return
+        s.stop.set()
+        try:
+            await asyncio.wait_for(owner, self.health_timeout)
+        except BaseException:
+            owner.cancel()
+
+    def _schedule_reconnect(self, s: _Session) -> None:
+        if self._closed or (s.reconnect_task is not None and not s.reconnect_task.done()):
+            return
+        s.reconnect_task = asyncio.create_task(self._reconnect(s))
+
+    async def _reconnect(self, s: _Session) -> None:
+        attempt = 0
+        while not self._closed:
+            await self._close_toolset(s)
+            try:
+                await self._connect(s)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+                print(f"MCP session {s.id} reconnect failed ({e!r}); retrying in {delay:.1f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self._counters["reconnects"] += 1
+            print(f"MCP session {s.id} reconnected")
+            async with self._cond:
+                self._rebalance()
+                self._cond.notify_all()
+            return
+
+    def _mark_failed(self, s: _Session) -> None:
+        """Take `s` out of rotation, promote a standby in its place and reconnect it."""
+        if not s.healthy:
+            return
+        s.healthy = False
+        s.failures += 1
+        if not s.standby:
+            replacement = next((o for o in self._sessions if o.standby and o.healthy), None)
+            if replacement is not None:
+                replacement.standby, s.standby = False, True
+                self._counters["failovers"] += 1
+        self._schedule_reconnect(s)
+
+    def _rebalance(self) -> None:
+        """Keep `size` active sessions, preferring healthy ones; the rest are standby."""
+        ranked = sorted(self._sessions, key=lambda o: (not o.healthy, o.standby, o.id))
+        for i, o in enumerate(ranked):
+            o.standby = i >= self.size
+
+    # --- Health checks ---
+    async def _health_loop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.health_interval)
+            await self.check_health()
+
+    async def check_health(self) -> None:
+        """Probe every idle healthy session once; failed ones are replaced and reconnected."""
+        idle = [s for s in self._sessions if s.healthy and s.in_flight == 0 and s.toolset is not None]
+
+        async def probe(s: _Session) -> bool:
+            try:
+                await asyncio.wait_for(s.toolset.get_tools(), self.health_timeout)
+                return True
+            except Exception:
+                return False
+
+        results = await asyncio.gather(*(probe(s) for s in idle))
+        async with self._cond:
+            for s, ok in zip(idle, results):
+                self._counters["health_checks"] += 1
+                if not ok:
+                    self._counters["health_failures"] += 1
+                    self._mark_failed(s)
+            self._cond.notify_all()
+
+    # --- Calls ---
+    def _pick(self) -> Optional[_Session]:
+        candidates = [s for s in self._sessions if s.healthy and not s.standby and s.in_flight < self.max_in_flight]
+        if not candidates and not any(s.healthy and not s.standby for s in self._sessions):
+            # No healthy active session left: bring standbys into rotation.
+            self._rebalance()
+            candidates = [s for s in self._sessions if s.healthy and not s.standby and s.in_flight < self.max_in_flight]
+        return min(candidates, key=lambda s: s.in_flight) if candidates else None
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Yield the least-loaded healthy session; waits up to acquire_timeout for one."""
+        await self.start()
+        async with self._cond:
+            try:
+                await asyncio.wait_for(self._cond.wait_for(lambda: self._pick() is not None), self.acquire_timeout)
+            except asyncio.TimeoutError:
+                raise ConnectionError("No healthy MCP session available") from None
+            s = self._pick()
+            s.in_flight += 1
+            s.calls += 1
+            self._peak_in_flight = max(self._peak_in_flight, self.in_flight)
+        try:
+            yield s
+        finally:
+            async with self._cond:
+                s.in_flight -= 1
+                self._cond.notify_all()
+
+    async def call(self, tool_name: str, fn: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Run `fn(tool)` with `tool_name` from a pooled session. A connection
+        error marks that session failed and the call is retried on another
+        one (up to `retries` times; once every session has failed, the retry
+        waits for a reconnect) before it is re-raised. A call running longer
+        than `call_timeout` counts as a connection error. Any other
+        exception is the tool's own error: it is re-raised at once and the
+        session stays in rotation.
+        """
+        self._counters["calls"] += 1
+        for attempt in range(self.retries + 1):
+            async with self.acquire() as s:
+                tool = s.tools.get(tool_name)
+                if tool is None:
+                    raise KeyError(f"MCP tool {tool_name!r} not available")
+                try:
+                    if self.call_timeout is None:
+                        return await fn(tool)
+                    return await asyncio.wait_for(fn(tool), self.call_timeout)
+                except Exception as e:
+                    if not is_connection_error(e):
+                        raise
+                    self._counters["call_failures"] += 1
+                    async with self._cond:
+                        self._mark_failed(s)
+                        self._cond.notify_all()
+                    if attempt == self.retries:
+                        raise
+                    self._counters["retries"] += 1
+
+    async def tools(self) -> List[Any]:
+        """The tools of one healthy session (the same on every session)."""
+        async with self.acquire() as s:
+            return list(s.tools.values())
+
+    # --- Metrics ---
+    @property
+    def in_flight(self) -> int:
+        return sum(s.in_flight for s in self._sessions)
+
+    def metrics(self) -> Dict[str, Any]:
+        lat = sorted(self._connect_ms)
+        return {
+            **self._counters,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "healthy_active": sum(1 for s in self._sessions if s.healthy and not s.standby),
+            "healthy_standby": sum(1 for s in self._sessions if s.healthy and s.standby),
+            "connect_ms": {
+                "last": round(self._connect_ms[-1], 2) if lat else None,
+                "p50": round(lat[len(lat) // 2], 2) if lat else None,
+                "max": round(lat[-1], 2) if lat else None,
+            },
+            "sessions": [
+                {"id": s.id, "standby": s.standby, "healthy": s.healthy, "in_flight": s.in_flight,
+                 "calls": s.calls, "failures": s.failures}
+                for s in self._sessions
+            ],
+        }
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
@@ -1,20 +1,96 @@
-import os
 import asyncio
-import threading
-from concurrent.futures import ThreadPoolExecutor
+import os
+from typing import Any, Dict, List, Optional
 
-from dotenv import load_dotenv
-from google.genai import types
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, SseServerParams, SseConnectionParams
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, SseConnectionParams
 
 from pydantic import BaseModel
 
-# Global thread and loop for MCP tools
-_mcp_thread = None
-_mcp_loop = None
-_mcp_tools_ready = threading.Event()
-_mcp_tools_result = None
-_mcp_tools_error = None
+from .mcp_pool import MCPConnectionPool
+
+DEFAULT_TOOL_FILTER = ['qdrant-find']
+
+
+def pin_session_to_owner_task(toolset: MCPToolset) -> MCPToolset:
+    """
+    Stop `toolset` from re-opening a dropped MCP session outside the task that
+    first opened it.
+
+    ADK's session manager re-creates a disconnected session inside whichever
+    task calls next. The pool opens and closes each session in its owner task
+    (anyio cancel scopes must exit in the task that entered them), so a
+    re-created session would be unclosable and the pool would never learn
+    the connection dropped. Other tasks (tool calls, health probes) now get
+    the live session or a ConnectionError, which fails the pooled session
+    and triggers a clean reconnect.
+    """
+    manager = toolset._mcp_session_manager
+    open_session = manager.create_session
+    owner: Optional[asyncio.Task] = None
+
+    async def create_session(headers=None):
+        nonlocal owner
+        task = asyncio.current_task()
+        if owner is None:
+            owner = task
+        if task is owner:
+            return await open_session(headers=headers)
+        key = manager._generate_session_key(manager._merge_headers(headers))
+        entry = manager._sessions.get(key)
+        if entry is None or manager._is_session_disconnected(entry[0]):
+            raise ConnectionError("MCP session dropped")
+        return entry[0]
+
+    manager.create_session = create_session
+    return toolset
+
+
+class PooledMCPTool(BaseTool):
+    """An MCP tool whose calls run on whichever pooled session is healthy and least busy."""
+
+    def __init__(self, pool: MCPConnectionPool, template: BaseTool):
+        super().__init__(name=template.name, description=template.description)
+        self._pool = pool
+        self._template = template
+
+    def _get_declaration(self):
+        return self._template._get_declaration()
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context) -> Any:
+        return await self._pool.call(self.name, lambda tool: tool.run_async(args=args, tool_context=tool_context))
+
+
+class PooledMCPToolset(BaseToolset):
+    """
+    Toolset backed by an MCPConnectionPool of MCPToolset sessions to one SSE
+    server. Nothing connects until the agent first asks for its tools; the
+    tools it returns route every call through the pool, so concurrent agent
+    sessions share the connections and survive a dropped one.
+    """
+
+    def __init__(self, sse_url: str, tool_filter: Optional[List[str]] = None, **pool_kwargs):
+        super().__init__(tool_filter=tool_filter)
+        self.sse_url = sse_url
+        self.pool = MCPConnectionPool(self._new_toolset, **pool_kwargs)
+
+    def _new_toolset(self) -> MCPToolset:
+        return pin_session_to_owner_task(MCPToolset(
+            # SSE connection to the remote MCP server
+            connection_params=SseConnectionParams(url=self.sse_url),
+            tool_filter=self.tool_filter,
+        ))
+
+    async def get_tools(self, readonly_context=None) -> List[BaseTool]:
+        return [PooledMCPTool(self.pool, tool) for tool in await self.pool.tools()]
+
+    def metrics(self) -> Dict[str, Any]:
+        return self.pool.metrics()
+
+    async def close(self) -> None:
+        await self.pool.close()
+
 
 class MCPTools(BaseModel):
     """Manages tools from MCP Server with google adk"""
@@ -23,79 +99,19 @@ class MCPTools(BaseModel):
         pass
 
     # --- Import Tools from MCP Server ---
+    def _pool_kwargs(self) -> Dict[str, Any]:
+        return {
+            "size": int(os.getenv('MCP_POOL_SIZE', '2')),
+            "standby": int(os.getenv('MCP_POOL_STANDBY', '1')),
+            "call_timeout": float(os.getenv('MCP_CALL_TIMEOUT', '30')),
+        }
+
     async def get_tools_async(self, sse_url: str):
-        """Gets tools from MCP Server asynchronously."""
-        print("Attempting to connect to MCP server...")
-        try:
-            toolset = MCPToolset(
-                # Use SseServerParams for remote servers
-                connection_params=SseConnectionParams(url=sse_url),
-                tool_filter=['qdrant-find']
-            )
-            print("MCP Toolset created successfully.")
-            # MCP requires maintaining a connection to the local MCP Server.
-            # tool_set manages the cleanup of this connection.
-            return toolset
-        except Exception as e:
-            print(f"Error connecting to MCP server: {e}")
-            raise e
-        
-    def _mcp_thread_main(self, sse_url):
-        """Main function for the MCP thread."""
-        global _mcp_loop, _mcp_tools_result, _mcp_tools_error
-        
-        try:
-            # Create a new event loop for this thread
-            _mcp_loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(_mcp_loop)
-            
-            # Run the async function and store the result
-            _mcp_tools_result = _mcp_loop.run_until_complete(self.get_tools_async(sse_url))
-            
-            # Signal that tools are ready
-            _mcp_tools_ready.set()
-            
-            # Keep the loop running to handle future requests
-            _mcp_loop.run_forever()
-        except Exception as e:
-            # Store any error
-            _mcp_tools_error = e
-            _mcp_tools_ready.set()  # Signal even on error
-            print(f"Error in MCP thread: {e}")
-        finally:
-            # Clean up loop on exit
-            if _mcp_loop and _mcp_loop.is_running():
-                _mcp_loop.stop()
-            
-            # Note: We intentionally do NOT close the loop here
-            # because we want it to stay open for tool invocations
-    
+        """Gets a pooled toolset for the MCP Server; it connects on first use."""
+        print(f"Creating pooled MCP toolset for {sse_url}...")
+        return PooledMCPToolset(sse_url, tool_filter=DEFAULT_TOOL_FILTER, **self._pool_kwargs())
+
     def get_tools(self, sse_url: str):
-        """Gets tools from MCP Server using a persistent background thread."""
-        global _mcp_thread, _mcp_tools_result, _mcp_tools_error
-        
-        # Reset global state
-        _mcp_tools_ready.clear()
-        _mcp_tools_result = None
-        _mcp_tools_error = None
-        
-        # Start MCP thread if not already running
-        if _mcp_thread is None or not _mcp_thread.is_alive():
-            print("Starting MCP tools thread...")
-            _mcp_thread = threading.Thread(
-                target=self._mcp_thread_main,
-                args=(sse_url,),
-                daemon=True  # Make thread daemon so it exits when main program exits
-            )
-            _mcp_thread.start()
-        
-        # Wait for tools to be ready
-        print("Waiting for MCP tools to be ready...")
-        _mcp_tools_ready.wait()
-        
-        # Check for errors
-        if _mcp_tools_error:
-            raise _mcp_tools_error
-        
-        # Return the result
-        return _mcp_tools_result
\ No newline at end of file
+        """Synchronous version of get_tools_async (nothing connects here either)."""
+        print(f"Creating pooled MCP toolset for {sse_url}...")
+        return PooledMCPToolset(sse_url, tool_filter=DEFAULT_TOOL_FILTER, **self._pool_kwargs())
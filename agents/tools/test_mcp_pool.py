@@ -0,0 +1,312 @@
+"""Tests for the MCP connection pool: fake toolsets, plus a local stub SSE MCP server."""
+
+import asyncio
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from agents.tools.mcp_pool import MCPConnectionPool
+
+
+class FakeTool:
+    def __init__(self, toolset, name="qdrant-find"):
+        self.toolset = toolset
+        self.name = name
+
+    async def run_async(self, *, args, tool_context=None):
+        if self.toolset.server["down"] or self.toolset.closed:
+            raise ConnectionError("connection dropped")
+        await asyncio.sleep(args.get("delay", 0))
+        if "error" in args:
+            raise args["error"]
+        return f"{args['query']} via {self.toolset.id}"
+
+
+class FakeToolset:
+    """Stands in for MCPToolset; `server` is shared state the tests flip."""
+    count = 0
+
+    def __init__(self, server):
+        FakeToolset.count += 1
+        self.id = FakeToolset.count
+        self.server = server
+        self.closed = False
+
+    async def get_tools(self):
+        await asyncio.sleep(0.01)
+        if self.server["down"]:
+            raise ConnectionError("server down")
+        return [FakeTool(self)]
+
+    async def close(self):
+        self.closed = True
+
+
+def fake_pool(server, **kwargs):
+    kwargs = {"size": 2, "standby": 1, "health_interval": 0, "backoff_base": 0.01, "backoff_max": 0.05, **kwargs}
+    return MCPConnectionPool(lambda: FakeToolset(server), **kwargs)
+
+
+def run_tool(pool, query, delay=0):
+    return pool.call("qdrant-find", lambda tool: tool.run_async(args={"query": query, "delay": delay}))
+
+
+def test_concurrent_calls_are_spread_and_slow_call_does_not_block():
+    async def main():
+        pool = fake_pool({"down": False})
+        slow = asyncio.create_task(run_tool(pool, "slow", delay=0.5))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        fast = await asyncio.gather(*(run_tool(pool, f"q{i}") for i in range(20)))
+        fast_s = time.perf_counter() - start
+        await slow
+        m = pool.metrics()
+        await pool.close()
+        return fast, fast_s, m
+
+    fast, fast_s, m = asyncio.run(main())
+    assert fast_s < 0.3
+    assert len({r.split(" via ")[1] for r in fast}) == 2  # both active sessions served calls
+    assert m["connects"] == 3 and m["healthy_active"] == 2 and m["healthy_standby"] == 1
+    assert m["calls"] == 21 and m["in_flight"] == 0 and m["peak_in_flight"] >= 2
+    assert m["connect_ms"]["p50"] is not None
+
+
+def test_failed_session_fails_over_to_standby_and_reconnects():
+    async def main():
+        server = {"down": False}
+        pool = fake_pool(server, size=1, standby=1)
+        await pool.start()
+        active = next(s for s in pool._sessions if not s.standby)
+        active.toolset.closed = True  # this session's connection drops
+        result = await run_tool(pool, "after drop")  # retried on the promoted standby
+        for _ in range(50):
+            if pool.metrics()["healthy_standby"] == 1:
+                break
+            await asyncio.sleep(0.01)
+        m = pool.metrics()
+        await pool.close()
+        return result, m
+
+    result, m = asyncio.run(main())
+    assert result.startswith("after drop via")
+    assert m["call_failures"] == 1 and m["retries"] == 1 and m["failovers"] == 1
+    assert m["reconnects"] == 1 and m["healthy_active"] == 1 and m["healthy_standby"] == 1
+
+
+def test_tool_errors_are_not_retried_but_dropped_connections_are():
+    pytest.importorskip("mcp")
+    from mcp.shared.exceptions import McpError
+    from mcp.types import CONNECTION_CLOSED, ErrorData
+
+    async def main():
+        pool = fake_pool({"down": False}, size=1, standby=1, retries=1)
+        with pytest.raises(ValueError):
+            await pool.call("qdrant-find", lambda tool: tool.run_async(args={"query": "q", "error": ValueError("bad")}))
+        with pytest.raises(McpError):
+            await pool.call("qdrant-find", lambda tool: tool.run_async(
+                args={"query": "q", "error": McpError(ErrorData(code=-32602, message="invalid params"))}))
+        tool_errors = pool.metrics()
+        closed = McpError(ErrorData(code=CONNECTION_CLOSED, message="Connection closed"))
+        with pytest.raises(McpError):
+            await pool.call("qdrant-find", lambda tool: tool.run_async(args={"query": "q", "error": closed}))
+        m = pool.metrics()
+        await pool.close()
+        return tool_errors, m
+
+    tool_errors, m = asyncio.run(main())
+    assert tool_errors["call_failures"] == 0 and tool_errors["retries"] == 0 and tool_errors["failovers"] == 0
+    assert tool_errors["healthy_active"] == 1 and tool_errors["healthy_standby"] == 1
+    assert m["call_failures"] == 2 and m["retries"] == 1 and m["failovers"] == 1
+
+
+def test_hung_call_times_out_and_is_retried_on_another_session():
+    async def main():
+        pool = fake_pool({"down": False}, size=1, standby=1, call_timeout=0.1)
+        await pool.start()
+        start = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await run_tool(pool, "hung", delay=5)
+        elapsed = time.perf_counter() - start
+        result = await run_tool(pool, "fast")
+        m = pool.metrics()
+        await pool.close()
+        return elapsed, result, m
+
+    elapsed, result, m = asyncio.run(main())
+    assert elapsed < 1
+    assert result.startswith("fast via")
+    assert m["call_failures"] == 3 and m["retries"] == 2 and m["reconnects"] >= 2
+
+
+def test_health_check_detects_outage_and_backs_off_until_server_returns():
+    async def main():
+        server = {"down": False}
+        pool = fake_pool(server, size=1, standby=0, acquire_timeout=2)
+        await pool.start()
+        server["down"] = True
+        await pool.check_health()
+        down = pool.metrics()
+        await asyncio.sleep(0.2)  # reconnect attempts fail with growing delays
+        failures = pool.metrics()["connect_failures"]
+        server["down"] = False
+        result = await run_tool(pool, "back")  # waits for the reconnect
+        m = pool.metrics()
+        await pool.close()
+        return down, failures, result, m
+
+    down, failures, result, m = asyncio.run(main())
+    assert down["health_failures"] == 1 and down["healthy_active"] == 0
+    assert 2 <= failures < 20
+    assert result.startswith("back via")
+    assert m["reconnects"] == 1
+
+
+def test_start_fails_when_server_unreachable_and_pool_restarts_on_new_loop():
+    server = {"down": True}
+    pool = fake_pool(server)
+    with pytest.raises(ConnectionError):
+        asyncio.run(pool.start())
+    server["down"] = False
+    assert asyncio.run(run_tool(pool, "first loop")).startswith("first loop")
+    assert asyncio.run(run_tool(pool, "second loop")).startswith("second loop")
+    assert pool.metrics()["connects"] == 6  # the second loop reconnected all three sessions
+
+
+# --- Against a local stub SSE MCP server with the real ADK toolsets ---
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def stub_sse_server():
+    pytest.importorskip("google.adk")
+    mcp_server = pytest.importorskip("mcp.server.fastmcp")
+    uvicorn = pytest.importorskip("uvicorn")
+
+    port = _free_port()
+    app = mcp_server.FastMCP("stub-qdrant", host="127.0.0.1", port=port, log_level="WARNING")
+
+    @app.tool(name="qdrant-find")
+    async def find(query: str, delay: float = 0.0) -> str:
+        await asyncio.sleep(delay)
+        return f"found: {query}"
+
+    server = uvicorn.Server(uvicorn.Config(app.sse_app(), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}/sse"
+    server.should_exit = True
+    thread.join(5)
+
+
+def test_pooled_toolset_against_stub_sse_server(stub_sse_server):
+    from agents.tools.mcp_tools import PooledMCPToolset
+
+    async def main():
+        toolset = PooledMCPToolset(stub_sse_server, tool_filter=["qdrant-find"], size=2, standby=1, health_interval=0)
+        tools = await toolset.get_tools()
+        assert [t.name for t in tools] == ["qdrant-find"]
+        assert tools[0]._get_declaration().name == "qdrant-find"
+        slow = asyncio.create_task(tools[0].run_async(args={"query": "slow", "delay": 1.0}, tool_context=None))
+        await asyncio.sleep(0.1)
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(tools[0].run_async(args={"query": f"q{i}"}, tool_context=None) for i in range(10))
+        )
+        fast_s = time.perf_counter() - start
+        await slow
+        await toolset.pool.check_health()
+        m = toolset.metrics()
+        await toolset.close()
+        return results, fast_s, m
+
+    results, fast_s, m = asyncio.run(main())
+    assert all("found: q" in str(r) for r in results)
+    assert fast_s < 0.8
+    assert m["connects"] == 3 and m["health_failures"] == 0 and m["call_failures"] == 0
+
+
+_STUB_SERVER = """
+import asyncio, sys
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+
+port = int(sys.argv[1])
+app = FastMCP("stub-qdrant", host="127.0.0.1", port=port, log_level="WARNING")
+
+@app.tool(name="qdrant-find")
+async def find(query: str, delay: float = 0.0) -> str:
+    await asyncio.sleep(delay)
+    return f"found: {query}"
+
+uvicorn.run(app.sse_app(), host="127.0.0.1", port=port, log_level="warning")
+"""
+
+
+class StubServerProcess:
+    """Stub SSE MCP server in a child process, so stop() drops live connections like a crash."""
+
+    def __init__(self, port):
+        self.port = port
+        self.proc = None
+
+    def start(self):
+        self.proc = subprocess.Popen([sys.executable, "-c", _STUB_SERVER, str(self.port)])
+        deadline = time.monotonic() + 20
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), 0.1).close()
+                return
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError("stub MCP server did not start")
+
+    def stop(self):
+        self.proc.kill()
+        self.proc.wait()
+
+
+def test_pooled_toolset_heals_after_stub_server_restart():
+    pytest.importorskip("google.adk")
+    pytest.importorskip("mcp.server.fastmcp")
+    pytest.importorskip("uvicorn")
+    from agents.tools.mcp_tools import PooledMCPToolset
+
+    server = StubServerProcess(_free_port())
+    server.start()
+
+    async def main():
+        toolset = PooledMCPToolset(
+            f"http://127.0.0.1:{server.port}/sse", tool_filter=["qdrant-find"],
+            size=1, standby=1, health_interval=0, call_timeout=5,
+        )
+        tools = await toolset.get_tools()
+        before = await tools[0].run_async(args={"query": "a"}, tool_context=None)
+        await asyncio.to_thread(server.stop)
+        await asyncio.sleep(0.3)
+        await asyncio.to_thread(server.start)
+        # Both sessions died with the old process; the call must notice, fail
+        # them, and succeed on a reconnected session rather than hang.
+        after = await asyncio.wait_for(tools[0].run_async(args={"query": "b"}, tool_context=None), 20)
+        await toolset.pool.check_health()
+        m = toolset.metrics()
+        await toolset.close()
+        return before, after, m
+
+    try:
+        before, after, m = asyncio.run(main())
+    finally:
+        server.stop()
+    assert "found: a" in str(before) and "found: b" in str(after)
+    assert m["call_failures"] >= 1 and m["reconnects"] >= 1
+    assert m["healthy_active"] == 1 and m["health_failures"] == 0
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import httpx
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models as qm
+
+from collection_profiles import CollectionProfile, get_profile
+from embedding_cache import EmbeddingCache
+from vector_db import (
+    PAYLOAD_INDEX_SPECS,
+    Hit,
+    build_points,
+    build_query_request,
+    create_profiled_collection,
+    default_point_ids,
+    embed_dense_passages,
+    embed_queries,
+    embed_sparse_passages,
+    prepare_metadatas,
+    to_result,
+)
+from query_cache import bump_collection_generation
+
+# One AsyncQdrantClient (and therefore one bounded HTTP connection pool) per
+# event loop and (url, dense model, sparse model, pool size), shared by every
+# AsyncVectorDB. Pooled connections belong to the loop that opened them, so a
+# second asyncio.run() gets its own clients; a closed loop's are dropped with it.
+_ClientKey = Tuple[str, str, Optional[str], int]
+_SHARED_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_ClientKey, AsyncQdrantClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def close_shared_clients() -> None:
+    """Close the running loop's pooled AsyncQdrantClients (call once on application shutdown)."""
+    clients = list(_SHARED_CLIENTS.pop(asyncio.get_running_loop(), {}).values())
+    for client in clients:
+        await client.close()
+
+
+class AsyncVectorDB(BaseModel):
+    """
+    asyncio counterpart of VectorDB, built on AsyncQdrantClient.
+
+    Same add()/query()/scroll_all()/ensure_payload_indexes() surface, but:
+      - HTTP I/O is non-blocking and goes through a shared connection pool
+        bounded by `max_connections`; callers beyond that wait on a semaphore
+        instead of opening more sockets.
+      - FastEmbed (CPU-bound ONNX inference) runs in a thread pool of
+        `embedding_workers`, so the event loop keeps serving other sessions.
+    """
+    memory_location: str = "http://localhost:6333"
+    embeddings_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
+    sparse_embeddings_model_name: Optional[str] = "Qdrant/bm25"  # optional hybrid (None = dense only)
+    collection_name: str = "default_collection"
+    client: Optional[AsyncQdrantClient] = None
+    embedding_cache_dir: Optional[str] = None
+    max_connections: int = 16
+    embedding_workers: int = 2
+    collection_profile: str = "default"
+    payload_mode: str = "full"  # "slim" stores chunk text once (see VectorDB)
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    _embedding_cache: Optional[EmbeddingCache] = PrivateAttr(default=None)
+    _executor: Optional[ThreadPoolExecutor] = PrivateAttr(default=None)
+    _semaphore: Optional[asyncio.Semaphore] = PrivateAttr(default=None)
+    _loop: Optional[asyncio.AbstractEventLoop] = PrivateAttr(default=None)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Outside a running loop the client is bound on the first async call.
+        if _running_loop() is not None:
+            self._initialize_client()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.embedding_workers, thread_name_prefix="embed"
+        )
+        if self.embedding_cache_dir:
+            self._embedding_cache = EmbeddingCache(self.embedding_cache_dir)
+
+    # -----------------------------
+    # Client / collection setup
+    # -----------------------------
+    def _initialize_client(self) -> None:
+        """Bind this instance to the running loop's shared client and a fresh semaphore."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.max_connections)
+        clients = _SHARED_CLIENTS.setdefault(loop, {})
+        key = (
+            self.memory_location,
+            self.embeddings_model_name,
+            self.sparse_embeddings_model_name,
+            self.max_connections,
+        )
+        client = clients.get(key)
+        if client is not None:
+            self.client = client
+            return
+        try:
+            # 'location' accepts a URL, a host name or ":memory:".
+            client = AsyncQdrantClient(
+                location=self.memory_location,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            client.set_model(self.embeddings_model_name)
+            try:
+                if self.sparse_embeddings_model_name:
+                    client.set_sparse_model(self.sparse_embeddings_model_name)
+            except Exception:
+                # Sparse is optional; skip if not supported in your install.
+                pass
+            clients[key] = client
+            self.client = client
+        except Exception as e:
+            print(
+                f"Error initializing async Qdrant client: {e}\n"
+                f"Check Qdrant is reachable at '{self.memory_location}'."
+            )
+            self.client = None
+
+    @property
+    def _collection_key(self) -> tuple:
+        # Same key as VectorDB, so async writes invalidate its cached queries.
+        return (self.memory_location, self.collection_name)
+
+    async def _run_embedding(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    @property
+    def profile(self) -> CollectionProfile:
+        return get_profile(self.collection_profile)
+
+    async def _ensure_collection(self) -> None:
+        self._initialize_client()
+        async with self._semaphore:
+            if await self.client.collection_exists(self.collection_name):
+                return
+            await create_profiled_collection(self.client, self.collection_name, self.profile)
+
+    async def check_collection_existence(self) -> bool:
+        try:
+            self._initialize_client()
+            async with self._semaphore:
+                return bool(await self.client.get_collection(self.collection_name))
+        except Exception as e:
+            print(f"Collection does not exist: {e}")
+            return False
+
+    async def close(self) -> None:
+        """Release the embedding threads (the shared HTTP pool stays open)."""
+        self._executor.shutdown(wait=False)
+
+    # -----------------------------
+    # Ingestion
+    # -----------------------------
+    async def add(
+        self,
+        documents: Sequence[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[Sequence[Union[str, int]]] = None,
+    ) -> List[Union[str, int]]:
+        """Async VectorDB.add(): embed in the executor, then upsert over the pool."""
+        if not documents:
+            print("No documents to add.")
+            return []
+
+        md_list = prepare_metadatas(documents, metadatas, mirror_text=self.payload_mode != "slim")
+        if ids is None:
+            ids = default_point_ids(documents, md_list)
+
+        try:
+            self._initialize_client()
+            texts = list(documents)
+            dense = await self._run_embedding(
+                embed_dense_passages, self.client, texts, self._embedding_cache
+            )
+            sparse = await self._run_embedding(
+                embed_sparse_passages, self.client, texts, self._embedding_cache
+            )
+            if self._embedding_cache is not None:
+                await self._run_embedding(self._embedding_cache.flush)
+
+            await self._ensure_collection()
+            points = build_points(self.client, ids, texts, md_list, dense, sparse)
+            async with self._semaphore:
+                await self.client.upsert(
+                    collection_name=self.collection_name, points=points, wait=True
+                )
+            bump_collection_generation(self._collection_key)
+            return list(ids)
+        except Exception as e:
+            # A failed upsert may still have written some points.
+            bump_collection_generation(self._collection_key)
+            print(f"Error adding documents: {e}")
+            return []
+
+    async def add_to_vectordb(self, documents, source_ids):
+        metadatas = [{"source_id": sid} for sid in source_ids]
+        return await self.add(documents=documents, metadatas=metadatas)
+
+    # -----------------------------
+    # Retrieval
+    # -----------------------------
+    async def query(
+        self,
+        query_text: str,
+        limit: int = 5,
+        score_threshold: Optional[float] = None,
+        query_filter: Optional[qm.Filter] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Hit]:
+        """
+        Async text query. Hybrid (dense+sparse RRF) when a sparse model is set.
+
+        `fields` limits the payload keys fetched. Returns a list of Hit
+        mappings with id, score, page_content, and metadata.
+        """
+        try:
+            self._initialize_client()
+            dense, sparse = await self._run_embedding(embed_queries, self.client, [query_text])
+            request = build_query_request(
+                self.client,
+                dense[0],
+                sparse[0] if sparse is not None else None,
+                limit=limit,
+                score_threshold=score_threshold,
+                query_filter=query_filter,
+                search_params=self.profile.search_params(),
+                with_payload=list(fields) if fields is not None else True,
+            )
+            async with self._semaphore:
+                response = await self.client.query_points(
+                    collection_name=self.collection_name,
+                    prefetch=request.prefetch,
+                    query=request.query,
+                    using=request.using,
+                    query_filter=request.filter,
+                    search_params=request.params,
+                    score_threshold=request.score_threshold,
+                    limit=request.limit,
+                    with_payload=request.with_payload,
+                )
+            return [to_result(p.id, p.score, p.payload) for p in response.points]
+        except Exception as e:
+            print(f"Error using query(): {e}")
+            return []
+
+    async def scroll_all(
+        self, batch_size: int = 100, fields: Optional[Sequence[str]] = None
+    ) -> List[Hit]:
+        """Read the entire collection, following next_page_offset."""
+        all_docs: List[Hit] = []
+        next_offset: Optional[Union[int, str]] = None
+
+        try:
+            self._initialize_client()
+            while True:
+                async with self._semaphore:
+                    points, next_offset = await self.client.scroll(
+                        collection_name=self.collection_name,
+                        limit=batch_size,
+                        offset=next_offset,
+                        with_payload=list(fields) if fields is not None else True,
+                        with_vectors=False,
+                    )
+                if not points:
+                    break
+
+                all_docs.extend(to_result(p.id, None, p.payload) for p in points)
+
+                if next_offset is None:
+                    break
+
+            return all_docs
+        except Exception as e:
+            print(f"Error retrieving documents: {e}")
+            return []
+
+    # -----------------------------
+    # Indexing helpers (optional)
+    # -----------------------------
+    async def ensure_payload_indexes(self) -> None:
+        """Create the same payload indexes as VectorDB.ensure_payload_indexes()."""
+        self._initialize_client()
+        for field_name, schema in PAYLOAD_INDEX_SPECS:
+            try:
+                async with self._semaphore:
+                    await self.client.create_payload_index(
+                        collection_name=self.collection_name,
+                        field_name=field_name,
+                        field_schema=schema,
+                    )
+            except Exception:
+                # Ignore "already exists" or unused fields
+                pass
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
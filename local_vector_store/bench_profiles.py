@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Benchmark VectorDB collection profiles (float32 baseline vs on-disk / int8 / binary).
+
+The recipe corpus (quarto/recipes/*.qmd) is split into chunks and scaled up
+synthetically by recombining sentences, embedded once, and uploaded into one
+collection per profile. For each profile we report:
+  - estimated RAM for the dense vectors, plus Qdrant's resident memory (if /metrics is reachable)
+  - p50 / p99 query latency
+  - recall@k against exact float32 brute-force search
+
+Usage examples:
+  python local_vector_store/bench_profiles.py --points 50000
+  python local_vector_store/bench_profiles.py --profiles default int8 binary --k 10 --json bench.json
+  python local_vector_store/bench_profiles.py --vectors random --url :memory:   # no model download
+
+Quantization and on-disk storage only take effect on a Qdrant server; ':memory:'
+just exercises the script.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import requests
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qm
+
+from collection_profiles import COLLECTION_PROFILES, get_profile
+
+ROOT = Path(__file__).resolve().parents[1]
+RECIPES_DIR = ROOT / "quarto" / "recipes"
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def load_recipe_chunks(chunk_size: int = 800) -> list[str]:
+    chunks = []
+    for qmd in sorted(RECIPES_DIR.glob("*.qmd")):
+        text = qmd.read_text(encoding="utf-8")
+        for i in range(0, len(text), chunk_size):
+            chunk = text[i:i + chunk_size].strip()
+            if chunk:
+                chunks.append(chunk)
+    return chunks
+
+
+def scale_corpus(chunks: list[str], n: int, seed: int = 0) -> list[str]:
+    """Grow the corpus to n chunks by shuffling sentences across random source chunks."""
+    rng = random.Random(seed)
+    sentences = [s for c in chunks for s in SENTENCE_RE.split(c) if s.strip()]
+    out = list(chunks[:n])
+    while len(out) < n:
+        k = rng.randint(3, 8)
+        out.append(" ".join(rng.choice(sentences) for _ in range(k)))
+    return out
+
+
+def embed_texts(texts: list[str], model_name: str, is_query: bool = False) -> np.ndarray:
+    from fastembed import TextEmbedding
+
+    model = TextEmbedding(model_name=model_name)
+    it = model.query_embed(texts) if is_query else model.passage_embed(texts)
+    return normalize(np.array(list(it), dtype=np.float32))
+
+
+def random_vectors(n: int, dim: int, seed: int, clusters: int = 64) -> np.ndarray:
+    """Clustered random unit vectors (a crude stand-in for real embeddings)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    return normalize(centers[labels] + 0.5 * rng.normal(size=(n, dim)).astype(np.float32))
+
+
+def normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.linalg.norm(x, axis=1, keepdims=True).clip(min=1e-12)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return top
+
+
+def server_resident_bytes(url: str):
+    if not url.startswith("http"):
+        return None
+    try:
+        text = requests.get(url.rstrip("/") + "/metrics", timeout=5).text
+        m = re.search(r"^memory_resident_bytes\s+([0-9.e+]+)", text, re.M)
+        return int(float(m.group(1))) if m else None
+    except Exception:
+        return None
+
+
+def wait_until_indexed(client: QdrantClient, name: str, timeout: float = 600.0):
+    start = time.time()
+    while time.time() - start < timeout:
+        if client.get_collection(name).status == qm.CollectionStatus.GREEN:
+            return
+        time.sleep(0.5)
+
+
+def bench_profile(client, url, profile_name, corpus, queries, truth, k, batch_size, parallel):
+    profile = get_profile(profile_name)
+    name = f"bench_{profile_name}"
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=qm.VectorParams(
+            size=corpus.shape[1],
+            distance=qm.Distance.COSINE,
+            on_disk=profile.on_disk_vectors or None,
+            quantization_config=profile.quantization_config(),
+        ),
+        on_disk_payload=profile.on_disk_payload or None,
+    )
+    t0 = time.perf_counter()
+    client.upload_collection(
+        collection_name=name,
+        vectors=corpus,
+        ids=range(len(corpus)),
+        batch_size=batch_size,
+        parallel=parallel,
+        wait=True,
+    )
+    wait_until_indexed(client, name)
+    upload_s = time.perf_counter() - t0
+
+    latencies, recalls = [], []
+    params = profile.search_params()
+    for q, expected in zip(queries, truth):
+        t = time.perf_counter()
+        hits = client.query_points(
+            collection_name=name, query=q.tolist(), limit=k, search_params=params
+        ).points
+        latencies.append((time.perf_counter() - t) * 1000)
+        recalls.append(len({h.id for h in hits} & set(expected.tolist())) / k)
+
+    result = {
+        "profile": profile_name,
+        "points": len(corpus),
+        "upload_s": round(upload_s, 2),
+        "est_vector_ram_mb": round(profile.estimated_ram_bytes(*corpus.shape) / 2**20, 1),
+        "server_resident_mb": None,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+    }
+    rss = server_resident_bytes(url)
+    if rss is not None:
+        result["server_resident_mb"] = round(rss / 2**20, 1)
+    client.delete_collection(name)
+    return result
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark VectorDB collection profiles")
+    p.add_argument("--url", default="http://localhost:6333", help="Qdrant location (default: http://localhost:6333)")
+    p.add_argument("--profiles", nargs="+", default=list(COLLECTION_PROFILES),
+                   help=f"Profiles to compare (default: all of {list(COLLECTION_PROFILES)})")
+    p.add_argument("--points", type=int, default=20000, help="Corpus size after synthetic scaling (default: 20000)")
+    p.add_argument("--queries", type=int, default=200, help="Number of queries (default: 200)")
+    p.add_argument("--k", type=int, default=10, help="Top-k for recall (default: 10)")
+    p.add_argument("--vectors", choices=["model", "random"], default="model",
+                   help="Embed the corpus with FastEmbed, or use clustered random vectors")
+    p.add_argument("--embed-model", default="sentence-transformers/all-MiniLM-L6-v2",
+                   help="Dense embeddings model name")
+    p.add_argument("--dim", type=int, default=384, help="Vector size for --vectors random")
+    p.add_argument("--batch-size", type=int, default=256, help="Upload batch size")
+    p.add_argument("--parallel", type=int, default=1, help="Upload workers")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", help="Also write results to this JSON file")
+    args = p.parse_args()
+
+    if args.vectors == "model":
+        texts = scale_corpus(load_recipe_chunks(), args.points, seed=args.seed)
+        rng = random.Random(args.seed + 1)
+        query_texts = [SENTENCE_RE.split(rng.choice(texts))[0][:200] for _ in range(args.queries)]
+        print(f"Embedding {len(texts)} chunks and {len(query_texts)} queries...", file=sys.stderr)
+        corpus = embed_texts(texts, args.embed_model)
+        queries = embed_texts(query_texts, args.embed_model, is_query=True)
+    else:
+        corpus = random_vectors(args.points, args.dim, args.seed)
+        rng = np.random.default_rng(args.seed + 1)
+        picks = corpus[rng.integers(0, len(corpus), size=args.queries)]
+        queries = normalize(picks + 0.3 * rng.normal(size=picks.shape).astype(np.float32))
+
+    truth = exact_top_k(corpus, queries, args.k)
+    client = QdrantClient(location=args.url, timeout=300)
+
+    results = []
+    for name in args.profiles:
+        print(f"Benchmarking profile {name!r}...", file=sys.stderr)
+        results.append(
+            bench_profile(client, args.url, name, corpus, queries, truth,
+                          args.k, args.batch_size, args.parallel)
+        )
+
+    cols = list(results[0].keys())
+    print("  ".join(f"{c:>18}" for c in cols))
+    for r in results:
+        print("  ".join(f"{str(r[c]):>18}" for c in cols))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+from qdrant_client.http import models as qm
+
+
+class CollectionProfile(BaseModel):
+    """
+    Storage layout used when VectorDB creates its collection.
+
+    - on_disk_vectors: keep original float32 vectors on disk (mmap) instead of RAM
+    - on_disk_payload: keep payloads on disk, loaded only for returned hits
+    - quantization: None, "int8" (scalar) or "binary"; quantized vectors stay
+      in RAM and are used for the first pass, originals are used to rescore
+    - oversampling: how many extra candidates the quantized pass fetches
+      (x limit) before rescoring with the originals
+    """
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+    quantization: Optional[str] = None
+    oversampling: Optional[float] = None
+
+    def quantization_config(self) -> Optional[qm.QuantizationConfig]:
+        if self.quantization is None:
+            return None
+        if self.quantization == "int8":
+            return qm.ScalarQuantization(
+                scalar=qm.ScalarQuantizationConfig(
+                    type=qm.ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        if self.quantization == "binary":
+            return qm.BinaryQuantization(binary=qm.BinaryQuantizationConfig(always_ram=True))
+        raise ValueError(f"Unknown quantization: {self.quantization!r}")
+
+    def search_params(self) -> Optional[qm.SearchParams]:
+        """Search params for the dense leg (rescoring on for quantized profiles)."""
+        if self.quantization is None:
+            return None
+        return qm.SearchParams(
+            quantization=qm.QuantizationSearchParams(
+                rescore=True, oversampling=self.oversampling
+            )
+        )
+
+    def estimated_ram_bytes(self, points: int, dim: int) -> int:
+        """Rough RAM needed for the dense vectors alone (excludes HNSW graph and payload)."""
+        if self.quantization == "int8":
+            quantized = points * dim
+        elif self.quantization == "binary":
+            quantized = points * ((dim + 7) // 8)
+        else:
+            quantized = 0
+        originals = 0 if self.on_disk_vectors else points * dim * 4
+        return originals + quantized
+
+
+COLLECTION_PROFILES: Dict[str, CollectionProfile] = {
+    # Everything in RAM as float32 (Qdrant's defaults).
+    "default": CollectionProfile(),
+    # Originals and payload on disk, nothing quantized.
+    "on_disk": CollectionProfile(on_disk_vectors=True, on_disk_payload=True),
+    # ~4x less RAM than float32; rescoring keeps recall close to the baseline.
+    "int8": CollectionProfile(
+        on_disk_vectors=True, on_disk_payload=True, quantization="int8", oversampling=2.0
+    ),
+    # ~32x less RAM; needs more oversampling to recover recall.
+    "binary": CollectionProfile(
+        on_disk_vectors=True, on_disk_payload=True, quantization="binary", oversampling=3.0
+    ),
+}
+
+
+def get_profile(name: str) -> CollectionProfile:
+    try:
+        return COLLECTION_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown collection profile {name!r}; choose one of {sorted(COLLECTION_PROFILES)}"
+        )
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_cache import normalize_text, text_key
+
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def shingles(text: str, size: int = 5) -> List[str]:
+    """Word `size`-grams of the normalized, lower-cased text (the whole text if shorter)."""
+    words = normalize_text(text).lower().split()
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+class MinHasher:
+    """MinHash signatures over 32-bit shingle hashes with `num_perm` (a*x + b) mod p permutations."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        # a, b < 2**32 and x < 2**32 keep a*x + b inside uint64.
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: Sequence[str]) -> np.ndarray:
+        if not items:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        # crc32 is plenty for shingle hashing and ~10x cheaper than a cryptographic hash.
+        hv = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in items), dtype=np.uint64, count=len(items))
+        perm = ((hv[:, None] * self._a + self._b) % _PRIME) & _MAX_HASH
+        return perm.min(axis=0)
+
+
+class ChunkDeduplicator:
+    """
+    Drop redundant chunks before they are embedded.
+
+    - Exact duplicates: same normalized text (whitespace/Unicode differences
+      ignored), the key the embedding cache uses.
+    - Near duplicates: MinHash over word shingles, bucketed with LSH
+      (`bands` x `num_perm // bands` rows); a candidate is dropped when its
+      estimated Jaccard similarity with an already kept chunk is >= threshold.
+
+    The first occurrence is kept. The index accumulates across filter() calls,
+    so one deduplicator fed file by file also drops boilerplate repeated across
+    files; new_scope() forgets the kept chunks (counters are kept) to limit
+    matching to one file. stats() reports chunks, bytes and embeddings saved.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        near: bool = True,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.near = near
+        self._hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+        self.new_scope()
+        self.seen = 0
+        self.exact_dupes = 0
+        self.near_dupes = 0
+        self.bytes_saved = 0
+        self.busy_s = 0.0
+        self.duplicates: Dict[str, str] = {}
+
+    def new_scope(self) -> None:
+        with self._lock:
+            self._exact: Dict[str, str] = {}
+            self._buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+            self._signatures: List[np.ndarray] = []
+            self._kept_ids: List[str] = []
+
+    def _near_match(self, sig: np.ndarray) -> Tuple[Optional[int], List[Tuple[int, bytes]]]:
+        keys = [(b, sig[b * self.rows:(b + 1) * self.rows].tobytes()) for b in range(self.bands)]
+        candidates = {i for key in keys for i in self._buckets.get(key, ())}
+        best, best_sim = None, self.threshold
+        for i in candidates:
+            sim = float(np.mean(self._signatures[i] == sig))
+            if sim >= best_sim:
+                best, best_sim = i, sim
+        return best, keys
+
+    def is_duplicate(self, text: str, chunk_id: str) -> Optional[str]:
+        """Register `text`; return the ID of the kept chunk it duplicates, or None if kept."""
+        with self._lock:
+            self.seen += 1
+            key = text_key(text)
+            original = self._exact.get(key)
+            if original is not None:
+                self.exact_dupes += 1
+            elif self.near:
+                sig = self._hasher.signature(shingles(text, self.shingle_size))
+                match, band_keys = self._near_match(sig)
+                if match is not None:
+                    original = self._kept_ids[match]
+                    self.near_dupes += 1
+                else:
+                    idx = len(self._signatures)
+                    self._signatures.append(sig)
+                    self._kept_ids.append(chunk_id)
+                    for bk in band_keys:
+                        self._buckets[bk].append(idx)
+            if original is None:
+                self._exact[key] = chunk_id
+                return None
+            self.bytes_saved += len(text.encode("utf-8"))
+            self.duplicates[chunk_id] = original
+            return original
+
+    def filter(self, chunks: Sequence[Any]) -> List[Any]:
+        """Keep the chunks (LangChain Documents with metadata["id"]) that are not duplicates."""
+        start = time.perf_counter()
+        kept = [c for c in chunks if self.is_duplicate(c.page_content, c.metadata.get("id", "")) is None]
+        with self._lock:
+            self.busy_s += time.perf_counter() - start
+        return kept
+
+    def stats(self, vector_bytes: int = 0) -> Dict[str, Any]:
+        """
+        Counts so far. vector_bytes (bytes stored per point for its vectors,
+        e.g. 384 * 4 for float32 MiniLM) adds an estimate of vector storage saved.
+        """
+        with self._lock:
+            dropped = self.exact_dupes + self.near_dupes
+            return {
+                "chunks_seen": self.seen,
+                "exact_duplicates": self.exact_dupes,
+                "near_duplicates": self.near_dupes,
+                "embeddings_saved": dropped,
+                "text_bytes_saved": self.bytes_saved,
+                "vector_bytes_saved": dropped * vector_bytes,
+                "dedup_rate": (dropped / self.seen) if self.seen else 0.0,
+                "busy_s": round(self.busy_s, 3),
+            }
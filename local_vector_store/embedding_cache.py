@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize chunk text before hashing so that cosmetic differences
+    (Unicode composition, runs of whitespace, leading/trailing blanks)
+    map to the same cache entry.
+    """
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def text_key(text: str) -> str:
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class _ModelStore:
+    """
+    Append-only on-disk store for one embedding model.
+
+    Layout under <cache_dir>/<model-slug>/:
+      - values.f32   float32 buffer, memory-mapped for reads
+      - indices.u32  uint32 buffer with the non-zero positions (sparse models only)
+      - index.jsonl  journal, one line per flush:
+                     {"end": data length covered, "entries": {text_hash: [offset, length]}}
+
+    Dense rows always have length == embedding dim, so for a dense model
+    values.f32 is effectively a row-major (n, dim) matrix.
+
+    A flush appends the data, then one journal line, so its cost scales with
+    the batch, not the cache. On open, journal lines are replayed up to the
+    first one that is torn or covers more data than the buffers hold; data
+    past the last good line (a crash between the two appends) is truncated,
+    which keeps values.f32 and indices.u32 aligned.
+    """
+
+    def __init__(self, root: Path, sparse: bool):
+        self.root = root
+        self.sparse = sparse
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.values_path = root / "values.f32"
+        self.indices_path = root / "indices.u32"
+        self.journal_path = root / "index.jsonl"
+
+        self.index: Dict[str, List[int]] = {}
+        self.size = self._recover()
+        self._values_map: Optional[np.memmap] = None
+        self._indices_map: Optional[np.memmap] = None
+        self._pending_values: List[np.ndarray] = []
+        self._pending_indices: List[np.ndarray] = []
+        self._pending: Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]] = {}
+        self._flushed_size = self.size
+
+    def _items_on_disk(self, path: Path) -> int:
+        return path.stat().st_size // 4 if path.exists() else 0
+
+    def _recover(self) -> int:
+        """Replay the journal, drop anything it doesn't cover, return the committed data length."""
+        available = self._items_on_disk(self.values_path)
+        if self.sparse:
+            available = min(available, self._items_on_disk(self.indices_path))
+
+        self._migrate_index_json(available)
+
+        end, good_bytes = 0, 0
+        if self.journal_path.exists():
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    if not line.endswith(b"\n") or record["end"] > available:
+                        break
+                    self.index.update(record["entries"])
+                    end = record["end"]
+                    good_bytes += len(line)
+            if good_bytes < self.journal_path.stat().st_size:
+                os.truncate(self.journal_path, good_bytes)
+
+        for path in (self.values_path, self.indices_path) if self.sparse else (self.values_path,):
+            if path.exists() and path.stat().st_size > end * 4:
+                os.truncate(path, end * 4)
+        return end
+
+    def _migrate_index_json(self, available: int) -> None:
+        # Caches written before the journal kept one index.json rewritten on every flush.
+        legacy = self.root / "index.json"
+        if not legacy.exists() or self.journal_path.exists():
+            return
+        try:
+            with open(legacy, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except ValueError:
+            index = {}
+        entries = {k: v for k, v in index.items() if v[0] + v[1] <= available}
+        end = max((o + n for o, n in entries.values()), default=0)
+        self._append_journal(end, entries)
+        legacy.unlink()
+
+    def _append_journal(self, end: int, entries: Dict[str, List[int]]) -> None:
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"end": end, "entries": entries}) + "\n")
+
+    def _maps(self) -> Tuple[np.memmap, Optional[np.memmap]]:
+        mapped = 0 if self._values_map is None else self._values_map.shape[0]
+        if mapped < self._flushed_size:
+            self._values_map = np.memmap(
+                self.values_path, dtype=np.float32, mode="r", shape=(self._flushed_size,)
+            )
+            if self.sparse:
+                self._indices_map = np.memmap(
+                    self.indices_path, dtype=np.uint32, mode="r", shape=(self._flushed_size,)
+                )
+        return self._values_map, self._indices_map
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        if key in self._pending:
+            return self._pending[key]
+        loc = self.index.get(key)
+        if loc is None:
+            return None
+        offset, length = loc
+        values, indices = self._maps()
+        v = np.array(values[offset:offset + length])
+        i = np.array(indices[offset:offset + length]) if self.sparse else None
+        return v, i
+
+    def put(self, key: str, values: np.ndarray, indices: Optional[np.ndarray] = None) -> None:
+        values = np.asarray(values, dtype=np.float32).ravel()
+        if self.sparse:
+            indices = np.asarray(indices, dtype=np.uint32).ravel()
+        self.index[key] = [self.size, int(values.shape[0])]
+        self.size += int(values.shape[0])
+        self._pending_values.append(values)
+        if self.sparse:
+            self._pending_indices.append(indices)
+        self._pending[key] = (values, indices)
+
+    @staticmethod
+    def _append_data(path: Path, arrays: List[np.ndarray]) -> None:
+        with open(path, "ab") as f:
+            for arr in arrays:
+                f.write(arr.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def flush(self) -> None:
+        if not self._pending_values:
+            return
+        self._append_data(self.values_path, self._pending_values)
+        if self.sparse:
+            self._append_data(self.indices_path, self._pending_indices)
+        # Journal last: a line is only written once the data it covers is on disk.
+        entries = {key: self.index[key] for key in self._pending}
+        self._append_journal(self.size, entries)
+
+        self._pending_values.clear()
+        self._pending_indices.clear()
+        self._pending.clear()
+        self._flushed_size = self.size
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed by (model name, normalized chunk text hash).
+
+    Both dense and sparse FastEmbed outputs are supported:
+      - dense entries are returned as 1-D float32 arrays
+      - sparse entries are returned as (indices, values) array pairs
+
+    Safe to share between threads of one process (not between processes);
+    call flush() (VectorDB.add does this) to persist.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._stores: Dict[str, _ModelStore] = {}
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def _store(self, model_name: str, sparse: bool) -> _ModelStore:
+        store = self._stores.get(model_name)
+        if store is None:
+            slug = model_name.replace("/", "__")
+            store = _ModelStore(self.cache_dir / slug, sparse=sparse)
+            self._stores[model_name] = store
+        return store
+
+    def get_or_embed(
+        self,
+        model_name: str,
+        texts: Sequence[str],
+        embed_fn: Callable[[List[str]], Iterable[Any]],
+        sparse: bool = False,
+    ) -> List[Any]:
+        """
+        Return one embedding per text, calling embed_fn only for cache misses.
+
+        embed_fn receives the list of missing texts and must yield, in order,
+        either dense vectors (array-like) or FastEmbed sparse embeddings
+        (objects with .indices and .values).
+        """
+        keys = [text_key(t) for t in texts]
+
+        with self._lock:
+            store = self._store(model_name, sparse)
+            missing: Dict[str, str] = {}
+            for key, text in zip(keys, texts):
+                if key not in missing and store.get(key) is None:
+                    missing[key] = text
+            # Repeats inside one batch are embedded once, so they count as hits.
+            self.hits[model_name] = self.hits.get(model_name, 0) + len(keys) - len(missing)
+            self.misses[model_name] = self.misses.get(model_name, 0) + len(missing)
+
+        # Embed outside the lock so concurrent callers don't serialize on it.
+        embedded = list(embed_fn(list(missing.values()))) if missing else []
+
+        with self._lock:
+            for key, emb in zip(missing.keys(), embedded):
+                if store.get(key) is not None:
+                    continue  # another thread got there first
+                if sparse:
+                    store.put(key, emb.values, emb.indices)
+                else:
+                    store.put(key, emb)
+
+            out: List[Any] = []
+            for key in keys:
+                values, indices = store.get(key)
+                out.append((indices, values) if sparse else values)
+            return out
+
+    def flush(self) -> None:
+        with self._lock:
+            for store in self._stores.values():
+                store.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        models = sorted(set(self.hits) | set(self.misses))
+        per_model = {}
+        for m in models:
+            h, mi = self.hits.get(m, 0), self.misses.get(m, 0)
+            per_model[m] = {
+                "hits": h,
+                "misses": mi,
+                "hit_rate": h / (h + mi) if (h + mi) else 0.0,
+                "entries": len(self._stores[m].index) if m in self._stores else 0,
+            }
+        total_h = sum(self.hits.values())
+        total_m = sum(self.misses.values())
+        return {
+            "hits": total_h,
+            "misses": total_m,
+            "hit_rate": total_h / (total_h + total_m) if (total_h + total_m) else 0.0,
+            "models": per_model,
+        }
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = ".ingest_manifest.json"
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ManifestDiff(NamedTuple):
+    new: List[str]
+    changed: List[str]
+    removed: List[str]
+    unchanged: List[str]
+
+    @property
+    def to_parse(self) -> List[str]:
+        return self.new + self.changed
+
+    @property
+    def to_delete(self) -> List[str]:
+        return self.changed + self.removed
+
+
+class IngestManifest:
+    """
+    What has been ingested from a data directory, persisted next to it
+    (<data>/.ingest_manifest.json):
+
+        {"version": 1, "collection": "...",
+         "files": {"data/x.pdf": {"size": ..., "mtime_ns": ..., "sha256": "...",
+                                   "point_ids": [...]}}}
+
+    diff() compares the manifest with the files on disk. Size + mtime decide
+    "unchanged" without reading the file; only when they differ is the content
+    hash computed, so touching a file doesn't trigger a re-ingest.
+    """
+
+    def __init__(self, data_path: str, collection_name: str):
+        self.path = Path(data_path) / MANIFEST_NAME
+        self.collection_name = collection_name
+        self.files: Dict[str, Dict] = {}
+        self._hashes: Dict[str, str] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # A manifest for another collection (or format) says nothing about this one.
+            if data.get("version") == MANIFEST_VERSION and data.get("collection") == collection_name:
+                self.files = data.get("files", {})
+
+    def reset(self) -> None:
+        """Forget everything (e.g. the collection was dropped)."""
+        self.files = {}
+
+    def diff(self, paths: Sequence[str]) -> ManifestDiff:
+        new, changed, unchanged = [], [], []
+        for path in paths:
+            entry = self.files.get(path)
+            if entry is None:
+                new.append(path)
+                continue
+            st = os.stat(path)
+            if st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]:
+                unchanged.append(path)
+                continue
+            digest = file_sha256(path)
+            self._hashes[path] = digest
+            if digest == entry["sha256"]:
+                # Same content, new mtime: refresh the stat fields only.
+                entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+                unchanged.append(path)
+            else:
+                changed.append(path)
+        current = set(paths)
+        removed = sorted(p for p in self.files if p not in current)
+        return ManifestDiff(new, changed, removed, unchanged)
+
+    def record(self, path: str, point_ids: Sequence[str]) -> None:
+        st = os.stat(path)
+        self.files[path] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": self._hashes.pop(path, None) or file_sha256(path),
+            "point_ids": list(point_ids),
+        }
+
+    def forget(self, path: str) -> None:
+        self.files.pop(path, None)
+
+    def point_ids(self, path: str) -> List[str]:
+        entry: Optional[Dict] = self.files.get(path)
+        return list(entry["point_ids"]) if entry else []
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": MANIFEST_VERSION, "collection": self.collection_name, "files": self.files},
+                f,
+                indent=1,
+            )
+        os.replace(tmp, self.path)
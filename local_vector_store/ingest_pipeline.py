@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from parallel_loader import load_file
+from vector_db import PAYLOAD_INDEX_SPECS, VectorDB, point_id
+
+_DONE = object()
+
+# Loader metadata copied into payloads: every indexable field (e.g. the typed
+# Quarto front matter) except those chunk_payload()/prepare_metadatas() set.
+_PAYLOAD_FIELDS = tuple(
+    name for name, _ in PAYLOAD_INDEX_SPECS if name not in ("source", "source_id", "doc_id", "chunk_id", "chunk_index")
+)
+
+
+def chunk_payload(chunk) -> Dict[str, Any]:
+    """Payload for one split chunk: source_id (chunk ID), source (= doc_id), page and indexed loader fields."""
+    meta = {"source_id": chunk.metadata["id"], "source": chunk.metadata.get("source")}
+    for name in _PAYLOAD_FIELDS:
+        if chunk.metadata.get(name) is not None:
+            meta[name] = chunk.metadata[name]
+    return meta
+
+
+@dataclass
+class StageStats:
+    name: str
+    items: int = 0
+    bytes: int = 0
+    busy_s: float = 0.0
+    max_queue_depth: int = 0
+    _depth_total: int = 0
+    _depth_samples: int = 0
+
+    def sample_depth(self, depth: int) -> None:
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "bytes": self.bytes,
+            "busy_s": round(self.busy_s, 3),
+            "items_per_s": round(self.items / self.busy_s, 1) if self.busy_s else None,
+            "avg_queue_depth": round(self._depth_total / self._depth_samples, 2) if self._depth_samples else 0,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+@dataclass
+class _Batch:
+    texts: List[str] = field(default_factory=list)
+    payloads: List[Dict[str, Any]] = field(default_factory=list)
+    ids: List[str] = field(default_factory=list)
+    # Files whose last new chunk is in this batch (or earlier): once the batch
+    # is written, every chunk of these files is in the collection. Each entry
+    # is (path, point IDs kept, chunk IDs before filter_fn).
+    completed: List[Tuple[str, List[str], List[str]]] = field(default_factory=list)
+
+
+class IngestPipeline:
+    """
+    Streaming ingestion: load -> split -> embed -> upsert.
+
+    Each stage is a thread connected to the next by a bounded queue, so PDF
+    parsing (in a process pool), splitting, ONNX embedding and network writes
+    overlap, and a slow stage back-pressures the ones before it instead of
+    letting work pile up. At most `queue_size` items wait between two stages
+    and the loader keeps at most `load_workers * 2` files in flight, so peak
+    memory depends on those bounds and the largest file, not on corpus size.
+
+    split_fn turns one file's documents into chunks carrying metadata["id"]
+    (the ingestion script passes its splitter + calculate_chunk_ids); the
+    optional filter_fn then drops chunks (e.g. dedup). Only chunks whose
+    deterministic point ID is not yet stored are embedded (checked per file;
+    timed as the "lookup" stage). Once a file is written, points stored for
+    its chunk IDs under other point IDs (pre-UUIDv5 points, old versions) are
+    deleted, so upgrading an existing collection doesn't duplicate it. run() returns
+    {path: point IDs} for every file that was fully written; stats() reports
+    per-stage items, bytes, busy time, throughput and queue depth.
+    """
+
+    def __init__(
+        self,
+        db: VectorDB,
+        files: Sequence[str],
+        split_fn: Callable[[list], list],
+        filter_fn: Optional[Callable[[list], list]] = None,
+        load_workers: int = 2,
+        embed_batch_size: int = 64,
+        queue_size: int = 4,
+        progress_interval: Optional[float] = 5.0,
+    ):
+        self.db = db
+        self.files = list(files)
+        self.split_fn = split_fn
+        self.filter_fn = filter_fn
+        self.load_workers = max(1, load_workers)
+        self.embed_batch_size = embed_batch_size
+        self.progress_interval = progress_interval
+        self._docs_q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._batches_q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._points_q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._stats = {name: StageStats(name) for name in ("load", "split", "lookup", "embed", "upsert")}
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._written: Dict[str, List[str]] = {}
+        self.superseded_deleted = 0
+        self._started: Optional[float] = None
+
+    # -- plumbing ------------------------------------------------------------
+    def _put(self, q: "queue.Queue", item: Any, stats: StageStats) -> None:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                stats.sample_depth(q.qsize())
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: "queue.Queue") -> Any:
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _run_stage(self, fn: Callable[[], None], out_q: Optional["queue.Queue"]) -> None:
+        try:
+            fn()
+        except BaseException as e:  # surface in run(), stop the other stages
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            if out_q is not None:
+                self._put(out_q, _DONE, StageStats("sentinel"))
+
+    # -- stages --------------------------------------------------------------
+    def _iter_loaded(self) -> Iterator[Tuple[str, list, float]]:
+        """Parse files in a process pool, yielding in file order with bounded look-ahead."""
+        if self.load_workers == 1:
+            for path in self.files:
+                docs, seconds = load_file(path)
+                yield path, docs, seconds
+            return
+        with ProcessPoolExecutor(max_workers=self.load_workers) as pool:
+            in_flight: "queue.SimpleQueue" = queue.SimpleQueue()
+            pending = iter(self.files)
+            for path in pending:
+                in_flight.put((path, pool.submit(load_file, path)))
+                if in_flight.qsize() >= self.load_workers * 2:
+                    break
+            while not in_flight.empty() and not self._stop.is_set():
+                path, future = in_flight.get()
+                docs, seconds = future.result()
+                nxt = next(pending, None)
+                if nxt is not None:
+                    in_flight.put((nxt, pool.submit(load_file, nxt)))
+                yield path, docs, seconds
+
+    def _load(self) -> None:
+        stats = self._stats["load"]
+        for path, docs, seconds in self._iter_loaded():
+            stats.items += 1
+            stats.bytes += os.path.getsize(path)
+            stats.busy_s += seconds
+            self._put(self._docs_q, (path, docs), stats)
+
+    def _split(self) -> None:
+        stats = self._stats["split"]
+        lookup = self._stats["lookup"]
+        batch = _Batch()
+        while True:
+            item = self._get(self._docs_q)
+            if item is _DONE:
+                break
+            t0 = time.perf_counter()
+            path, docs = item
+            chunks = self.split_fn(docs)
+            source_ids = [c.metadata["id"] for c in chunks]
+            if self.filter_fn is not None:
+                chunks = self.filter_fn(chunks)
+            ids = [point_id(c.metadata["id"], c.page_content) for c in chunks]
+            stats.busy_s += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            existing = self.db.existing_ids(ids)
+            lookup.items += len(ids)
+            lookup.busy_s += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            for chunk, pid in zip(chunks, ids):
+                if pid in existing:
+                    continue
+                batch.texts.append(chunk.page_content)
+                batch.payloads.append(chunk_payload(chunk))
+                batch.ids.append(pid)
+                if len(batch.texts) >= self.embed_batch_size:
+                    stats.busy_s += time.perf_counter() - t0
+                    self._put(self._batches_q, batch, stats)
+                    t0 = time.perf_counter()
+                    batch = _Batch()
+            batch.completed.append((path, ids, source_ids))
+            stats.items += len(chunks)
+            stats.bytes += sum(len(c.page_content.encode("utf-8")) for c in chunks)
+            stats.busy_s += time.perf_counter() - t0
+        if batch.texts or batch.completed:
+            self._put(self._batches_q, batch, stats)
+
+    def _embed(self) -> None:
+        stats = self._stats["embed"]
+        while True:
+            batch = self._get(self._batches_q)
+            if batch is _DONE:
+                break
+            t0 = time.perf_counter()
+            points = list(
+                self.db.iter_embedded_points(
+                    batch.texts, batch.payloads, batch.ids, batch_size=max(1, len(batch.texts))
+                )
+            ) if batch.texts else []
+            stats.items += len(points)
+            stats.bytes += sum(len(t.encode("utf-8")) for t in batch.texts)
+            stats.busy_s += time.perf_counter() - t0
+            self._put(self._points_q, (points, batch.completed), stats)
+
+    def _upsert(self) -> None:
+        stats = self._stats["upsert"]
+        while True:
+            item = self._get(self._points_q)
+            if item is _DONE:
+                break
+            points, completed = item
+            t0 = time.perf_counter()
+            if points:
+                self.db.upload_embedded(points, batch_size=len(points))
+            if completed:
+                # One lookup per batch for all files it completes.
+                self.superseded_deleted += self.db.delete_superseded(
+                    [sid for _, _, source_ids in completed for sid in source_ids],
+                    [pid for _, ids, _ in completed for pid in ids],
+                )
+            stats.items += len(points)
+            stats.busy_s += time.perf_counter() - t0
+            for path, ids, _ in completed:
+                self._written[path] = ids
+
+    # -- driver --------------------------------------------------------------
+    def written(self) -> Dict[str, List[str]]:
+        """{path: point IDs} of the files fully written so far."""
+        return dict(self._written)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage items, busy time, throughput and queue depth on the stage's output."""
+        out = {name: s.as_dict() for name, s in self._stats.items()}
+        out["queue_depth_now"] = {
+            "docs": self._docs_q.qsize(), "batches": self._batches_q.qsize(), "points": self._points_q.qsize()
+        }
+        out["superseded_deleted"] = self.superseded_deleted
+        if self._started is not None:
+            out["elapsed_s"] = round(time.perf_counter() - self._started, 3)
+        return out
+
+    def _report(self) -> None:
+        s = self.stats()
+        depth = s["queue_depth_now"]
+        print(
+            f"[pipeline {s.get('elapsed_s', 0):.1f}s] files={s['load']['items']}/{len(self.files)} "
+            f"chunks={s['split']['items']} embedded={s['embed']['items']} written={s['upsert']['items']} "
+            f"queues docs={depth['docs']} batches={depth['batches']} points={depth['points']}"
+        )
+
+    def run(self) -> Dict[str, List[str]]:
+        self._started = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._run_stage, args=(self._load, self._docs_q), name="ingest-load"),
+            threading.Thread(target=self._run_stage, args=(self._split, self._batches_q), name="ingest-split"),
+            threading.Thread(target=self._run_stage, args=(self._embed, self._points_q), name="ingest-embed"),
+            threading.Thread(target=self._run_stage, args=(self._upsert, None), name="ingest-upsert"),
+        ]
+        for t in threads:
+            t.start()
+        last_report = time.perf_counter()
+        while any(t.is_alive() for t in threads):
+            threads[-1].join(timeout=0.2)
+            if self.progress_interval and time.perf_counter() - last_report >= self.progress_interval:
+                self._report()
+                last_report = time.perf_counter()
+        for t in threads:
+            t.join()
+        # Persist once per run, not per batch (see VectorDB.flush()).
+        self.db.flush()
+        if self._errors:
+            raise self._errors[0]
+        return dict(self._written)
@@ -0,0 +1,612 @@
+from __future__ import annotations
+
+import functools
+import json
+import math
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from qdrant_client.embed.schema_parser import ModelSchemaParser
+from qdrant_client.http import models as qm
+from qdrant_client.hybrid.fusion import distribution_based_score_fusion, reciprocal_rank_fusion
+from qdrant_client.qdrant_fastembed import QdrantFastembedMixin
+
+PointId = Union[str, int]
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _payload_value(payload: Dict[str, Any], key: str) -> Any:
+    value: Any = payload
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _lookup(values: Sequence[Any]) -> Union[frozenset, Sequence[Any]]:
+    """A set for O(1) membership tests, or the list itself if values aren't hashable."""
+    try:
+        return frozenset(values)
+    except TypeError:
+        return values
+
+
+Predicate = Callable[[PointId, Dict[str, Any]], bool]
+
+
+def _compile_condition(cond: Any) -> Predicate:
+    if isinstance(cond, qm.Filter):
+        return compile_filter(cond)
+    if isinstance(cond, qm.HasIdCondition):
+        ids = _lookup(cond.has_id)
+        return lambda point_id, payload: point_id in ids
+    if not isinstance(cond, qm.FieldCondition):
+        raise NotImplementedError(f"Unsupported filter condition for NumpyIndex: {type(cond).__name__}")
+
+    key, match, r = cond.key, cond.match, cond.range
+
+    def values_of(payload: Dict[str, Any]) -> Tuple[Any, List[Any]]:
+        value = _payload_value(payload, key)
+        return value, value if isinstance(value, list) else [value]
+
+    if isinstance(match, qm.MatchValue):
+        return lambda point_id, payload: match.value in values_of(payload)[1]
+    if isinstance(match, qm.MatchAny):
+        wanted = _lookup(match.any)
+        return lambda point_id, payload: any(v in wanted for v in values_of(payload)[1])
+    if isinstance(match, qm.MatchExcept):
+        excluded = _lookup(match.except_)
+
+        def except_matches(point_id: PointId, payload: Dict[str, Any]) -> bool:
+            value, values = values_of(payload)
+            return value is not None and all(v not in excluded for v in values)
+        return except_matches
+    if r is not None:
+        def range_matches(point_id: PointId, payload: Dict[str, Any]) -> bool:
+            nums = [v for v in values_of(payload)[1] if isinstance(v, (int, float))]
+            return any(
+                (r.gt is None or v > r.gt) and (r.gte is None or v >= r.gte)
+                and (r.lt is None or v < r.lt) and (r.lte is None or v <= r.lte)
+                for v in nums
+            )
+        return range_matches
+    raise NotImplementedError(f"Unsupported field condition for NumpyIndex: {cond}")
+
+
+def compile_filter(flt: Optional[qm.Filter]) -> Predicate:
+    """
+    Turn a Qdrant filter into a (point_id, payload) predicate. has_id and
+    match-any lists become sets once here, not once per point scanned.
+    """
+    if flt is None:
+        return lambda point_id, payload: True
+
+    def as_list(x):
+        if x is None:
+            return []
+        return x if isinstance(x, list) else [x]
+
+    must = [_compile_condition(c) for c in as_list(flt.must)]
+    must_not = [_compile_condition(c) for c in as_list(flt.must_not)]
+    should = [_compile_condition(c) for c in as_list(flt.should)]
+
+    def matches(point_id: PointId, payload: Dict[str, Any]) -> bool:
+        if not all(c(point_id, payload) for c in must):
+            return False
+        if any(c(point_id, payload) for c in must_not):
+            return False
+        if should and not any(c(point_id, payload) for c in should):
+            return False
+        return True
+    return matches
+
+
+class _Collection:
+    """
+    One collection on disk:
+      - meta.json       vector names, dim, sparse modifier
+      - ids.json        point IDs in row order
+      - payloads.json   payload per row (sidecar store)
+      - dense.npy       (n, dim) float32, unit-normalized, memory-mapped on load
+      - sparse.npz      CSR rows (indptr, indices, values) for the sparse vector
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        with open(root / "meta.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.dense_name: str = self.meta["dense_name"]
+        self.sparse_name: Optional[str] = self.meta.get("sparse_name")
+        self.dim: int = self.meta["dim"]
+
+        ids_path = root / "ids.json"
+        self.ids: List[PointId] = json.loads(ids_path.read_text(encoding="utf-8")) if ids_path.exists() else []
+        payload_path = root / "payloads.json"
+        self.payloads: List[Dict[str, Any]] = (
+            json.loads(payload_path.read_text(encoding="utf-8")) if payload_path.exists() else []
+        )
+        dense_path = root / "dense.npy"
+        self.dense = (
+            np.load(dense_path, mmap_mode="r") if dense_path.exists()
+            else np.zeros((0, self.dim), dtype=np.float32)
+        )
+        # Writes go to a writable buffer with spare rows (grown geometrically);
+        # self.dense is always the view of its first len(ids) rows.
+        self._buf: Optional[np.ndarray] = None
+        self.dirty = False
+        self.sparse_rows: List[Tuple[np.ndarray, np.ndarray]] = []
+        sparse_path = root / "sparse.npz"
+        if self.sparse_name and sparse_path.exists():
+            data = np.load(sparse_path)
+            indptr, indices, values = data["indptr"], data["indices"], data["values"]
+            self.sparse_rows = [
+                (indices[indptr[i]:indptr[i + 1]], values[indptr[i]:indptr[i + 1]])
+                for i in range(len(indptr) - 1)
+            ]
+        self.row_of: Dict[PointId, int] = {pid: i for i, pid in enumerate(self.ids)}
+        self._postings: Optional[Dict[int, Tuple[np.ndarray, np.ndarray]]] = None
+
+    # -- writes --------------------------------------------------------------
+    def _reserve(self, extra: int) -> np.ndarray:
+        """Writable buffer with room for `extra` more rows (amortized O(1) per row)."""
+        n = len(self.ids)
+        if self._buf is None or self._buf.shape[0] < n + extra:
+            capacity = max(n + extra, 2 * (self._buf.shape[0] if self._buf is not None else n), 64)
+            buf = np.empty((capacity, self.dim), dtype=np.float32)
+            buf[:n] = self.dense
+            self._buf = buf
+        return self._buf
+
+    def upsert(self, points: Sequence[qm.PointStruct]) -> None:
+        if not points:
+            return
+        buf = self._reserve(len(points))
+        for p in points:
+            vector = p.vector if isinstance(p.vector, dict) else {self.dense_name: p.vector}
+            v = np.asarray(vector[self.dense_name], dtype=np.float32)
+            v = v / max(float(np.linalg.norm(v)), 1e-12)
+            sparse = vector.get(self.sparse_name) if self.sparse_name else None
+            sparse_row = (
+                (np.asarray(sparse.indices, dtype=np.uint32), np.asarray(sparse.values, dtype=np.float32))
+                if sparse is not None else (np.zeros(0, np.uint32), np.zeros(0, np.float32))
+            )
+            pid = p.id
+            payload = dict(p.payload or {})
+            row = self.row_of.get(pid)
+            if row is None:
+                row = self.row_of[pid] = len(self.ids)
+                self.ids.append(pid)
+                self.payloads.append(payload)
+                if self.sparse_name:
+                    self.sparse_rows.append(sparse_row)
+            else:
+                self.payloads[row] = payload
+                if self.sparse_name:
+                    self.sparse_rows[row] = sparse_row
+            buf[row] = v
+        self.dense = buf[:len(self.ids)]
+        self._postings = None
+        self.dirty = True
+
+    def delete_rows(self, rows: Sequence[int]) -> int:
+        drop = set(rows)
+        if not drop:
+            return 0
+        keep = np.array([i for i in range(len(self.ids)) if i not in drop], dtype=np.int64)
+        self._buf = np.asarray(self.dense)[keep] if keep.size else np.zeros((0, self.dim), np.float32)
+        self.dense = self._buf
+        self.ids = [self.ids[i] for i in keep]
+        self.payloads = [self.payloads[i] for i in keep]
+        if self.sparse_name:
+            self.sparse_rows = [self.sparse_rows[i] for i in keep]
+        self.row_of = {pid: i for i, pid in enumerate(self.ids)}
+        self._postings = None
+        self.dirty = True
+        return len(drop)
+
+    def persist(self) -> None:
+        """Write the collection to disk if anything changed since the last persist."""
+        if not self.dirty:
+            return
+        _atomic_write_bytes(self.root / "ids.json", json.dumps(self.ids).encode("utf-8"))
+        _atomic_write_bytes(
+            self.root / "payloads.json", json.dumps(self.payloads, default=str).encode("utf-8")
+        )
+        tmp = self.root / "dense.tmp.npy"
+        np.save(tmp, np.ascontiguousarray(self.dense, dtype=np.float32))
+        # Writes always go through _buf, so self.dense no longer maps the file being replaced.
+        os.replace(tmp, self.root / "dense.npy")
+        if self.sparse_name:
+            lengths = [len(idx) for idx, _ in self.sparse_rows]
+            indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+            indices = (np.concatenate([idx for idx, _ in self.sparse_rows])
+                       if self.sparse_rows else np.zeros(0, np.uint32))
+            values = (np.concatenate([val for _, val in self.sparse_rows])
+                      if self.sparse_rows else np.zeros(0, np.float32))
+            tmp = self.root / "sparse.tmp.npz"
+            with open(tmp, "wb") as f:
+                np.savez(f, indptr=indptr, indices=indices, values=values)
+            os.replace(tmp, self.root / "sparse.npz")
+        self.dirty = False
+
+    # -- reads ---------------------------------------------------------------
+    def mask(self, flt: Optional[qm.Filter]) -> Optional[np.ndarray]:
+        if flt is None:
+            return None
+        matches = compile_filter(flt)
+        return np.fromiter(
+            (matches(pid, pl) for pid, pl in zip(self.ids, self.payloads)),
+            dtype=bool, count=len(self.ids),
+        )
+
+    def dense_scores(self, query: Sequence[float]) -> np.ndarray:
+        q = np.asarray(query, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        return np.asarray(self.dense @ q)
+
+    def sparse_scores(self, query: qm.SparseVector) -> np.ndarray:
+        """BM25-style scoring: sum over query terms of idf(term) * q_weight * doc_weight."""
+        if self._postings is None:
+            by_term: Dict[int, Tuple[List[int], List[float]]] = {}
+            for row, (idx, val) in enumerate(self.sparse_rows):
+                for t, v in zip(idx.tolist(), val.tolist()):
+                    docs, vals = by_term.setdefault(t, ([], []))
+                    docs.append(row)
+                    vals.append(v)
+            self._postings = {
+                t: (np.array(d, dtype=np.int64), np.array(v, dtype=np.float32))
+                for t, (d, v) in by_term.items()
+            }
+        n = len(self.ids)
+        scores = np.zeros(n, dtype=np.float32)
+        use_idf = self.meta.get("sparse_modifier") == "idf"
+        for t, qv in zip(query.indices, query.values):
+            postings = self._postings.get(int(t))
+            if postings is None:
+                continue
+            docs, vals = postings
+            idf = math.log((n - len(docs) + 0.5) / (len(docs) + 0.5) + 1.0) if use_idf else 1.0
+            scores[docs] += idf * qv * vals
+        return scores
+
+    def top_k(
+        self,
+        scores: np.ndarray,
+        limit: int,
+        mask: Optional[np.ndarray],
+        score_threshold: Optional[float],
+        require_positive: bool = False,
+    ) -> List[Tuple[int, float]]:
+        valid = np.ones(scores.shape[0], dtype=bool) if mask is None else mask.copy()
+        if score_threshold is not None:
+            valid &= scores >= score_threshold
+        if require_positive:
+            valid &= scores > 0
+        candidates = np.flatnonzero(valid)
+        if candidates.size == 0:
+            return []
+        cand_scores = scores[candidates]
+        if candidates.size > limit:
+            part = np.argpartition(-cand_scores, limit - 1)[:limit]
+            candidates, cand_scores = candidates[part], cand_scores[part]
+        order = np.argsort(-cand_scores, kind="stable")
+        return [(int(candidates[i]), float(cand_scores[i])) for i in order]
+
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class NumpyIndex(QdrantFastembedMixin):
+    """
+    Embedded, in-process vector index for small corpora.
+
+    Implements the subset of the QdrantClient API that VectorDB uses, so it can
+    stand in for a Qdrant server (VectorDB picks it for memory_location="file://<dir>"):
+      - dense search: one matrix-vector product over a memory-mapped float32
+        matrix + argpartition top-k
+      - sparse search: BM25-style scoring with IDF over an in-memory inverted index
+      - hybrid: prefetch legs fused with RRF or DBSF, like Qdrant's query API
+      - payload filters: must / should / must_not with match value/any/except,
+        range and has_id conditions
+
+    Writes are applied in memory (the matrix grows geometrically, so a stream
+    of small upserts costs amortized O(1) per row) and written to disk by
+    flush(), close() or export_collection(): one rewrite per ingestion run
+    rather than per batch. Opening an existing directory only maps the matrix
+    and reads the JSON sidecars.
+
+    One lock serializes every read and write, so the ingestion pipeline's
+    lookup and upsert threads (and concurrent queries) can share an index.
+    """
+
+    def __init__(self, path: str, **kwargs: Any):
+        super().__init__(parser=ModelSchemaParser(), **kwargs)
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._collections: Dict[str, _Collection] = {}
+        for sub in self.path.iterdir():
+            if (sub / "meta.json").exists():
+                self._collections[sub.name] = _Collection(sub)
+
+    @_locked
+    def flush(self) -> None:
+        """Persist every collection changed since the last flush."""
+        for coll in self._collections.values():
+            coll.persist()
+
+    @_locked
+    def close(self, **kwargs: Any) -> None:
+        self.flush()
+
+    def _get(self, collection_name: str) -> _Collection:
+        try:
+            return self._collections[collection_name]
+        except KeyError:
+            raise ValueError(f"Collection {collection_name} not found")
+
+    # -- collections ---------------------------------------------------------
+    @_locked
+    def collection_exists(self, collection_name: str, **kwargs: Any) -> bool:
+        return collection_name in self._collections
+
+    @_locked
+    def create_collection(
+        self,
+        collection_name: str,
+        vectors_config: Union[qm.VectorParams, Dict[str, qm.VectorParams]],
+        sparse_vectors_config: Optional[Dict[str, qm.SparseVectorParams]] = None,
+        **kwargs: Any,
+    ) -> bool:
+        # on_disk / quantization settings don't apply: the matrix is always mmapped.
+        if isinstance(vectors_config, dict):
+            (dense_name, params), = vectors_config.items()
+        else:
+            dense_name, params = "", vectors_config
+        sparse_name, modifier = None, None
+        if sparse_vectors_config:
+            (sparse_name, sparse_params), = sparse_vectors_config.items()
+            modifier = sparse_params.modifier.value if sparse_params.modifier else None
+        root = self.path / collection_name
+        root.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "dense_name": dense_name,
+            "dim": params.size,
+            "distance": params.distance.value,
+            "sparse_name": sparse_name,
+            "sparse_modifier": modifier,
+        }
+        _atomic_write_bytes(root / "meta.json", json.dumps(meta).encode("utf-8"))
+        self._collections[collection_name] = _Collection(root)
+        return True
+
+    @_locked
+    def delete_collection(self, collection_name: str, **kwargs: Any) -> bool:
+        coll = self._collections.pop(collection_name, None)
+        if coll is not None:
+            shutil.rmtree(coll.root, ignore_errors=True)
+        return coll is not None
+
+    @_locked
+    def export_collection(self, collection_name: str, archive_path: str) -> None:
+        """Pack the collection directory into a tar.gz archive (snapshot)."""
+        coll = self._get(collection_name)
+        coll.persist()
+        with tarfile.open(archive_path, "w:gz") as tar:
+            for f in sorted(coll.root.iterdir()):
+                if not f.name.endswith(".tmp") and ".tmp." not in f.name:
+                    tar.add(f, arcname=f.name)
+
+    @_locked
+    def import_collection(self, collection_name: str, archive_path: str) -> None:
+        """Replace (or create) a collection from an export_collection() archive."""
+        with tempfile.TemporaryDirectory(dir=self.path) as tmp:
+            staged = Path(tmp) / collection_name
+            staged.mkdir()
+            with tarfile.open(archive_path, "r:gz") as tar:
+                tar.extractall(staged, filter="data")
+            if not (staged / "meta.json").exists():
+                raise ValueError(f"{archive_path} is not a NumpyIndex snapshot")
+            self.delete_collection(collection_name)
+            shutil.move(str(staged), str(self.path / collection_name))
+        self._collections[collection_name] = _Collection(self.path / collection_name)
+
+    @_locked
+    def get_collection(self, collection_name: str, **kwargs: Any) -> SimpleNamespace:
+        coll = self._get(collection_name)
+        return SimpleNamespace(
+            status=qm.CollectionStatus.GREEN,
+            points_count=len(coll.ids),
+            vectors_count=len(coll.ids),
+            config=SimpleNamespace(params=SimpleNamespace(**coll.meta)),
+        )
+
+    @_locked
+    def count(self, collection_name: str, count_filter: Optional[qm.Filter] = None, **kwargs: Any):
+        coll = self._get(collection_name)
+        mask = coll.mask(count_filter)
+        return qm.CountResult(count=len(coll.ids) if mask is None else int(mask.sum()))
+
+    def create_payload_index(self, *args: Any, **kwargs: Any) -> None:
+        # Filters are evaluated by a linear scan; there is nothing to index.
+        return None
+
+    # -- points --------------------------------------------------------------
+    @_locked
+    def upsert(self, collection_name: str, points: Sequence[qm.PointStruct], **kwargs: Any):
+        self._get(collection_name).upsert(list(points))
+        return qm.UpdateResult(operation_id=0, status=qm.UpdateStatus.COMPLETED)
+
+    def upload_points(
+        self,
+        collection_name: str,
+        points: Iterable[qm.PointStruct],
+        batch_size: int = 64,
+        **kwargs: Any,
+    ) -> None:
+        coll = self._get(collection_name)
+        batch: List[qm.PointStruct] = []
+        for p in points:
+            batch.append(p)
+            if len(batch) >= batch_size:
+                # Lock per batch, not around the loop: `points` may be a lazy
+                # generator that embeds as it goes.
+                with self._lock:
+                    coll.upsert(batch)
+                batch = []
+        with self._lock:
+            coll.upsert(batch)
+
+    @_locked
+    def delete(self, collection_name: str, points_selector: Any, **kwargs: Any):
+        coll = self._get(collection_name)
+        if isinstance(points_selector, qm.FilterSelector):
+            mask = coll.mask(points_selector.filter)
+            rows = np.flatnonzero(mask).tolist()
+        else:
+            ids = points_selector.points if isinstance(points_selector, qm.PointIdsList) else points_selector
+            rows = [coll.row_of[i] for i in ids if i in coll.row_of]
+        coll.delete_rows(rows)
+        return qm.UpdateResult(operation_id=0, status=qm.UpdateStatus.COMPLETED)
+
+    @staticmethod
+    def _project(payload: Dict[str, Any], with_payload: Any) -> Optional[Dict[str, Any]]:
+        if with_payload is False or with_payload is None:
+            return None
+        if with_payload is True:
+            return dict(payload)
+        return {k: payload[k] for k in with_payload if k in payload}
+
+    @_locked
+    def retrieve(
+        self,
+        collection_name: str,
+        ids: Sequence[PointId],
+        with_payload: Any = True,
+        with_vectors: bool = False,
+        **kwargs: Any,
+    ) -> List[qm.Record]:
+        coll = self._get(collection_name)
+        return [
+            qm.Record(id=pid, payload=self._project(coll.payloads[coll.row_of[pid]], with_payload))
+            for pid in ids if pid in coll.row_of
+        ]
+
+    @_locked
+    def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[qm.Filter] = None,
+        limit: int = 10,
+        offset: Optional[int] = None,
+        with_payload: Any = True,
+        with_vectors: bool = False,
+        **kwargs: Any,
+    ) -> Tuple[List[qm.Record], Optional[int]]:
+        # Offsets are row positions (opaque to VectorDB, like Qdrant's page tokens).
+        coll = self._get(collection_name)
+        matches = compile_filter(scroll_filter)
+        start = int(offset or 0)
+        records: List[qm.Record] = []
+        row = start
+        while row < len(coll.ids) and len(records) < limit:
+            if matches(coll.ids[row], coll.payloads[row]):
+                records.append(qm.Record(
+                    id=coll.ids[row], payload=self._project(coll.payloads[row], with_payload)
+                ))
+            row += 1
+        return records, (row if row < len(coll.ids) else None)
+
+    # -- search --------------------------------------------------------------
+    def _leg(
+        self,
+        coll: _Collection,
+        query: Any,
+        using: Optional[str],
+        flt: Optional[qm.Filter],
+        limit: int,
+        score_threshold: Optional[float],
+    ) -> List[qm.ScoredPoint]:
+        mask = coll.mask(flt)
+        if isinstance(query, qm.SparseVector) or (using is not None and using == coll.sparse_name):
+            scores = coll.sparse_scores(query)
+            hits = coll.top_k(scores, limit, mask, score_threshold, require_positive=True)
+        else:
+            scores = coll.dense_scores(query)
+            hits = coll.top_k(scores, limit, mask, score_threshold)
+        return [
+            qm.ScoredPoint(id=coll.ids[row], version=0, score=score, payload=coll.payloads[row])
+            for row, score in hits
+        ]
+
+    @_locked
+    def query_points(
+        self,
+        collection_name: str,
+        query: Any = None,
+        using: Optional[str] = None,
+        prefetch: Optional[Union[qm.Prefetch, List[qm.Prefetch]]] = None,
+        query_filter: Optional[qm.Filter] = None,
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        with_payload: Any = True,
+        **kwargs: Any,
+    ) -> qm.QueryResponse:
+        coll = self._get(collection_name)
+        if prefetch:
+            prefetches = prefetch if isinstance(prefetch, list) else [prefetch]
+            legs = [
+                self._leg(coll, pf.query, pf.using, pf.filter or query_filter,
+                          pf.limit or limit, pf.score_threshold)
+                for pf in prefetches
+            ]
+            if isinstance(query, qm.FusionQuery) and query.fusion == qm.Fusion.DBSF:
+                points = distribution_based_score_fusion(legs, limit=limit)
+            elif isinstance(query, qm.FusionQuery):
+                points = reciprocal_rank_fusion(legs, limit=limit)
+            else:
+                raise NotImplementedError("NumpyIndex only supports fusion queries over prefetches")
+            if score_threshold is not None:
+                points = [p for p in points if p.score >= score_threshold]
+        else:
+            points = self._leg(coll, query, using, query_filter, limit, score_threshold)
+        for p in points:
+            p.payload = self._project(p.payload or {}, with_payload)
+        return qm.QueryResponse(points=points)
+
+    @_locked
+    def query_batch_points(
+        self, collection_name: str, requests: Sequence[qm.QueryRequest], **kwargs: Any
+    ) -> List[qm.QueryResponse]:
+        return [
+            self.query_points(
+                collection_name,
+                query=r.query,
+                using=r.using,
+                prefetch=r.prefetch,
+                query_filter=r.filter,
+                limit=r.limit or 10,
+                score_threshold=r.score_threshold,
+                with_payload=r.with_payload if r.with_payload is not None else True,
+            )
+            for r in requests
+        ]
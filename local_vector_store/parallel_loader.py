@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain.schema import Document
+from langchain_community.document_loaders import PyPDFLoader, UnstructuredFileLoader
+
+from qmd_loader import load_qmd
+
+# Same inputs the serial loaders picked up.
+MARKDOWN_GLOB = "*/*.md"        # DirectoryLoader(DATA_PATH, glob="*/*.md")
+PDF_GLOB = "**/[!.]*.pdf"       # PyPDFDirectoryLoader's default glob
+
+
+def list_input_files(data_path: str) -> List[Path]:
+    """Markdown files first, then PDFs, each sorted, so chunk order is stable."""
+    root = Path(data_path)
+    markdown = sorted(p for p in root.glob(MARKDOWN_GLOB) if p.is_file())
+    pdfs = sorted(p for p in root.glob(PDF_GLOB) if p.is_file())
+    return markdown + pdfs
+
+
+def load_file(path: str, extract_images: bool = False) -> Tuple[List[Document], float]:
+    """
+    Parse one file in a worker process: (documents, seconds).
+
+    PDFs yield one Document per page ('page' metadata from PyPDFLoader);
+    Quarto sources one per heading section (see qmd_loader). 'source' is set
+    to the path as given, like the directory loaders did, so
+    calculate_chunk_ids() produces the same IDs.
+    """
+    start = time.perf_counter()
+    if path.lower().endswith(".pdf"):
+        docs = PyPDFLoader(path, extract_images=extract_images).load()
+    elif path.lower().endswith(".qmd"):
+        docs = load_qmd(path)
+    else:
+        docs = UnstructuredFileLoader(path).load()
+    for doc in docs:
+        doc.metadata["source"] = path
+    return docs, time.perf_counter() - start
+
+
+def load_documents_parallel(
+    data_path: str,
+    workers: Optional[int] = None,
+    files: Optional[Sequence[str]] = None,
+    extract_images: bool = False,
+    verbose: bool = True,
+) -> Tuple[List[Document], Dict[str, float]]:
+    """
+    Parse every input file across a process pool.
+
+    PDF text extraction is CPU-bound and pure Python, so processes (not
+    threads) are what scale it across cores. Files are submitted largest
+    first to keep workers busy, but results are returned in list_input_files()
+    order with each file's pages in order. `files` restricts the load to a
+    subset (e.g. only new/changed files). Returns (documents, seconds per file).
+    """
+    files = list(files) if files is not None else [str(p) for p in list_input_files(data_path)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+    start = time.perf_counter()
+
+    results: Dict[str, Tuple[List[Document], float]] = {}
+    if workers == 1:
+        for f in files:
+            results[f] = load_file(f, extract_images)
+    else:
+        by_size = sorted(files, key=lambda f: os.path.getsize(f), reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {f: pool.submit(load_file, f, extract_images) for f in by_size}
+            for f, future in futures.items():
+                results[f] = future.result()
+
+    documents: List[Document] = []
+    timings: Dict[str, float] = {}
+    for f in files:
+        docs, seconds = results[f]
+        documents.extend(docs)
+        timings[f] = seconds
+        if verbose:
+            print(f"Parsed {f}: {len(docs)} document(s) in {seconds:.2f}s")
+    if verbose:
+        print(
+            f"Loaded {len(documents)} documents from {len(files)} files in "
+            f"{time.perf_counter() - start:.2f}s ({workers} worker(s), "
+            f"{sum(timings.values()):.2f}s total parse time)"
+        )
+    return documents, timings
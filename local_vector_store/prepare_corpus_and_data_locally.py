@@ -1,12 +1,24 @@
 "prepare_corpus_and_data_locally.py"
+import argparse
+import json
+import os
+import time
+
 from langchain.schema import Document
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import DirectoryLoader, PyPDFDirectoryLoader
 
+from collection_profiles import COLLECTION_PROFILES
+from dedup import ChunkDeduplicator
+from ingest_manifest import IngestManifest, ManifestDiff
+from ingest_pipeline import IngestPipeline
+from parallel_loader import list_input_files, load_documents_parallel
+from qmd_loader import list_qmd_files
 from vector_db import VectorDB
 
 DATA_PATH = "data"
+QMD_PATH = "quarto/recipes"
+EMBEDDING_CACHE_PATH = ".cache/embeddings"
 
 def calculate_chunk_ids(chunks):
     '''
@@ -37,85 +49,246 @@ def calculate_chunk_ids(chunks):
 
     return chunks
 
-def add_to_vectorstore(db, chunks):
-    # Calculate Page IDs.
-    chunks_with_ids = calculate_chunk_ids(chunks)
-
-    # Add or Update the documents.
-    existing_items = db.scroll_all()  # IDs are always included by default
-
-    existing_ids = []
-    if existing_items:
-        for item in existing_items:
-            existing_ids.append(item['metadata']['source_id'])
-    print(f"Number of existing documents in DB: {len(existing_ids)}")
-
-    # Only add documents that don't exist in the DB.
-    new_chunks = []
-    new_chunk_ids = []
-    for chunk in chunks_with_ids:
-        if chunk.metadata["id"] not in existing_ids:
-            new_chunks.append(chunk.page_content)
-            new_chunk_ids.append(chunk.metadata["id"])
-
-    print("CHUNK IDS:", new_chunk_ids)
-    if len(new_chunks):
-        batch_size = 50
-        for i in range(0, len(new_chunks), batch_size):
-            batch_docs = new_chunks[i:i+batch_size]
-            batch_ids = new_chunk_ids[i:i+batch_size]
-            print(f"Adding batch {i//batch_size + 1} with {len(batch_docs)} documents")
-            db.add_to_vectordb(batch_docs, source_ids=batch_ids)
-        print(f"Successfully added all {len(new_chunks)} documents")
-        # db.persist()
-    else:
-        print("No new documents to add")
-
-def split_text(documents: list[Document]):
-    # Split documents into chunks
-    text_splitter = RecursiveCharacterTextSplitter(
+def make_text_splitter():
+    return RecursiveCharacterTextSplitter(
         chunk_size = 800,
         chunk_overlap = 400,
         length_function = len,
         add_start_index = True,
     )
-    chunks = text_splitter.split_documents(documents)
+
+def split_text(documents: list[Document]):
+    # Split documents into chunks
+    chunks = make_text_splitter().split_documents(documents)
     print(f"Split {len(documents)} documents into {len(chunks)} chunks.")
+    return chunks
 
-    document = chunks[1]
-    # print(document.page_content)
-    # print(document.metadata)
+def load_documents(workers=None, files=None):
+    # Load documents from datapath: markdown + PDFs, parsed across a process
+    # pool (one file per task), with per-file parse times printed.
+    documents, _ = load_documents_parallel(DATA_PATH, workers=workers, files=files, extract_images=False)
+    return documents
 
-    return chunks
+def dense_vector_bytes(db):
+    """Bytes per stored float32 dense vector."""
+    return next(iter(db.client.get_fastembed_vector_params().values())).size * 4
+
+def print_dedup_report(db, dedup):
+    stats = dedup.stats(vector_bytes=dense_vector_bytes(db))
+    print(
+        f"Dedup: dropped {stats['exact_duplicates']} exact + {stats['near_duplicates']} near-duplicate "
+        f"of {stats['chunks_seen']} chunks ({stats['dedup_rate']:.1%}); saved {stats['embeddings_saved']} "
+        f"embeddings, {stats['text_bytes_saved']} text bytes, ~{stats['vector_bytes_saved']} dense vector bytes"
+    )
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its (loader) children, in MiB."""
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    scale = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+def ingest_report(diff, wall_s, pipeline=None, dedup=None, vector_bytes=0):
+    """Machine-readable summary of one generate_data_store() run."""
+    stages = pipeline.stats() if pipeline is not None else {}
+    split = stages.get("split", {})
+    chunks = split.get("items", 0)
+    text_bytes = split.get("bytes", 0)
+    stage_s = {name: stages[name]["busy_s"] for name in ("load", "split", "lookup", "embed", "upsert") if name in stages}
+    if dedup is not None and "split" in stage_s:
+        # split_fn runs the dedup filter; report it as its own stage.
+        stage_s["dedup"] = dedup.stats()["busy_s"]
+        stage_s["split"] = round(max(0.0, stage_s["split"] - stage_s["dedup"]), 3)
+    return {
+        "files": {"new": len(diff.new), "changed": len(diff.changed),
+                  "removed": len(diff.removed), "unchanged": len(diff.unchanged)},
+        "chunks": chunks,
+        "chunks_embedded": stages.get("embed", {}).get("items", 0),
+        "input_bytes": stages.get("load", {}).get("bytes", 0),
+        "text_bytes": text_bytes,
+        "wall_s": round(wall_s, 3),
+        "chunks_per_s": round(chunks / wall_s, 1) if wall_s else None,
+        "bytes_per_s": round(text_bytes / wall_s, 1) if wall_s else None,
+        "stage_s": stage_s,
+        "stages": {name: stats for name, stats in stages.items() if name in stage_s},
+        "superseded_deleted": stages.get("superseded_deleted", 0),
+        "dedup": dedup.stats(vector_bytes) if dedup is not None else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def generate_data_store(
+    db, batch_size=64, load_workers=None, full=False, queue_size=4, dedup=None, dedup_scope="file", source="pdf",
+    data_path=DATA_PATH, qmd_path=QMD_PATH,
+):
+    """
+    Incremental ingestion driven by <data_path>/.ingest_manifest.json: only new or
+    changed files are parsed and embedded; chunks of changed or removed files
+    are deleted first (one filtered delete on doc_id/source).
+    full=True re-ingests every file.
 
-def load_documents():
-    # Load documents from datapath
-    documents_loader = DirectoryLoader(DATA_PATH, glob="*/*.md")
-    pdf_loader = PyPDFDirectoryLoader(DATA_PATH, extract_images=False)
-    documents = documents_loader.load()
-    pdfs = pdf_loader.load()
-    final_documents = documents + pdfs
-    print("PDF:\n", pdfs)
-    return final_documents
-
-def generate_data_store(db):
-    documents = load_documents()
-    chunks = split_text(documents)
-    
-    add_to_vectorstore(db, chunks)
+    New/changed files stream through IngestPipeline (load -> split -> embed ->
+    upsert over bounded queues), so memory stays flat as the corpus grows.
+    batch_size is the number of chunks embedded and upserted together.
+
+    dedup (a ChunkDeduplicator) drops exact and near-duplicate chunks before
+    embedding. With dedup_scope="file" only repeats within a file are dropped,
+    which keeps every file self-contained for incremental re-ingestion;
+    "run" also drops chunks repeated across the files parsed in this run.
+
+    source="qmd" reads <qmd_path>/**/*.qmd directly (no Quarto/LaTeX render,
+    typed front-matter payloads) instead of data/; the manifest is shared, so
+    switching source deletes the other source's chunks.
+
+    Returns ingest_report(): per-stage seconds, chunks/s, bytes/s, peak RSS.
+    """
+    start = time.perf_counter()
+    manifest = IngestManifest(data_path, db.collection_name)
+    if not db.client.collection_exists(db.collection_name):
+        manifest.reset()
+    if source == "qmd":
+        files = [str(p) for p in list_qmd_files(qmd_path)]
+    else:
+        files = [str(p) for p in list_input_files(data_path)]
+    diff = manifest.diff(files)
+    if full:
+        diff = ManifestDiff(new=[], changed=files, removed=diff.removed, unchanged=[])
+    print(
+        f"Manifest: {len(diff.new)} new, {len(diff.changed)} changed, "
+        f"{len(diff.removed)} removed, {len(diff.unchanged)} unchanged file(s)"
+    )
+
+    if diff.to_delete:
+        db.delete_by_source(diff.to_delete)
+        for path in diff.removed:
+            manifest.forget(path)
+        print(f"Deleted chunks of {len(diff.to_delete)} changed/removed file(s)")
+
+    pipeline = None
+    if diff.to_parse:
+        splitter = make_text_splitter()
+
+        def split_fn(docs):
+            return calculate_chunk_ids(splitter.split_documents(docs))
+
+        def dedup_fn(chunks):
+            if dedup_scope == "file":
+                dedup.new_scope()
+            return dedup.filter(chunks)
+
+        pipeline = IngestPipeline(
+            db,
+            diff.to_parse,
+            split_fn=split_fn,
+            filter_fn=dedup_fn if dedup is not None else None,
+            # .qmd files parse in milliseconds: not worth a process pool.
+            load_workers=load_workers or (1 if source == "qmd" else os.cpu_count() or 1),
+            embed_batch_size=batch_size,
+            queue_size=queue_size,
+        )
+        try:
+            written = pipeline.run()
+        finally:
+            # Record whatever was fully written, even if a later file failed.
+            for path, ids in pipeline.written().items():
+                manifest.record(path, ids)
+            manifest.save()
+        for stage, s in pipeline.stats().items():
+            print(f"  {stage}: {s}")
+        if pipeline.superseded_deleted:
+            print(f"Deleted {pipeline.superseded_deleted} superseded point(s) (pre-UUIDv5 IDs or old chunk versions)")
+        print(f"Ingested {len(written)} file(s)")
+        db.ensure_payload_indexes()
+        if dedup is not None:
+            print_dedup_report(db, dedup)
+
+    manifest.save()
+    wall_s = time.perf_counter() - start
+    print(f"Ingestion finished in {wall_s:.2f}s")
+    return ingest_report(diff, wall_s, pipeline, dedup, dense_vector_bytes(db) if dedup is not None else 0)
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Load, split, embed and upload data/ into Qdrant")
+    p.add_argument("--url", default="localhost",
+                   help="Qdrant location: URL, host or ':memory:' (default: localhost)")
+    p.add_argument("--grpc", action="store_true", help="Use gRPC transport (server mode only)")
+    p.add_argument("--batch-size", type=int, default=64,
+                   help="Chunks embedded and upserted per pipeline batch (default: 64)")
+    p.add_argument("--queue-size", type=int, default=4,
+                   help="Max items waiting between pipeline stages (default: 4)")
+    p.add_argument("--source", choices=["pdf", "qmd"], default="pdf",
+                   help="Ingest rendered PDFs from data/ or Quarto sources from quarto/recipes/ (default: pdf)")
+    p.add_argument("--data-path", default=DATA_PATH,
+                   help=f"Directory with the rendered inputs and the ingest manifest (default: {DATA_PATH})")
+    p.add_argument("--qmd-path", default=QMD_PATH,
+                   help=f"Directory with the .qmd sources for --source qmd (default: {QMD_PATH})")
+    p.add_argument("--report", default=None,
+                   help="Write a JSON ingestion report to this file and skip the demo query")
+    p.add_argument("--load-workers", type=int, default=None,
+                   help="Processes used to parse documents (default: all cores)")
+    p.add_argument("--full", action="store_true",
+                   help="Re-ingest every file instead of only new/changed ones")
+    p.add_argument("--dedup", choices=["file", "run"], default=None,
+                   help="Drop exact/near-duplicate chunks before embedding, within each file or across the run")
+    p.add_argument("--dedup-threshold", type=float, default=0.85,
+                   help="MinHash Jaccard similarity above which a chunk counts as a near duplicate (default: 0.85)")
+    p.add_argument("--profile", default="default", choices=sorted(COLLECTION_PROFILES),
+                   help="Storage profile used if the collection is created (default: default)")
+    p.add_argument("--threads", type=int, default=None, help="ONNX threads per embedding model (default: all cores)")
+    p.add_argument("--embed-batch-size", type=int, default=None, help="Passages per embedding batch (default: FastEmbed's)")
+    p.add_argument("--model-cache-dir", default=None, help="Where FastEmbed stores downloaded models")
+    p.add_argument("--snapshot-out", default=None,
+                   help="After ingesting, export a snapshot of the collection into this directory")
+    return p.parse_args()
 
 if __name__ == "__main__":
+    args = parse_args()
     # Create a new vector store
     vector_store = VectorDB(
         embeddings_model_name="sentence-transformers/all-MiniLM-L6-v2", 
-        memory_location="localhost", 
-        vector_size=384
+        memory_location=args.url, 
+        vector_size=384,
+        prefer_grpc=args.grpc,
+        collection_profile=args.profile,
+        embedding_cache_dir=EMBEDDING_CACHE_PATH,
+        embedding_threads=args.threads,
+        embedding_batch_size=args.embed_batch_size,
+        model_cache_dir=args.model_cache_dir,
+        # Models load on first embed, so a no-change run never pays for them.
+        warm_up_on_init=False,
     )
-    generate_data_store(vector_store)
-
-    query_rag = "Banana Bread"
-    print("Querying RAG")
-    results = vector_store.query(query_text=query_rag, limit=2, score_threshold=0)
-    for i, r in enumerate(results, 1):
-        print(f"\nResult {i}: score={r.get('score')}")
-        print("Snippet:", (r.get("page_content") or "")[:200].replace("\n", " "), "…")
\ No newline at end of file
+    report = generate_data_store(
+        vector_store,
+        batch_size=args.batch_size,
+        load_workers=args.load_workers,
+        queue_size=args.queue_size,
+        full=args.full,
+        source=args.source,
+        data_path=args.data_path,
+        qmd_path=args.qmd_path,
+        dedup=ChunkDeduplicator(threshold=args.dedup_threshold) if args.dedup else None,
+        dedup_scope=args.dedup or "file",
+    )
+    if args.snapshot_out:
+        print(f"Snapshot manifest: {vector_store.export_snapshot(args.snapshot_out)}")
+
+    if args.report:
+        report["config"] = {
+            "url": args.url, "source": args.source, "batch_size": args.batch_size, "queue_size": args.queue_size,
+            "load_workers": args.load_workers, "dedup": args.dedup, "threads": args.threads,
+        }
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}")
+    else:
+        query_rag = "Banana Bread"
+        print("Querying RAG")
+        results = vector_store.query(query_text=query_rag, limit=2, score_threshold=0)
+        for i, r in enumerate(results, 1):
+            print(f"\nResult {i}: score={r.get('score')}")
+            print("Snippet:", (r.get("page_content") or "")[:200].replace("\n", " "), "…")
\ No newline at end of file
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import importlib.util
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain.schema import Document
+
+QUARTO_TEXT_PATH = Path(__file__).resolve().parents[1] / "src" / "quarto_text.py"
+
+
+def _load_quarto_text():
+    """
+    quarto_text lives next to the render script in src/, which is not a
+    package; load it by path instead of adding src/ to sys.path on import.
+    """
+    spec = importlib.util.spec_from_file_location("_qmd_loader_quarto_text", QUARTO_TEXT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_quarto_text = _load_quarto_text()
+normalize_text_for_pdf = _quarto_text.normalize_text_for_pdf
+parse_front_matter = _quarto_text.parse_front_matter
+split_front_matter = _quarto_text.split_front_matter
+
+QMD_GLOB = "**/*.qmd"
+
+_HEADING_RE = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$", re.MULTILINE)
+# Opening/closing line of a fenced code block (``` or ~~~, incl. ```{python} cells)
+_FENCE_RE = re.compile(r"^[ ]{0,3}(`{3,}|~{3,})")
+_DURATION_RE = re.compile(
+    r"(\d+(?:\.\d+)?)(?:\s*-\s*(\d+(?:\.\d+)?))?\s*(hours?|hrs?|h\b|minutes?|mins?|m\b)",
+    re.IGNORECASE,
+)
+_INT_RE = re.compile(r"\d+")
+
+# Front matter key -> payload key for durations, stored as whole minutes.
+_DURATION_FIELDS = {"prep_time": "prep_time_min", "cook_time": "cook_time_min", "total_time": "total_time_min"}
+_KEYWORD_FIELDS = ("title", "slug", "author", "cuisine")
+_LIST_FIELDS = ("tags", "categories")
+
+
+def list_qmd_files(qmd_path: str) -> List[Path]:
+    root = Path(qmd_path)
+    return sorted(p for p in root.glob(QMD_GLOB) if p.is_file() and not p.name.startswith("_"))
+
+
+def parse_minutes(value: Any) -> Optional[int]:
+    """'40–50 minutes' -> 50, '1 hour 10 minutes' -> 70, '2½–3 hours' -> 180 (ranges use the upper bound)."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not isinstance(value, str):
+        return None
+    total = 0.0
+    matched = False
+    for low, high, unit in _DURATION_RE.findall(normalize_text_for_pdf(value)):
+        amount = float(high or low)
+        total += amount * 60 if unit.lower().startswith("h") else amount
+        matched = True
+    return int(round(total)) if matched else None
+
+
+def parse_count(value: Any) -> Optional[int]:
+    """'8–10 servings' -> 8, 20 -> 20."""
+    if isinstance(value, int):
+        return value
+    m = _INT_RE.search(str(value)) if value is not None else None
+    return int(m.group(0)) if m else None
+
+
+def front_matter_payload(front: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Typed payload fields from the front matter: keyword strings (normalized
+    like the text), keyword lists, integer servings/minutes, ISO date + year
+    and the draft flag. Unknown keys are ignored.
+    """
+    out: Dict[str, Any] = {}
+    for key in _KEYWORD_FIELDS:
+        if front.get(key) is not None:
+            out[key] = normalize_text_for_pdf(str(front[key]))
+    for key in _LIST_FIELDS:
+        value = front.get(key)
+        if isinstance(value, str):
+            value = [value]
+        if value:
+            out[key] = [normalize_text_for_pdf(str(v)) for v in value]
+    servings = parse_count(front.get("servings"))
+    if servings is not None:
+        out["servings"] = servings
+    for key, payload_key in _DURATION_FIELDS.items():
+        minutes = parse_minutes(front.get(key))
+        if minutes is not None:
+            out[payload_key] = minutes
+    when = front.get("date")
+    if isinstance(when, (datetime, date)):
+        out["date"] = when.isoformat()
+        out["year"] = when.year
+    if isinstance(front.get("draft"), bool):
+        out["draft"] = front["draft"]
+    return out
+
+
+def find_headings(body: str) -> List[re.Match]:
+    """_HEADING_RE matches in `body`, skipping '#' lines inside fenced code blocks."""
+    matches: List[re.Match] = []
+    fence: Optional[str] = None
+    pos = 0
+    for line in body.splitlines(keepends=True):
+        end = pos + len(line.rstrip("\r\n"))
+        f = _FENCE_RE.match(line)
+        if fence is None:
+            if f:
+                fence = f.group(1)
+            else:
+                m = _HEADING_RE.match(body, pos, end)
+                if m:
+                    matches.append(m)
+        elif f and f.group(1)[0] == fence[0] and len(f.group(1)) >= len(fence) and not line[f.end():].strip():
+            fence = None
+        pos += len(line)
+    return matches
+
+
+def split_sections(body: str) -> List[Tuple[str, str]]:
+    """
+    (heading path, text) per Markdown heading; nested headings read
+    'Parent > Child'. Headings inside fenced code blocks don't split.
+    """
+    sections: List[Tuple[str, str]] = []
+    stack: List[Tuple[int, str]] = []
+    matches = find_headings(body)
+    preamble = body[:matches[0].start()] if matches else body
+    if preamble.strip():
+        sections.append(("", preamble.strip()))
+    for i, m in enumerate(matches):
+        level, heading = len(m.group(1)), m.group(2).strip()
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        stack.append((level, heading))
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(body)
+        text = body[m.end():end].strip()
+        if text:
+            sections.append((" > ".join(h for _, h in stack), text))
+    return sections
+
+
+def load_qmd(path: str) -> List[Document]:
+    """
+    Read a Quarto source directly: one Document per non-empty heading section
+    (prefixed with the title and heading, normalized like the PDF text), plus
+    a "Metadata" section with the front matter as the PDFs carried it.
+
+    'page' is the section number, so calculate_chunk_ids() yields
+    "<path>:<section>:<idx>"; the typed front-matter fields are on every
+    Document and end up in the chunk payloads.
+    """
+    raw = Path(path).read_text(encoding="utf-8")
+    yaml_text, body = split_front_matter(raw)
+    fields = front_matter_payload(parse_front_matter(yaml_text))
+    fields.update({"source": path, "ext": "qmd"})
+    title = fields.get("title")
+
+    sections = split_sections(normalize_text_for_pdf(body))
+    if yaml_text.strip():
+        sections.append(("Metadata", f"```yaml\n{normalize_text_for_pdf(yaml_text).strip()}\n```"))
+
+    docs = []
+    for page, (section, text) in enumerate(sections):
+        header = "\n\n".join(part for part in (f"# {title}" if title else "", f"## {section}" if section else "") if part)
+        content = f"{header}\n\n{text}" if header else text
+        docs.append(Document(page_content=content, metadata={**fields, "section": section, "page": page}))
+    return docs
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def _estimate_bytes(value: Any) -> int:
+    """Rough in-memory footprint of a cached result (JSON size as a proxy)."""
+    try:
+        # Mappings that aren't dicts (e.g. VectorDB's Hit) are sized by their items.
+        return len(json.dumps(value, default=lambda o: dict(o) if isinstance(o, Mapping) else str(o)))
+    except Exception:
+        return 1024
+
+
+# Process-wide write generation per collection. Every VectorDB bumps it when it
+# writes and puts the current value in its cache keys, so a write through one
+# instance makes the results cached by every other instance in the process miss.
+_generations: Dict[Hashable, int] = {}
+_generations_lock = threading.Lock()
+
+
+def collection_generation(collection_key: Hashable) -> int:
+    with _generations_lock:
+        return _generations.get(collection_key, 0)
+
+
+def bump_collection_generation(collection_key: Hashable) -> int:
+    with _generations_lock:
+        _generations[collection_key] = _generations.get(collection_key, 0) + 1
+        return _generations[collection_key]
+
+
+class QueryCache:
+    """
+    In-process LRU + TTL cache for query results.
+
+    - Entries expire after `ttl_seconds` (None = never).
+    - The cache is bounded both by entry count and by approximate bytes held;
+      least recently used entries are evicted first.
+    - Keys are tuples whose first element is the collection name, so
+      invalidate(collection) drops everything cached for that collection.
+      Writes through other instances are caught by putting
+      collection_generation() in the key.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: Optional[float] = 300.0,
+        max_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_held = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, size, value = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                self._pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = _estimate_bytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (time.monotonic(), size, value)
+            self.bytes_held += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self.bytes_held > self.max_bytes
+            ):
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, collection_name: Optional[str] = None) -> None:
+        """Drop all entries, or only those cached for one collection."""
+        with self._lock:
+            if collection_name is None:
+                self._entries.clear()
+                self.bytes_held = 0
+                return
+            for key in [k for k in self._entries if k[0] == collection_name]:
+                self._pop(key)
+
+    def _pop(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes_held -= size
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "bytes_held": self.bytes_held,
+        }
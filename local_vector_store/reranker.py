@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from embedding_cache import normalize_text, text_key
+
+# Cross-encoders are shared per process, like the client's embedding models.
+_MODELS: Dict[Tuple[str, Optional[str], Optional[int]], Any] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def _get_or_init_model(model_name: str, cache_dir: Optional[str], threads: Optional[int]):
+    key = (model_name, cache_dir, threads)
+    with _MODELS_LOCK:
+        model = _MODELS.get(key)
+        if model is None:
+            from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+            model = TextCrossEncoder(model_name=model_name, cache_dir=cache_dir, threads=threads)
+            _MODELS[key] = model
+        return model
+
+
+class Reranker:
+    """
+    Second-stage rescoring of retrieved chunks with a small local cross-encoder
+    (FastEmbed TextCrossEncoder on CPU).
+
+    - Scores are cached per (normalized query, point ID, content hash) in a
+      bounded LRU, so repeated or paginated queries only score new chunks and
+      an edited chunk is never served its old text's score.
+    - budget_ms caps the time spent scoring: candidates are scored in retrieval
+      order, batch by batch, and scoring stops before a batch that would
+      overrun the budget. Hits left unscored keep their retrieval order (and
+      retrieval score) after the reranked ones.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "Xenova/ms-marco-MiniLM-L-6-v2",
+        batch_size: int = 8,
+        budget_ms: Optional[float] = None,
+        cache_size: int = 4096,
+        cache_dir: Optional[str] = None,
+        threads: Optional[int] = None,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+        self.cache_size = cache_size
+        self.cache_dir = cache_dir
+        self.threads = threads
+        self._scores: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.budget_cutoffs = 0
+
+    @property
+    def model(self):
+        return _get_or_init_model(self.model_name, self.cache_dir, self.threads)
+
+    def _cached(self, key: Tuple[str, str, str]) -> Optional[float]:
+        with self._lock:
+            score = self._scores.get(key)
+            if score is not None:
+                self._scores.move_to_end(key)
+            return score
+
+    def _store(self, items: Sequence[Tuple[Tuple[str, str, str], float]]) -> None:
+        with self._lock:
+            for key, score in items:
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+
+    def rerank(
+        self, query: str, hits: Sequence[Any], top_n: int, budget_ms: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Rescore `hits` (Hit mappings from VectorDB) against `query` and return
+        the best `top_n`. Reranked hits carry the cross-encoder score.
+        """
+        budget = self.budget_ms if budget_ms is None else budget_ms
+        start = time.perf_counter()
+        qkey = normalize_text(query)
+        keys = [
+            (qkey, str(h.id), h.metadata.get("content_hash") or text_key(h.page_content))
+            for h in hits
+        ]
+
+        scores: Dict[int, float] = {}
+        pending: List[int] = []
+        for i, key in enumerate(keys):
+            cached = self._cached(key)
+            if cached is None:
+                pending.append(i)
+            else:
+                scores[i] = cached
+        with self._lock:
+            self.hits += len(scores)
+
+        model = self.model if pending else None
+        last_batch_ms = 0.0
+        for b in range(0, len(pending), self.batch_size):
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if budget is not None and elapsed_ms + last_batch_ms > budget:
+                with self._lock:
+                    self.budget_cutoffs += 1
+                break
+            batch = pending[b:b + self.batch_size]
+            t0 = time.perf_counter()
+            batch_scores = [float(s) for s in model.rerank(query, [hits[i].page_content for i in batch])]
+            last_batch_ms = (time.perf_counter() - t0) * 1000
+            scores.update(zip(batch, batch_scores))
+            self._store([(keys[i], s) for i, s in zip(batch, batch_scores)])
+            with self._lock:
+                self.misses += len(batch)
+
+        reranked = sorted(scores, key=lambda i: scores[i], reverse=True)
+        unscored = [i for i in range(len(hits)) if i not in scores]
+        out = [type(hits[i])(hits[i].id, scores[i], hits[i].metadata) for i in reranked]
+        out.extend(hits[i] for i in unscored)
+        return out[:top_n]
+
+    def warm_up(self) -> None:
+        list(self.model.rerank("warm up", ["warm up"]))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._scores),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "budget_cutoffs": self.budget_cutoffs,
+            }
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Build-and-ship snapshots of a VectorDB collection.
+
+A snapshot is two files side by side:
+  - <collection>-<timestamp>.snapshot       Qdrant's own snapshot archive (or a
+                                            tar.gz of the directory for the
+                                            embedded NumPy backend)
+  - <collection>-<timestamp>.manifest.json  format version, backend, embedding
+                                            model names, point count, checksum
+
+Build once (e.g. in CI), ship the two files, and restore on boot in one bulk
+upload instead of re-running load → split → embed → add. Restoring checks the
+manifest's models against the VectorDB that will query the collection.
+
+Usage examples:
+  python local_vector_store/snapshots.py export --url http://localhost:6333 --out snapshots/
+  python local_vector_store/snapshots.py restore snapshots/default_collection-20250101T000000Z.manifest.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from datetime import datetime
+from importlib.metadata import version
+from pathlib import Path
+from typing import Optional
+
+import requests
+from pydantic import BaseModel
+
+from numpy_index import NumpyIndex
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class SnapshotCompatibilityError(ValueError):
+    """The snapshot was built with other embedding models (or a newer format)."""
+
+
+class SnapshotManifest(BaseModel):
+    format_version: int = SNAPSHOT_FORMAT_VERSION
+    backend: str  # "qdrant" or "numpy"
+    collection_name: str
+    embeddings_model_name: str
+    sparse_embeddings_model_name: Optional[str] = None
+    points_count: int
+    created_at: str
+    qdrant_client_version: str = version("qdrant-client")
+    snapshot_file: str
+    sha256: str
+
+    def check_compatible(
+        self, embeddings_model_name: str, sparse_embeddings_model_name: Optional[str]
+    ) -> None:
+        if self.format_version > SNAPSHOT_FORMAT_VERSION:
+            raise SnapshotCompatibilityError(
+                f"Snapshot format v{self.format_version} is newer than supported v{SNAPSHOT_FORMAT_VERSION}"
+            )
+        mismatches = []
+        if self.embeddings_model_name != embeddings_model_name:
+            mismatches.append(f"dense {self.embeddings_model_name!r} != {embeddings_model_name!r}")
+        if self.sparse_embeddings_model_name != sparse_embeddings_model_name:
+            mismatches.append(
+                f"sparse {self.sparse_embeddings_model_name!r} != {sparse_embeddings_model_name!r}"
+            )
+        if mismatches:
+            raise SnapshotCompatibilityError(
+                "Snapshot was built with different embedding models: " + "; ".join(mismatches)
+            )
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _rest(client) -> tuple:
+    """(REST base URI, headers) of a remote QdrantClient."""
+    remote = getattr(client, "_client", None)
+    uri = getattr(remote, "rest_uri", None)
+    if uri is None:
+        raise ValueError("Snapshots need a Qdrant server or the file:// NumPy backend, not ':memory:'")
+    return uri.rstrip("/"), dict(getattr(remote, "_rest_headers", {}) or {})
+
+
+def export_collection(
+    client,
+    collection_name: str,
+    out_dir: str,
+    embeddings_model_name: str,
+    sparse_embeddings_model_name: Optional[str],
+    timeout: float = 600.0,
+) -> Path:
+    """Write <snapshot> + <manifest> into out_dir and return the manifest path."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    snapshot_path = out / f"{collection_name}-{stamp}.snapshot"
+
+    if isinstance(client, NumpyIndex):
+        backend = "numpy"
+        client.export_collection(collection_name, str(snapshot_path))
+    else:
+        backend = "qdrant"
+        base, headers = _rest(client)
+        description = client.create_snapshot(collection_name=collection_name, wait=True)
+        url = f"{base}/collections/{collection_name}/snapshots/{description.name}"
+        with requests.get(url, headers=headers, stream=True, timeout=timeout) as r:
+            r.raise_for_status()
+            with open(snapshot_path, "wb") as f:
+                for block in r.iter_content(chunk_size=1 << 20):
+                    f.write(block)
+        # The file now lives with us; don't keep a copy on the server's disk.
+        client.delete_snapshot(collection_name=collection_name, snapshot_name=description.name)
+
+    manifest = SnapshotManifest(
+        backend=backend,
+        collection_name=collection_name,
+        embeddings_model_name=embeddings_model_name,
+        sparse_embeddings_model_name=sparse_embeddings_model_name,
+        points_count=client.get_collection(collection_name).points_count or 0,
+        created_at=datetime.utcnow().isoformat() + "Z",
+        snapshot_file=snapshot_path.name,
+        sha256=_sha256(snapshot_path),
+    )
+    manifest_path = out / f"{collection_name}-{stamp}.manifest.json"
+    manifest_path.write_text(manifest.model_dump_json(indent=2), encoding="utf-8")
+    return manifest_path
+
+
+def load_manifest(manifest_path: str) -> SnapshotManifest:
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return SnapshotManifest(**json.load(f))
+
+
+def restore_collection(
+    client,
+    manifest_path: str,
+    embeddings_model_name: str,
+    sparse_embeddings_model_name: Optional[str],
+    collection_name: Optional[str] = None,
+    timeout: float = 600.0,
+) -> SnapshotManifest:
+    """
+    Verify models and checksum, then restore the snapshot in one bulk upload
+    (replacing the collection if it exists). collection_name defaults to the
+    manifest's.
+    """
+    manifest = load_manifest(manifest_path)
+    manifest.check_compatible(embeddings_model_name, sparse_embeddings_model_name)
+    snapshot_path = Path(manifest_path).parent / manifest.snapshot_file
+    if _sha256(snapshot_path) != manifest.sha256:
+        raise ValueError(f"Checksum mismatch for {snapshot_path}")
+    name = collection_name or manifest.collection_name
+
+    if isinstance(client, NumpyIndex):
+        if manifest.backend != "numpy":
+            raise SnapshotCompatibilityError("Qdrant snapshots can't be restored into the NumPy backend")
+        client.import_collection(name, str(snapshot_path))
+        return manifest
+    if manifest.backend != "qdrant":
+        raise SnapshotCompatibilityError("NumPy snapshots can only be restored into a file:// location")
+
+    base, headers = _rest(client)
+    with open(snapshot_path, "rb") as f:
+        r = requests.post(
+            f"{base}/collections/{name}/snapshots/upload",
+            params={"priority": "snapshot", "wait": "true", "checksum": manifest.sha256},
+            files={"snapshot": (snapshot_path.name, f, "application/octet-stream")},
+            headers=headers,
+            timeout=timeout,
+        )
+    r.raise_for_status()
+    return manifest
+
+
+def main():
+    from vector_db import VectorDB
+
+    p = argparse.ArgumentParser(description="Export / restore VectorDB collection snapshots")
+    sub = p.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="Snapshot a collection into --out")
+    exp.add_argument("--out", default="snapshots", help="Output directory (default: snapshots)")
+    res = sub.add_parser("restore", help="Restore a collection from a manifest")
+    res.add_argument("manifest", help="Path to <collection>-<timestamp>.manifest.json")
+    for sp in (exp, res):
+        sp.add_argument("--url", default="http://localhost:6333",
+                        help="Qdrant URL/host or file://<dir> (default: http://localhost:6333)")
+        sp.add_argument("--collection", default="default_collection")
+        sp.add_argument("--embed-model", default="sentence-transformers/all-MiniLM-L6-v2")
+        sp.add_argument("--sparse-model", default="Qdrant/bm25", help="'none' for dense-only")
+    args = p.parse_args()
+
+    db = VectorDB(
+        memory_location=args.url,
+        collection_name=args.collection,
+        embeddings_model_name=args.embed_model,
+        sparse_embeddings_model_name=None if args.sparse_model == "none" else args.sparse_model,
+        warm_up_on_init=False,
+    )
+    if args.command == "export":
+        print(f"Wrote {db.export_snapshot(args.out)}")
+    else:
+        manifest = db.restore_snapshot(args.manifest)
+        print(f"Restored {manifest.points_count} points into '{db.collection_name}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic Quarto recipe corpus for ingestion benchmarks.
+
+Each generated .qmd keeps a real recipe's front matter (title and slug made
+unique) and heading structure, but its sections are resampled from the same
+section across all recipes (bullets for lists, sentences for prose), so the
+chunks are realistic yet distinct and survive dedup. Files are added until the
+estimated chunk count (800/400 splitter over heading sections, as ingested
+with --source qmd) reaches --chunks.
+
+Usage examples:
+  python local_vector_store/synth_corpus.py --chunks 10000 --out bench_corpus
+  python local_vector_store/prepare_corpus_and_data_locally.py --url :memory: --source qmd \\
+      --qmd-path bench_corpus --data-path bench_corpus --report ingest_report.json
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+RECIPES_DIR = ROOT / "quarto" / "recipes"
+sys.path.insert(0, str(ROOT / "src"))
+
+from quarto_text import parse_front_matter, split_front_matter  # noqa: E402
+
+HEADING_RE = re.compile(r"^##[ \t]+(.+?)[ \t]*$", re.MULTILINE)
+LIST_ITEM_RE = re.compile(r"^\s*(?:[-*]|\d+\.)\s+")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+FILES_PER_DIR = 1000
+
+
+def estimate_chunks(text_len: int, chunk_size: int = 800, overlap: int = 400) -> int:
+    if text_len <= chunk_size:
+        return 1
+    return 1 + math.ceil((text_len - chunk_size) / (chunk_size - overlap))
+
+
+def read_recipes():
+    """[(yaml_text, front matter dict, [(heading, text)])] for every source recipe."""
+    recipes = []
+    for qmd in sorted(RECIPES_DIR.glob("*.qmd")):
+        yaml_text, body = split_front_matter(qmd.read_text(encoding="utf-8"))
+        matches = list(HEADING_RE.finditer(body))
+        sections = []
+        for i, m in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(body)
+            sections.append((m.group(1), body[m.end():end].strip()))
+        recipes.append((yaml_text, parse_front_matter(yaml_text), sections))
+    return recipes
+
+
+def build_pools(recipes):
+    """Per heading: list items and prose sentences seen anywhere in the corpus."""
+    items, sentences = defaultdict(list), defaultdict(list)
+    for _, _, sections in recipes:
+        for heading, text in sections:
+            for line in text.splitlines():
+                if LIST_ITEM_RE.match(line):
+                    items[heading].append(line.strip())
+                elif line.strip():
+                    sentences[heading].extend(s for s in SENTENCE_RE.split(line.strip()) if s)
+    return items, sentences
+
+
+def resample(heading, text, items, sentences, rng):
+    lines = [l for l in text.splitlines() if l.strip()]
+    n_items = sum(1 for l in lines if LIST_ITEM_RE.match(l))
+    if n_items and items[heading]:
+        k = max(1, n_items + rng.randint(-2, 2))
+        picked = [LIST_ITEM_RE.sub("", rng.choice(items[heading])) for _ in range(k)]
+        numbered = LIST_ITEM_RE.match(lines[0]).group(0).strip()[0].isdigit()
+        return "\n".join(f"{j}. {p}" if numbered else f"- {p}" for j, p in enumerate(picked, 1))
+    if sentences[heading]:
+        k = max(1, len(SENTENCE_RE.split(text)) + rng.randint(-1, 2))
+        return " ".join(rng.choice(sentences[heading]) for _ in range(k))
+    return text
+
+
+def make_variant(i, recipe, items, sentences, rng):
+    yaml_text, front, sections = recipe
+    title = str(front.get("title", "Recipe")).strip('"')
+    slug = str(front.get("slug", "recipe"))
+    new_title = "title: " + json.dumps(f"{title} (variant {i})", ensure_ascii=False)
+    yaml_text = re.sub(r"^title:.*$", lambda _: new_title, yaml_text, count=1, flags=re.MULTILINE)
+    yaml_text = re.sub(r"^slug:.*$", lambda _: f"slug: {slug}-{i}", yaml_text, count=1, flags=re.MULTILINE)
+    parts, chunks = [], estimate_chunks(len(yaml_text))  # + the Metadata section
+    for heading, text in sections:
+        new_text = resample(heading, text, items, sentences, rng) if text else ""
+        parts.append(f"## {heading}\n\n{new_text}\n")
+        if new_text:
+            chunks += estimate_chunks(len(title) + len(heading) + len(new_text) + 20)
+    return f"{slug}-{i}", f"---\n{yaml_text}\n---\n\n" + "\n".join(parts), chunks
+
+
+def main():
+    p = argparse.ArgumentParser(description="Generate a synthetic .qmd recipe corpus for ingestion benchmarks")
+    p.add_argument("--chunks", type=int, default=10_000, help="Target number of chunks (default: 10000)")
+    p.add_argument("--out", default="bench_corpus", help="Output directory (default: bench_corpus)")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    recipes = read_recipes()
+    if not recipes:
+        raise SystemExit(f"No recipes found in {RECIPES_DIR}")
+    items, sentences = build_pools(recipes)
+    rng = random.Random(args.seed)
+    out = Path(args.out)
+
+    files = chunks = 0
+    while chunks < args.chunks:
+        name, text, n = make_variant(files, recipes[files % len(recipes)], items, sentences, rng)
+        path = out / f"recipes-{files // FILES_PER_DIR:04d}" / f"{name}.qmd"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        files += 1
+        chunks += n
+    print(f"Wrote {files} files (~{chunks} chunks) to {out}")
+
+
+if __name__ == "__main__":
+    main()
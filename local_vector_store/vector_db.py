@@ -1,46 +1,549 @@
 from __future__ import annotations
 
-from uuid import uuid4
-from typing import List, Optional, Sequence, Dict, Any, Union
+import threading
+import warnings
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from uuid import NAMESPACE_URL, uuid4, uuid5
+from typing import Iterable, Iterator, List, Optional, Sequence, Dict, Any, Tuple, Union
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qm
 
+from collection_profiles import CollectionProfile, get_profile
+from embedding_cache import EmbeddingCache, text_key
+from numpy_index import NumpyIndex
+from query_cache import QueryCache, bump_collection_generation, collection_generation
+from reranker import Reranker
+from snapshots import SnapshotManifest, export_collection, restore_collection
+
+
+# Namespace for deterministic point IDs; changing it re-keys every collection.
+POINT_ID_NAMESPACE = uuid5(NAMESPACE_URL, "adk-mcp-rag/vector_db/point")
+
+
+# qdrant-client caches FastEmbed models per class by model name only, so the
+# first set_model() of a name fixes its cache_dir/threads for the process.
+_MODEL_OPTIONS: Dict[str, Tuple[Optional[str], Optional[int]]] = {}
+_MODEL_OPTIONS_LOCK = threading.Lock()
+
+
+def check_model_options(model_name: str, cache_dir: Optional[str], threads: Optional[int]) -> None:
+    """
+    Record the options `model_name` is first configured with and warn when a
+    later VectorDB asks for different ones: they would be silently ignored.
+    """
+    with _MODEL_OPTIONS_LOCK:
+        first = _MODEL_OPTIONS.setdefault(model_name, (cache_dir, threads))
+    if first != (cache_dir, threads):
+        warnings.warn(
+            f"FastEmbed model {model_name!r} is already loaded in this process with "
+            f"cache_dir={first[0]!r}, threads={first[1]!r}; "
+            f"cache_dir={cache_dir!r}, threads={threads!r} are ignored",
+            stacklevel=3,
+        )
+
+
+def point_id(chunk_id: str, text: str) -> str:
+    """
+    Deterministic UUIDv5 point ID for a chunk.
+
+    Derived from the chunk ID ("<source>:<page>:<index>") plus a hash of the
+    normalized text, so re-ingesting an unchanged chunk upserts onto the same
+    point while an edited chunk gets a new one.
+    """
+    return str(uuid5(POINT_ID_NAMESPACE, f"{chunk_id}|{text_key(text)}"))
+
+
+def default_point_ids(documents: Sequence[str], md_list: Sequence[Dict[str, Any]]) -> List[str]:
+    """Deterministic IDs for chunks with an 'id'/'source_id', random UUIDs otherwise."""
+    ids = []
+    for text, m in zip(documents, md_list):
+        chunk_id = m.get("id") or m.get("source_id")
+        ids.append(point_id(chunk_id, text) if chunk_id else str(uuid4()))
+    return ids
+
+
+# -----------------------------
+# Helpers shared with AsyncVectorDB
+# -----------------------------
+def prepare_metadatas(
+    documents: Sequence[str],
+    metadatas: Optional[List[Dict[str, Any]]] = None,
+    mirror_text: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Build one payload dict per document (see VectorDB.add for the conventions).
+    mirror_text=False skips the 'page_content' copy ("slim" payloads).
+    """
+    now_iso = datetime.utcnow().isoformat() + "Z"
+    md_list: List[Dict[str, Any]] = []
+    if metadatas is None:
+        md_list = [{"ingested_at": now_iso} for _ in range(len(documents))]
+    else:
+        if len(metadatas) != len(documents):
+            raise ValueError("len(metadatas) must match len(documents)")
+        # shallow copy to avoid side effects
+        md_list = [dict(m) if m is not None else {"ingested_at": now_iso} for m in metadatas]
+        for m in md_list:
+            m.setdefault("ingested_at", now_iso)
+
+    # Ensure helpful fields exist and mirror content keys
+    for i, text in enumerate(documents):
+        m = md_list[i]
+        # Stable-ish identifiers if caller didn't set them
+        m.setdefault("chunk_id", m.get("id") or m.get("source_id") or str(uuid4()))
+        m.setdefault("doc_id", m.get("source") or m.get("doc_path") or None)
+        m.setdefault("chunk_index", m.get("chunk_index") or m.get("page", 0))
+        m.setdefault("text_length", len(text))
+        m.setdefault("content_hash", text_key(text))
+        # Mirror into page_content to satisfy non-Qdrant wrappers
+        # The text is also stored under 'document' when the point is built.
+        if mirror_text:
+            m["page_content"] = text
+        else:
+            m.pop("page_content", None)
+    return md_list
+
+
+def embed_dense_passages(
+    client,
+    texts: List[str],
+    cache: Optional[EmbeddingCache] = None,
+    batch_size: Optional[int] = None,
+) -> List[List[float]]:
+    # The client keeps one FastEmbed instance per model (loaded by set_model).
+    model = client._get_or_init_model(model_name=client.embedding_model_name)
+    kwargs = {"batch_size": batch_size} if batch_size else {}
+    embed_fn = lambda batch: model.passage_embed(batch, **kwargs)
+    if cache is None:
+        vectors = embed_fn(texts)
+    else:
+        vectors = cache.get_or_embed(client.embedding_model_name, texts, embed_fn)
+    return [v.tolist() for v in vectors]
+
+
+def embed_sparse_passages(
+    client,
+    texts: List[str],
+    cache: Optional[EmbeddingCache] = None,
+    batch_size: Optional[int] = None,
+) -> Optional[List[qm.SparseVector]]:
+    model_name = client.sparse_embedding_model_name
+    if model_name is None:
+        return None
+    model = client._get_or_init_sparse_model(model_name=model_name)
+    kwargs = {"batch_size": batch_size} if batch_size else {}
+    embed_fn = lambda batch: model.embed(batch, **kwargs)
+    if cache is None:
+        pairs = [(e.indices, e.values) for e in embed_fn(texts)]
+    else:
+        pairs = cache.get_or_embed(model_name, texts, embed_fn, sparse=True)
+    return [
+        qm.SparseVector(indices=indices.tolist(), values=values.tolist())
+        for indices, values in pairs
+    ]
+
+
+SEARCH_MODES = ("hybrid", "dense", "sparse")
+FUSION_METHODS = ("rrf", "dbsf", "weighted")
+
+
+def embed_queries(
+    client,
+    texts: List[str],
+    mode: str = "hybrid",
+    executor: Optional[ThreadPoolExecutor] = None,
+    timings: Optional[Dict[str, float]] = None,
+):
+    """
+    Embed query texts in one batch per model: (dense vectors or None, sparse vectors or None).
+
+    `mode` selects the legs ("hybrid", "dense" or "sparse"); hybrid degrades to
+    dense when no sparse model is configured. Given an executor, the sparse leg
+    runs on it while the dense leg runs here, so both ONNX sessions overlap.
+    Per-leg wall times (ms) are written to `timings` when a dict is passed.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode {mode!r}; choose one of {SEARCH_MODES}")
+    want_dense = mode != "sparse"
+    want_sparse = mode != "dense" and client.sparse_embedding_model_name is not None
+    if mode == "sparse" and not want_sparse:
+        raise ValueError("Sparse search needs a sparse embeddings model")
+
+    def dense_leg():
+        t0 = perf_counter()
+        model = client._get_or_init_model(model_name=client.embedding_model_name)
+        vectors = [v.tolist() for v in model.query_embed(query=texts)]
+        return vectors, (perf_counter() - t0) * 1000
+
+    def sparse_leg():
+        t0 = perf_counter()
+        model = client._get_or_init_sparse_model(model_name=client.sparse_embedding_model_name)
+        vectors = [
+            qm.SparseVector(indices=e.indices.tolist(), values=e.values.tolist())
+            for e in model.query_embed(query=texts)
+        ]
+        return vectors, (perf_counter() - t0) * 1000
+
+    sparse_future = executor.submit(sparse_leg) if executor and want_dense and want_sparse else None
+    dense, dense_ms = dense_leg() if want_dense else (None, None)
+    if sparse_future is not None:
+        sparse, sparse_ms = sparse_future.result()
+    elif want_sparse:
+        sparse, sparse_ms = sparse_leg()
+    else:
+        sparse, sparse_ms = None, None
+
+    if timings is not None:
+        if dense_ms is not None:
+            timings["embed_dense_ms"] = dense_ms
+        if sparse_ms is not None:
+            timings["embed_sparse_ms"] = sparse_ms
+    return dense, sparse
+
+
+def build_points(
+    client,
+    ids: Sequence[Union[str, int]],
+    texts: Sequence[str],
+    md_list: Sequence[Dict[str, Any]],
+    dense: Sequence[List[float]],
+    sparse: Optional[Sequence[qm.SparseVector]],
+) -> List[qm.PointStruct]:
+    dense_name = client.get_vector_field_name()
+    sparse_name = client.get_sparse_vector_field_name()
+    points = []
+    for i, (pid, text, meta) in enumerate(zip(ids, texts, md_list)):
+        vector: Dict[str, Any] = {dense_name: dense[i]}
+        if sparse is not None:
+            vector[sparse_name] = sparse[i]
+        # Same payload layout client.add() produces: 'document' + metadata
+        points.append(qm.PointStruct(id=pid, vector=vector, payload={"document": text, **meta}))
+    return points
+
+
+def build_query_request(
+    client,
+    dense_vector: Optional[List[float]],
+    sparse_vector: Optional[qm.SparseVector],
+    limit: int,
+    score_threshold: Optional[float] = None,
+    query_filter: Optional[qm.Filter] = None,
+    search_params: Optional[qm.SearchParams] = None,
+    fusion: str = "rrf",
+    dense_limit: Optional[int] = None,
+    sparse_limit: Optional[int] = None,
+    with_payload: Union[bool, List[str]] = True,
+) -> qm.QueryRequest:
+    """
+    Single-leg query when only one vector is given, otherwise a dense+sparse
+    prefetch fused server-side with RRF or DBSF. dense_limit / sparse_limit
+    size each prefetch leg (default: limit). search_params (e.g. quantization
+    rescoring) apply to the dense leg; with_payload may list payload keys.
+    """
+    if sparse_vector is None or dense_vector is None:
+        dense = sparse_vector is None
+        return qm.QueryRequest(
+            query=dense_vector if dense else sparse_vector,
+            using=client.get_vector_field_name() if dense else client.get_sparse_vector_field_name(),
+            filter=query_filter,
+            params=search_params if dense else None,
+            limit=limit,
+            score_threshold=score_threshold,
+            with_payload=with_payload,
+        )
+    if fusion not in ("rrf", "dbsf"):
+        raise ValueError(f"Server-side fusion must be 'rrf' or 'dbsf', got {fusion!r}")
+    # Thresholds apply to the legs, as in client.query()'s hybrid path.
+    return qm.QueryRequest(
+        prefetch=[
+            qm.Prefetch(query=dense_vector, using=client.get_vector_field_name(),
+                        filter=query_filter, params=search_params,
+                        limit=dense_limit or limit, score_threshold=score_threshold),
+            qm.Prefetch(query=sparse_vector, using=client.get_sparse_vector_field_name(),
+                        filter=query_filter, limit=sparse_limit or limit,
+                        score_threshold=score_threshold),
+        ],
+        query=qm.FusionQuery(fusion=qm.Fusion.DBSF if fusion == "dbsf" else qm.Fusion.RRF),
+        limit=limit,
+        with_payload=with_payload,
+    )
+
+
+def weighted_fusion(
+    dense_points: Sequence[qm.ScoredPoint],
+    sparse_points: Sequence[qm.ScoredPoint],
+    weights: Tuple[float, float],
+    limit: int,
+) -> List[qm.ScoredPoint]:
+    """
+    Client-side weighted fusion: min-max normalize each leg's scores to [0, 1]
+    and rank by w_dense * dense + w_sparse * sparse (missing legs count as 0).
+    """
+    fused: Dict[Union[str, int], List[Any]] = {}
+    for points, weight in ((dense_points, weights[0]), (sparse_points, weights[1])):
+        if not points:
+            continue
+        lo = min(p.score for p in points)
+        span = max(p.score for p in points) - lo
+        for p in points:
+            entry = fused.setdefault(p.id, [0.0, p])
+            entry[0] += weight * ((p.score - lo) / span if span > 0 else 1.0)
+    ranked = sorted(fused.values(), key=lambda e: e[0], reverse=True)[:limit]
+    return [p.model_copy(update={"score": score}) for score, p in ranked]
+
+
+def create_profiled_collection(client, collection_name: str, profile: CollectionProfile):
+    """Create a FastEmbed-compatible collection laid out according to `profile`."""
+    return client.create_collection(
+        collection_name=collection_name,
+        vectors_config=client.get_fastembed_vector_params(
+            on_disk=profile.on_disk_vectors or None,
+            quantization_config=profile.quantization_config(),
+        ),
+        sparse_vectors_config=client.get_fastembed_sparse_vector_params(
+            on_disk=profile.on_disk_vectors or None,
+        ),
+        on_disk_payload=profile.on_disk_payload or None,
+    )
+
+
+class Hit(Mapping):
+    """
+    One query/scroll result.
+
+    A read-only mapping with the keys of the former result dicts (id, score,
+    page_content, metadata), so r["page_content"] / r.get(...) / dict(r) keep
+    working. __slots__ keeps it small, the payload is held as-is (no copy) and
+    page_content is resolved from it only when accessed.
+    """
+    __slots__ = ("id", "score", "metadata")
+    _KEYS = ("id", "score", "page_content", "metadata")
+
+    def __init__(self, id: Union[str, int], score: Optional[float], metadata: Dict[str, Any]):
+        self.id = id
+        self.score = score
+        self.metadata = metadata
+
+    @property
+    def page_content(self) -> str:
+        return self.metadata.get("page_content") or self.metadata.get("document") or ""
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+        return f"Hit(id={self.id!r}, score={self.score!r}, metadata={self.metadata!r})"
+
+
+def _copy_payload(value: Any) -> Any:
+    # Payloads are JSON, so copying dicts and lists is a full deep copy.
+    if isinstance(value, dict):
+        return {k: _copy_payload(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_payload(v) for v in value]
+    return value
+
+
+def copy_hits(hits: Sequence[Hit]) -> List[Hit]:
+    """Hits with their own payloads, so callers can't modify cached results."""
+    return [Hit(h.id, h.score, _copy_payload(h.metadata)) for h in hits]
+
+
+def to_result(point_id: Union[str, int], score: Optional[float], payload: Optional[Dict[str, Any]]) -> Hit:
+    # Payloads are freshly deserialized per point, so the Hit can own them.
+    return Hit(point_id, score, payload if payload is not None else {})
+
+
+PAYLOAD_INDEX_SPECS = [
+    ("source", "keyword"),
+    ("source_id", "keyword"),
+    ("doc_id", "keyword"),
+    ("chunk_id", "keyword"),
+    ("chunk_index", "integer"),
+    ("page", "integer"),
+    ("ext", "keyword"),
+    ("lang", "keyword"),
+    ("year", "integer"),
+    # Quarto front matter (qmd_loader.front_matter_payload)
+    ("title", "keyword"),
+    ("slug", "keyword"),
+    ("author", "keyword"),
+    ("cuisine", "keyword"),
+    ("tags", "keyword"),
+    ("categories", "keyword"),
+    ("section", "keyword"),
+    ("servings", "integer"),
+    ("prep_time_min", "integer"),
+    ("cook_time_min", "integer"),
+    ("total_time_min", "integer"),
+    ("date", "datetime"),
+    ("draft", "bool"),
+]
+
 
 class VectorDB(BaseModel):
     """
     Qdrant-backed vector store (FastEmbed path) with:
-      - add(): hybrid-ready ingestion via client.add(documents=..., metadata=..., ids=...)
-      - query(): dense (and hybrid if sparse model is set) text query
+      - add(): hybrid-ready ingestion (FastEmbed dense + sparse, optional on-disk
+        embedding cache so unchanged chunk text is never re-embedded)
+      - iter_embedded_points() / upload_embedded(): the streaming halves of
+        add() used by the ingestion pipeline (embed batch by batch, upload via
+        upload_points())
+      - query(): dense (and hybrid if sparse model is set) text query, with an
+        optional LRU+TTL result cache invalidated by writes to the
+        collection from any VectorDB instance in the process
+      - search(): the explicit query pipeline behind query(): dense/sparse query
+        embeddings computed concurrently, per-call mode (hybrid/dense/sparse),
+        fusion (rrf/dbsf server-side, weighted client-side) and per-leg
+        prefetch limits; also returns per-stage timings
+      - query_batch(): many text queries, embedded in one batch and sent as one
+        Qdrant batch request
       - scroll_all(): correct pagination using next_page_offset
+      - payload_mode="slim": store chunk text once (as 'document') instead of
+        also mirroring it into 'page_content'; query()/search()/scroll_all()
+        accept `fields` to fetch only the payload keys a caller renders
+      - iter_scroll(): constant-memory page generator with payload projection
       - ensure_payload_indexes(): create keyword/range indexes for faster filtering
+      - create_collection(): explicit creation with a storage profile
+        (quantization, on-disk vectors/payload)
+      - rerank_model_name: optional cross-encoder stage after retrieval that
+        oversamples limit x rerank_oversample candidates and returns the best
+        `limit` within rerank_budget_ms
+      - export_snapshot() / restore_snapshot(): ship a pre-built collection as
+        a model-tagged snapshot and restore it in one bulk upload; set
+        snapshot_manifest to restore on boot when the collection is missing
+      - warm_up(): create the FastEmbed ONNX sessions and run a first
+        inference (in __init__ with warm_up_on_init=True), with per-model
+        timings; ONNX threads, embedding batch size and the model download
+        cache are constructor options, fixed per model name by the first
+        instance
     """
     memory_location: str = "http://localhost:6333"
     embeddings_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
-    sparse_embeddings_model_name: str = "Qdrant/bm25"  # optional hybrid
+    sparse_embeddings_model_name: Optional[str] = "Qdrant/bm25"  # optional hybrid (None = dense only)
     collection_name: str = "default_collection"
     client: Optional[QdrantClient] = None
+    # gRPC is much cheaper than REST for bulk uploads (server mode only).
+    prefer_grpc: bool = False
+    grpc_port: int = 6334
+    # Storage layout used when the collection is created (see collection_profiles.py):
+    # "default", "on_disk", "int8" or "binary".
+    collection_profile: str = "default"
+    # Directory for the persistent embedding cache; None disables caching.
+    embedding_cache_dir: Optional[str] = None
+    # Query result cache; 0 entries disables it.
+    query_cache_size: int = 0
+    query_cache_ttl: Optional[float] = 300.0
+    query_cache_max_bytes: int = 32 * 1024 * 1024
+    # FastEmbed runtime: ONNX intra-op threads (None = all cores), passages per
+    # inference batch (None = FastEmbed's default) and where model files are
+    # downloaded (None = FASTEMBED_CACHE_PATH or a temp dir, i.e. re-downloaded
+    # on every fresh container).
+    embedding_threads: Optional[int] = None
+    embedding_batch_size: Optional[int] = None
+    model_cache_dir: Optional[str] = None
+    # Load both models and run one inference in __init__ (see warm_up()); off by
+    # default so scripts and tests don't pay for inference just to construct.
+    warm_up_on_init: bool = False
+    # Optional cross-encoder rerank stage (e.g. "Xenova/ms-marco-MiniLM-L-6-v2"):
+    # fetch limit * rerank_oversample candidates, rescore, return the best `limit`.
+    rerank_model_name: Optional[str] = None
+    rerank_oversample: int = 4
+    rerank_budget_ms: Optional[float] = None  # None = score every candidate
+    # Snapshot manifest restored in __init__ if the collection doesn't exist yet.
+    snapshot_manifest: Optional[str] = None
+    # "full" mirrors chunk text into 'page_content'; "slim" stores it once as 'document'.
+    payload_mode: str = "full"
+    # Query pipeline defaults; query()/search() can override each per call.
+    # search_mode: "hybrid", "dense" or "sparse"; fusion: "rrf", "dbsf" or "weighted".
+    search_mode: str = "hybrid"
+    fusion: str = "rrf"
+    dense_prefetch_limit: Optional[int] = None  # None = the query limit
+    sparse_prefetch_limit: Optional[int] = None
+    fusion_weights: Tuple[float, float] = (0.5, 0.5)  # (dense, sparse), weighted fusion only
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    _embedding_cache: Optional[EmbeddingCache] = PrivateAttr(default=None)
+    _query_cache: Optional[QueryCache] = PrivateAttr(default=None)
+    _query_executor: Optional[ThreadPoolExecutor] = PrivateAttr(default=None)
+    _reranker: Optional[Reranker] = PrivateAttr(default=None)
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._initialize_client()
+        if self.rerank_model_name:
+            self._reranker = Reranker(
+                model_name=self.rerank_model_name,
+                budget_ms=self.rerank_budget_ms,
+                cache_dir=self.model_cache_dir,
+                threads=self.embedding_threads,
+            )
+        if self.snapshot_manifest and self.client is not None:
+            if not self.client.collection_exists(self.collection_name):
+                manifest = self.restore_snapshot(self.snapshot_manifest)
+                print(f"Restored {manifest.points_count} points from {self.snapshot_manifest}")
+        if self.warm_up_on_init and self.client is not None:
+            try:
+                self.warm_up()
+            except Exception as e:
+                # Models still load on first use; don't fail construction over it.
+                print(f"Error warming up embedding models: {e}")
+        if self.sparse_embeddings_model_name:
+            # Runs the sparse query embedding while the caller embeds the dense leg.
+            self._query_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="query-sparse")
+        if self.embedding_cache_dir:
+            self._embedding_cache = EmbeddingCache(self.embedding_cache_dir)
+        if self.query_cache_size > 0:
+            self._query_cache = QueryCache(
+                max_entries=self.query_cache_size,
+                ttl_seconds=self.query_cache_ttl,
+                max_bytes=self.query_cache_max_bytes,
+            )
 
     # -----------------------------
     # Client / collection setup
     # -----------------------------
     def _initialize_client(self) -> None:
         try:
-            self.client = QdrantClient(url=self.memory_location)
-            # FastEmbed models for add/query
-            self.client.set_model(self.embeddings_model_name)
+            if self.memory_location.startswith("file://"):
+                # Embedded NumPy index persisted in a local directory (no server).
+                self.client = NumpyIndex(path=self.memory_location[len("file://"):])
+            else:
+                # 'location' accepts a URL, a host name or ":memory:".
+                self.client = QdrantClient(
+                    location=self.memory_location,
+                    prefer_grpc=self.prefer_grpc,
+                    grpc_port=self.grpc_port,
+                )
+            # FastEmbed models for add/query. set_model() downloads the model
+            # files if missing; lazy_load only defers the ONNX session to
+            # warm_up() (or the first embed) so its cost can be timed.
+            model_options = dict(
+                cache_dir=self.model_cache_dir, threads=self.embedding_threads, lazy_load=True
+            )
+            check_model_options(self.embeddings_model_name, self.model_cache_dir, self.embedding_threads)
+            self.client.set_model(self.embeddings_model_name, **model_options)
             # If sparse model available, enables hybrid by default.
             try:
                 if self.sparse_embeddings_model_name:
-                    self.client.set_sparse_model(self.sparse_embeddings_model_name)
+                    check_model_options(
+                        self.sparse_embeddings_model_name, self.model_cache_dir, self.embedding_threads
+                    )
+                    self.client.set_sparse_model(self.sparse_embeddings_model_name, **model_options)
             except Exception:
                 # Sparse is optional; skip if not supported in your install.
                 pass
@@ -51,6 +554,44 @@ class VectorDB(BaseModel):
             )
             self.client = None
 
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Create the ONNX session of every configured FastEmbed model and push
+        one short text through its query and passage paths, so the first real
+        add()/query() does not pay for session creation or first-run
+        allocation. (Model files are already downloaded by _initialize_client().)
+
+        Returns (and prints) the wall time per model in ms. Models are shared
+        per process by name, so later VectorDB instances warm up almost
+        instantly, and with the first instance's threads/cache_dir (see
+        check_model_options()).
+        """
+        timings: Dict[str, float] = {}
+        sample = ["warm up"]
+
+        t0 = perf_counter()
+        dense_model = self.client._get_or_init_model(model_name=self.client.embedding_model_name)
+        list(dense_model.query_embed(query=sample))
+        list(dense_model.passage_embed(sample))
+        timings[self.client.embedding_model_name] = (perf_counter() - t0) * 1000
+
+        sparse_name = self.client.sparse_embedding_model_name
+        if sparse_name is not None:
+            t0 = perf_counter()
+            sparse_model = self.client._get_or_init_sparse_model(model_name=sparse_name)
+            list(sparse_model.query_embed(query=sample))
+            list(sparse_model.embed(sample))
+            timings[sparse_name] = (perf_counter() - t0) * 1000
+
+        if self._reranker is not None:
+            t0 = perf_counter()
+            self._reranker.warm_up()
+            timings[self._reranker.model_name] = (perf_counter() - t0) * 1000
+
+        for name, ms in timings.items():
+            print(f"Warmed up {name} in {ms:.0f} ms")
+        return timings
+
     def check_collection_existence(self) -> bool:
         try:
             return bool(self.client.get_collection(self.collection_name))
@@ -58,6 +599,46 @@ class VectorDB(BaseModel):
             print(f"Collection does not exist: {e}")
             return False
 
+    @property
+    def profile(self) -> CollectionProfile:
+        return get_profile(self.collection_profile)
+
+    def create_collection(self, recreate: bool = False) -> None:
+        """
+        Create the collection explicitly using `collection_profile`.
+
+        With recreate=True an existing collection is dropped first (needed to
+        switch profiles; all points are lost).
+        """
+        if self.client.collection_exists(self.collection_name):
+            if not recreate:
+                return
+            self.client.delete_collection(self.collection_name)
+        create_profiled_collection(self.client, self.collection_name, self.profile)
+
+    def _ensure_collection(self) -> None:
+        """Create the collection with FastEmbed-compatible vector params if missing."""
+        self.create_collection(recreate=False)
+
+    # -----------------------------
+    # Embedding
+    # -----------------------------
+    def _embed_dense(self, texts: List[str]) -> List[List[float]]:
+        return embed_dense_passages(
+            self.client, texts, self._embedding_cache, self.embedding_batch_size
+        )
+
+    def _embed_sparse(self, texts: List[str]) -> Optional[List[qm.SparseVector]]:
+        return embed_sparse_passages(
+            self.client, texts, self._embedding_cache, self.embedding_batch_size
+        )
+
+    def embedding_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the embedding cache ({} when caching is disabled)."""
+        if self._embedding_cache is None:
+            return {}
+        return self._embedding_cache.stats()
+
     # -----------------------------
     # Ingestion
     # -----------------------------
@@ -74,138 +655,650 @@ class VectorDB(BaseModel):
           so downstream consumers that expect either key will work.
         - You can pass full 'metadatas' per chunk (preferred). If omitted, minimal
           metadata is created.
+        - Without explicit ids, chunks carrying an 'id'/'source_id' get
+          deterministic point IDs (see point_id()), so adding the same chunk
+          twice is an idempotent upsert.
         """
         if not documents:
             print("No documents to add.")
             return []
 
+        # Prepare metadata list and mirror page_content (unless slim)
+        md_list = prepare_metadatas(documents, metadatas, mirror_text=self.payload_mode != "slim")
+
         # Prepare IDs
         if ids is None:
-            ids = [str(uuid4()) for _ in range(len(documents))]
+            ids = default_point_ids(documents, md_list)
 
-        # Prepare metadata list and mirror page_content
-        now_iso = datetime.utcnow().isoformat() + "Z"
-        md_list: List[Dict[str, Any]] = []
-        if metadatas is None:
-            md_list = [{"ingested_at": now_iso} for _ in range(len(documents))]
-        else:
-            if len(metadatas) != len(documents):
-                raise ValueError("len(metadatas) must match len(documents)")
-            # shallow copy to avoid side effects
-            md_list = [dict(m) if m is not None else {"ingested_at": now_iso} for m in metadatas]
-            for m in md_list:
-                m.setdefault("ingested_at", now_iso)
-
-        # Ensure helpful fields exist and mirror content keys
-        for i, text in enumerate(documents):
-            m = md_list[i]
-            # Stable-ish identifiers if caller didn't set them
-            m.setdefault("chunk_id", m.get("id") or m.get("source_id") or str(uuid4()))
-            m.setdefault("doc_id", m.get("source") or m.get("doc_path") or None)
-            m.setdefault("chunk_index", m.get("chunk_index") or m.get("page", 0))
-            m.setdefault("text_length", len(text))
-            # Mirror into page_content to satisfy non-Qdrant wrappers
-            # Qdrant will also store the text under 'document' automatically.
-            m["page_content"] = text
-
-        # Perform add (embeds + auto collection creation)
+        # Embed (cache-aware), create the collection if needed, then upsert
         try:
-            out_ids = self.client.add(
-                collection_name=self.collection_name,
-                documents=list(documents),
-                metadata=md_list,
-                ids=list(ids),
-            )
-            return out_ids
+            texts = list(documents)
+            dense = self._embed_dense(texts)
+            sparse = self._embed_sparse(texts)
+            if self._embedding_cache is not None:
+                self._embedding_cache.flush()
+
+            self._ensure_collection()
+            points = build_points(self.client, ids, texts, md_list, dense, sparse)
+            self.client.upsert(collection_name=self.collection_name, points=points, wait=True)
+            self.flush()
+            self._invalidate_query_cache()
+            return list(ids)
         except Exception as e:
+            # A failed upsert may still have written some points.
+            self._invalidate_query_cache()
             print(f"Error adding documents: {e}")
             return []
 
+    def iter_embedded_points(
+        self,
+        documents: Sequence[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[Sequence[Union[str, int]]] = None,
+        batch_size: int = 256,
+    ) -> Iterator[qm.PointStruct]:
+        """
+        Lazily embed documents batch by batch and yield ready-to-upload points.
+
+        Only one batch of vectors is held in memory at a time.
+        """
+        if metadatas is not None and len(metadatas) != len(documents):
+            raise ValueError("len(metadatas) must match len(documents)")
+        for start in range(0, len(documents), batch_size):
+            texts = list(documents[start:start + batch_size])
+            md_list = prepare_metadatas(
+                texts,
+                metadatas[start:start + batch_size] if metadatas is not None else None,
+                mirror_text=self.payload_mode != "slim",
+            )
+            batch_ids = (
+                list(ids[start:start + batch_size]) if ids is not None
+                else default_point_ids(texts, md_list)
+            )
+            dense = self._embed_dense(texts)
+            sparse = self._embed_sparse(texts)
+            if self._embedding_cache is not None:
+                self._embedding_cache.flush()
+            yield from build_points(self.client, batch_ids, texts, md_list, dense, sparse)
+
+    def upload_embedded(
+        self,
+        points: Iterable[qm.PointStruct],
+        batch_size: int = 256,
+    ) -> None:
+        """
+        Upload pre-embedded points, `batch_size` points per request. The
+        iterable is consumed lazily. Raises on failure. Does not flush():
+        callers streaming many batches flush once at the end.
+        """
+        self._ensure_collection()
+        try:
+            self.client.upload_points(
+                collection_name=self.collection_name,
+                points=points,
+                batch_size=batch_size,
+                max_retries=3,
+                wait=True,
+            )
+        finally:
+            self._invalidate_query_cache()
+
     # Backwards-compatible wrapper for older call sites
     def add_to_vectordb(self, documents, source_ids):
         # Convert source_ids into metadatas and forward to add()
         metadatas = [{"source_id": sid} for sid in source_ids]
         return self.add(documents=documents, metadatas=metadatas)
 
+    def existing_ids(
+        self, ids: Sequence[Union[str, int]], batch_size: int = 1000
+    ) -> set:
+        """
+        Return the subset of `ids` already stored in the collection.
+
+        Uses bulk retrieve() without payloads or vectors, so the cost scales with
+        len(ids) rather than with the size of the collection.
+        """
+        found = set()
+        try:
+            if not self.client.collection_exists(self.collection_name):
+                return found
+            ids = list(ids)
+            for i in range(0, len(ids), batch_size):
+                records = self.client.retrieve(
+                    collection_name=self.collection_name,
+                    ids=ids[i:i + batch_size],
+                    with_payload=False,
+                    with_vectors=False,
+                )
+                found.update(r.id for r in records)
+        except Exception as e:
+            print(f"Error retrieving ids: {e}")
+        return found
+
+    def delete_superseded(
+        self, source_ids: Sequence[str], keep_ids: Sequence[Union[str, int]]
+    ) -> int:
+        """
+        Delete points stored for these chunk IDs (payload 'source_id') under a
+        point ID not in `keep_ids`. These are points written before IDs were
+        deterministic (random uuid4, no 'source' payload) and older versions of
+        a chunk. One filtered count, plus one filtered delete if anything
+        matched, so the cost scales with len(source_ids). Returns the number
+        deleted.
+        """
+        source_ids = list(source_ids)
+        if not source_ids or not self.client.collection_exists(self.collection_name):
+            return 0
+        stale = qm.Filter(
+            must=[qm.FieldCondition(key="source_id", match=qm.MatchAny(any=source_ids))],
+            must_not=[qm.HasIdCondition(has_id=list(keep_ids))] if keep_ids else None,
+        )
+        count = self.client.count(collection_name=self.collection_name, count_filter=stale, exact=True).count
+        if count:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=qm.FilterSelector(filter=stale),
+                wait=True,
+            )
+            self._invalidate_query_cache()
+        return count
+
+    def flush(self) -> None:
+        """
+        Persist buffered writes. The file:// NumpyIndex keeps writes in memory
+        until flushed; a Qdrant server or local QdrantClient has no flush() and
+        persists on its own.
+        """
+        flush = getattr(self.client, "flush", None)
+        if flush is not None:
+            flush()
+
+    def delete_by_source(self, sources: Sequence[str]) -> None:
+        """
+        Bulk-delete every chunk whose doc_id or source is one of `sources`, in
+        a single filtered delete (no scrolling). Errors propagate so callers
+        can keep their bookkeeping consistent.
+        """
+        sources = list(sources)
+        if not sources or not self.client.collection_exists(self.collection_name):
+            return
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=qm.FilterSelector(
+                filter=qm.Filter(
+                    should=[
+                        qm.FieldCondition(key="doc_id", match=qm.MatchAny(any=sources)),
+                        qm.FieldCondition(key="source", match=qm.MatchAny(any=sources)),
+                    ]
+                )
+            ),
+            wait=True,
+        )
+        self.flush()
+        self._invalidate_query_cache()
+
+    # -----------------------------
+    # Snapshots
+    # -----------------------------
+    def export_snapshot(self, out_dir: str) -> str:
+        """
+        Export the collection as <collection>-<timestamp>.snapshot plus a
+        manifest tagged with this instance's embedding models. Returns the
+        manifest path.
+        """
+        return str(
+            export_collection(
+                self.client,
+                self.collection_name,
+                out_dir,
+                self.embeddings_model_name,
+                self.sparse_embeddings_model_name,
+            )
+        )
+
+    def restore_snapshot(self, manifest_path: str) -> SnapshotManifest:
+        """
+        Replace the collection with a snapshot in one bulk operation.
+
+        Raises SnapshotCompatibilityError if the snapshot was built with other
+        embedding models than this instance uses (its vectors would be garbage
+        for our queries), and ValueError on a checksum mismatch.
+        """
+        manifest = restore_collection(
+            self.client,
+            manifest_path,
+            self.embeddings_model_name,
+            self.sparse_embeddings_model_name,
+            collection_name=self.collection_name,
+        )
+        self._invalidate_query_cache()
+        return manifest
+
+    # -----------------------------
+    # Query cache
+    # -----------------------------
+    def _query_cache_key(
+        self,
+        query_text: str,
+        limit: int,
+        score_threshold: Optional[float],
+        query_filter: Optional[qm.Filter],
+        options: Optional[Dict[str, Any]] = None,
+    ) -> tuple:
+        filter_key = query_filter.model_dump_json(exclude_none=True) if query_filter is not None else None
+        options_key = tuple(sorted((options or {}).items()))
+        generation = collection_generation(self._collection_key)
+        return (self.collection_name, generation, query_text, limit, score_threshold, filter_key, options_key)
+
+    @property
+    def _collection_key(self) -> tuple:
+        return (self.memory_location, self.collection_name)
+
+    def _invalidate_query_cache(self) -> None:
+        # Bumped even without a local cache: other instances may cache this collection.
+        bump_collection_generation(self._collection_key)
+        if self._query_cache is not None:
+            self._query_cache.invalidate(self.collection_name)
+
+    def rerank_stats(self) -> Dict[str, Any]:
+        """Score-cache hit rate and budget cutoffs of the reranker ({} when disabled)."""
+        if self._reranker is None:
+            return {}
+        return self._reranker.stats()
+
+    def query_cache_stats(self) -> Dict[str, Any]:
+        """Hit rate and bytes held by the query cache ({} when disabled)."""
+        if self._query_cache is None:
+            return {}
+        return self._query_cache.stats()
+
     # -----------------------------
     # Retrieval
     # -----------------------------
+    def _search_options(
+        self,
+        mode: Optional[str] = None,
+        fusion: Optional[str] = None,
+        dense_limit: Optional[int] = None,
+        sparse_limit: Optional[int] = None,
+        weights: Optional[Tuple[float, float]] = None,
+    ) -> Dict[str, Any]:
+        """Per-call overrides merged over the instance defaults."""
+        options = {
+            "mode": mode or self.search_mode,
+            "fusion": fusion or self.fusion,
+            "dense_limit": dense_limit or self.dense_prefetch_limit,
+            "sparse_limit": sparse_limit or self.sparse_prefetch_limit,
+            "weights": tuple(weights or self.fusion_weights),
+        }
+        if options["mode"] not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {options['mode']!r}; choose one of {SEARCH_MODES}")
+        if options["fusion"] not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion {options['fusion']!r}; choose one of {FUSION_METHODS}")
+        return options
+
+    def _search_requests(
+        self,
+        dense_vector: Optional[List[float]],
+        sparse_vector: Optional[qm.SparseVector],
+        limit: int,
+        score_threshold: Optional[float],
+        query_filter: Optional[qm.Filter],
+        options: Dict[str, Any],
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[qm.QueryRequest]:
+        """One request fused server-side, or one request per leg for weighted fusion."""
+        search_params = self.profile.search_params()
+        # with_payload=[...] makes Qdrant return only those keys.
+        with_payload: Union[bool, List[str]] = list(fields) if fields is not None else True
+        if options["fusion"] == "weighted" and dense_vector is not None and sparse_vector is not None:
+            return [
+                build_query_request(self.client, dense_vector, None,
+                                    limit=options["dense_limit"] or limit,
+                                    score_threshold=score_threshold, query_filter=query_filter,
+                                    search_params=search_params, with_payload=with_payload),
+                build_query_request(self.client, None, sparse_vector,
+                                    limit=options["sparse_limit"] or limit,
+                                    score_threshold=score_threshold, query_filter=query_filter,
+                                    with_payload=with_payload),
+            ]
+        return [
+            build_query_request(
+                self.client,
+                dense_vector,
+                sparse_vector,
+                limit=limit,
+                score_threshold=score_threshold,
+                query_filter=query_filter,
+                search_params=search_params,
+                fusion=options["fusion"] if options["fusion"] != "weighted" else "rrf",
+                dense_limit=options["dense_limit"],
+                sparse_limit=options["sparse_limit"],
+                with_payload=with_payload,
+            )
+        ]
+
+    @staticmethod
+    def _merge_responses(
+        responses: Sequence[qm.QueryResponse], limit: int, options: Dict[str, Any]
+    ) -> List[qm.ScoredPoint]:
+        if len(responses) == 2:
+            return weighted_fusion(responses[0].points, responses[1].points, options["weights"], limit)
+        return responses[0].points
+
+    def _rerank_plan(
+        self, rerank: Optional[bool], limit: int, fields: Optional[Sequence[str]]
+    ) -> Tuple[bool, int, Optional[Sequence[str]]]:
+        """(rerank?, candidates to retrieve, payload fields to fetch) for one query."""
+        if self._reranker is None or rerank is False:
+            return False, limit, fields
+        if fields is not None:
+            # The cross-encoder needs the text and the cache key.
+            fields = list(dict.fromkeys([*fields, "document", "page_content", "chunk_id"]))
+        return True, limit * max(1, self.rerank_oversample), fields
+
+    def search(
+        self,
+        query_text: str,
+        limit: int = 5,
+        mode: Optional[str] = None,
+        fusion: Optional[str] = None,
+        dense_limit: Optional[int] = None,
+        sparse_limit: Optional[int] = None,
+        weights: Optional[Tuple[float, float]] = None,
+        score_threshold: Optional[float] = None,
+        query_filter: Optional[qm.Filter] = None,
+        fields: Optional[Sequence[str]] = None,
+        rerank: Optional[bool] = None,
+    ) -> Tuple[List[Hit], Dict[str, float]]:
+        """
+        Explicit hybrid query pipeline. Returns (results, timings).
+
+        - mode: "hybrid" (dense+sparse), "dense" or "sparse" only
+        - fusion: "rrf" / "dbsf" fused by Qdrant in one prefetch request, or
+          "weighted": both legs in one batch request, fused client-side with
+          `weights` = (dense, sparse) over min-max normalized scores
+        - dense_limit / sparse_limit: candidates fetched per leg before fusion
+        - fields: payload keys to fetch (None = full payload); page_content is
+          only filled when 'document' (or 'page_content') is among them
+        - rerank: run the cross-encoder stage (default: on when
+          rerank_model_name is set); retrieval then fetches
+          limit * rerank_oversample candidates
+
+        The dense and sparse query embeddings are computed concurrently.
+        timings (ms): embed_dense_ms / embed_sparse_ms per leg, embed_ms (wall),
+        search_ms (Qdrant round trip + fusion), rerank_ms and total_ms.
+        Unlike query(), errors are raised and the query cache is bypassed.
+        """
+        options = self._search_options(mode, fusion, dense_limit, sparse_limit, weights)
+        final_limit = limit
+        rerank, limit, fields = self._rerank_plan(rerank, limit, fields)
+        timings: Dict[str, float] = {}
+        t0 = perf_counter()
+        dense, sparse = embed_queries(
+            self.client, [query_text], mode=options["mode"],
+            executor=self._query_executor, timings=timings,
+        )
+        t1 = perf_counter()
+        requests = self._search_requests(
+            dense[0] if dense is not None else None,
+            sparse[0] if sparse is not None else None,
+            limit, score_threshold, query_filter, options, fields,
+        )
+        if len(requests) == 1:
+            request = requests[0]
+            responses = [
+                self.client.query_points(
+                    collection_name=self.collection_name,
+                    prefetch=request.prefetch,
+                    query=request.query,
+                    using=request.using,
+                    query_filter=request.filter,
+                    search_params=request.params,
+                    score_threshold=request.score_threshold,
+                    limit=request.limit,
+                    with_payload=request.with_payload,
+                )
+            ]
+        else:
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name, requests=requests
+            )
+        points = self._merge_responses(responses, limit, options)
+        hits = [to_result(p.id, p.score, p.payload) for p in points]
+        t2 = perf_counter()
+        if rerank:
+            hits = self._reranker.rerank(query_text, hits, final_limit)
+        t3 = perf_counter()
+        timings.update(
+            embed_ms=(t1 - t0) * 1000,
+            search_ms=(t2 - t1) * 1000,
+            rerank_ms=(t3 - t2) * 1000,
+            total_ms=(t3 - t0) * 1000,
+        )
+        return hits, timings
+
     def query(
         self,
         query_text: str,
         limit: int = 5,
         score_threshold: Optional[float] = None,
         query_filter: Optional[qm.Filter] = None,
-    ) -> List[Dict[str, Any]]:
+        mode: Optional[str] = None,
+        fusion: Optional[str] = None,
+        dense_limit: Optional[int] = None,
+        sparse_limit: Optional[int] = None,
+        weights: Optional[Tuple[float, float]] = None,
+        fields: Optional[Sequence[str]] = None,
+        rerank: Optional[bool] = None,
+    ) -> List[Hit]:
         """
-        Text query using FastEmbed path. If a sparse model is set, Qdrant will
-        fuse dense+sparse (RRF) under the hood.
+        Text query using FastEmbed path. If a sparse model is set, Qdrant
+        fuses dense+sparse (RRF) server-side in a single query_points call.
+        mode / fusion / per-leg limits / weights override the instance
+        defaults for this call (see search()); `fields` limits the payload
+        keys fetched (e.g. ["document", "source"]); rerank=False skips the
+        cross-encoder stage when one is configured.
 
-        Returns a list of dicts with id, score, page_content, and metadata.
+        Returns a list of Hit mappings with id, score, page_content, and metadata.
+        Results may be served from the query cache when it is enabled.
         """
         try:
-            kwargs: Dict[str, Any] = {"limit": limit}
-            if score_threshold is not None:
-                kwargs["score_threshold"] = score_threshold
-            if query_filter is not None:
-                kwargs["query_filter"] = query_filter
+            options = self._search_options(mode, fusion, dense_limit, sparse_limit, weights)
+        except ValueError as e:
+            print(f"Error using query(): {e}")
+            return []
 
-            results = self.client.query(
-                collection_name=self.collection_name,
-                query_text=query_text,
-                **kwargs,
-            )
-
-            normalized = []
-            for r in results:
-                # r.metadata contains payload incl. 'document' (and our 'page_content')
-                payload = dict(r.metadata or {})
-                text = payload.get("page_content") or payload.get("document") or ""
-                normalized.append(
-                    {
-                        "id": r.id,
-                        "score": getattr(r, "score", None),
-                        "page_content": text,
-                        "metadata": payload,
-                    }
-                )
+        cache_key = None
+        if self._query_cache is not None:
+            cache_key = self._query_cache_key(
+                query_text, limit, score_threshold, query_filter,
+                {
+                    **options,
+                    "fields": tuple(fields) if fields is not None else None,
+                    "rerank": self._reranker is not None and rerank is not False,
+                },
+            )
+            cached = self._query_cache.get(cache_key)
+            if cached is not None:
+                return copy_hits(cached)
+
+        try:
+            normalized, _ = self.search(
+                query_text,
+                limit=limit,
+                score_threshold=score_threshold,
+                query_filter=query_filter,
+                fields=fields,
+                rerank=rerank,
+                **options,
+            )
+            if cache_key is not None:
+                self._query_cache.put(cache_key, normalized)
+                return copy_hits(normalized)
             return normalized
         except Exception as e:
             print(f"Error using query(): {e}")
             return []
 
-    def scroll_all(self, batch_size: int = 100) -> List[Dict[str, Any]]:
+    def query_batch(
+        self,
+        texts: Sequence[str],
+        limit: int = 5,
+        filters: Optional[Union[qm.Filter, Sequence[Optional[qm.Filter]]]] = None,
+        score_threshold: Optional[float] = None,
+        mode: Optional[str] = None,
+        fusion: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        rerank: Optional[bool] = None,
+    ) -> List[List[Hit]]:
         """
-        Read the entire collection with proper scrolling.
+        Run several text queries at once.
 
-        Uses the 'next_page_offset' returned by Qdrant, not a naive integer step.
+        All query texts are embedded in one FastEmbed batch per model (dense and
+        sparse concurrently when hybrid is enabled) and sent to Qdrant as a
+        single query_batch_points request. In hybrid mode each query is a
+        dense+sparse prefetch fused on the server (or, for weighted fusion, two
+        leg requests fused client-side).
+
+        `filters` is either one filter applied to every query or a list with one
+        (possibly None) filter per query. `fields` projects payloads as in
+        query(), and each query is reranked as in query() (rerank=False skips
+        it). Returns one result list per query, in the same shape as query().
         """
-        all_docs: List[Dict[str, Any]] = []
-        next_offset: Optional[Union[int, str]] = None
+        texts = list(texts)
+        if filters is None or isinstance(filters, qm.Filter):
+            per_query_filters = [filters] * len(texts)
+        else:
+            per_query_filters = list(filters)
+            if len(per_query_filters) != len(texts):
+                raise ValueError("len(filters) must match len(texts)")
+        options = self._search_options(mode, fusion)
+        cache_options = {
+            **options,
+            "fields": tuple(fields) if fields is not None else None,
+            "rerank": self._reranker is not None and rerank is not False,
+        }
+        final_limit = limit
+        rerank, limit, fields = self._rerank_plan(rerank, limit, fields)
+
+        results: List[Optional[List[Hit]]] = [None] * len(texts)
+        cache_keys: List[Optional[tuple]] = [None] * len(texts)
+        if self._query_cache is not None:
+            for i, (text, f) in enumerate(zip(texts, per_query_filters)):
+                cache_keys[i] = self._query_cache_key(text, final_limit, score_threshold, f, cache_options)
+                cached = self._query_cache.get(cache_keys[i])
+                if cached is not None:
+                    results[i] = copy_hits(cached)
+
+        pending = [i for i, r in enumerate(results) if r is None]
+        if not pending:
+            return results
 
         try:
-            while True:
-                points, next_offset = self.client.scroll(
-                    collection_name=self.collection_name,
-                    limit=batch_size,
-                    offset=next_offset,        # <-- correct paging token
-                    with_payload=True,
-                    with_vectors=False,
+            pending_texts = [texts[i] for i in pending]
+            dense_vectors, sparse_vectors = embed_queries(
+                self.client, pending_texts, mode=options["mode"], executor=self._query_executor
+            )
+            per_query_requests = [
+                self._search_requests(
+                    dense_vectors[n] if dense_vectors is not None else None,
+                    sparse_vectors[n] if sparse_vectors is not None else None,
+                    limit, score_threshold, per_query_filters[i], options, fields,
                 )
-                if not points:
-                    break
-
-                for p in points:
-                    payload = dict(p.payload or {})
-                    text = payload.get("page_content") or payload.get("document") or ""
-                    meta = {k: v for k, v in payload.items()}
-                    all_docs.append(
-                        {"id": p.id, "page_content": text, "metadata": meta}
-                    )
+                for n, i in enumerate(pending)
+            ]
+
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=[r for reqs in per_query_requests for r in reqs],
+            )
+            offset = 0
+            for i, reqs in zip(pending, per_query_requests):
+                points = self._merge_responses(responses[offset:offset + len(reqs)], limit, options)
+                offset += len(reqs)
+                normalized = [to_result(p.id, p.score, p.payload) for p in points]
+                if rerank:
+                    normalized = self._reranker.rerank(texts[i], normalized, final_limit)
+                if cache_keys[i] is not None:
+                    self._query_cache.put(cache_keys[i], normalized)
+                    normalized = copy_hits(normalized)
+                results[i] = normalized
+        except Exception as e:
+            print(f"Error using query_batch(): {e}")
+            for i in pending:
+                results[i] = []
+        return results
+
+    def _scroll_pages(
+        self,
+        page_size: int,
+        fields: Optional[Sequence[str]],
+        scroll_filter: Optional[qm.Filter],
+    ) -> Iterator[List[Hit]]:
+        # with_payload=[...] makes Qdrant return only those keys.
+        with_payload: Union[bool, List[str]] = list(fields) if fields is not None else True
+        next_offset: Optional[Union[int, str]] = None
+        while True:
+            points, next_offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=page_size,
+                offset=next_offset,        # <-- correct paging token
+                with_payload=with_payload,
+                with_vectors=False,
+            )
+            if not points:
+                return
+
+            yield [to_result(p.id, None, p.payload) for p in points]
+
+            if next_offset is None:
+                return
+
+    def iter_scroll(
+        self,
+        page_size: int = 256,
+        fields: Optional[Sequence[str]] = None,
+        scroll_filter: Optional[qm.Filter] = None,
+    ) -> Iterator[List[Hit]]:
+        """
+        Lazily walk the collection one page at a time.
+
+        - fields: payload keys to fetch (e.g. ["source_id"]); None fetches the
+          full payload. 'page_content' is only filled if the text keys are requested.
+        - scroll_filter: optional Qdrant filter restricting the walk.
+
+        Memory use is bounded by page_size regardless of collection size.
+
+        If the first page fails (e.g. no such collection) the error is printed
+        and nothing is yielded. A failure after that is re-raised, so callers
+        never mistake a truncated walk for the whole collection.
+        """
+        started = False
+        try:
+            for page in self._scroll_pages(page_size, fields, scroll_filter):
+                started = True
+                yield page
+        except Exception as e:
+            if started:
+                raise
+            print(f"Error retrieving documents: {e}")
 
-                if next_offset is None:
-                    break
+    def scroll_all(
+        self, batch_size: int = 100, fields: Optional[Sequence[str]] = None
+    ) -> List[Hit]:
+        """
+        Read the entire collection with proper scrolling.
 
+        Uses the 'next_page_offset' returned by Qdrant, not a naive integer step.
+        `fields` projects payloads as in iter_scroll().
+        Prefer iter_scroll() for large collections.
+        """
+        all_docs: List[Hit] = []
+        try:
+            for page in self._scroll_pages(batch_size, fields, None):
+                all_docs.extend(page)
             return all_docs
         except Exception as e:
             print(f"Error retrieving documents: {e}")
@@ -219,18 +1312,7 @@ class VectorDB(BaseModel):
         Create payload indexes for the most common fields we’ll filter by.
         Safe to call multiple times; Qdrant will ignore existing indexes.
         """
-        index_specs = [
-            ("source", "keyword"),
-            ("source_id", "keyword"),
-            ("doc_id", "keyword"),
-            ("chunk_id", "keyword"),
-            ("chunk_index", "integer"),
-            ("page", "integer"),
-            ("ext", "keyword"),
-            ("lang", "keyword"),
-            ("year", "integer"),
-        ]
-        for field_name, schema in index_specs:
+        for field_name, schema in PAYLOAD_INDEX_SPECS:
             try:
                 self.client.create_payload_index(
                     collection_name=self.collection_name,
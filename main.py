@@ -8,7 +8,6 @@ from google.adk.agents.run_config import RunConfig, StreamingMode
 
 from agents import Agents
 
-agents = Agents()
 # --- Main Execution Logic ---
 async def async_main():
   session_service = InMemorySessionService()
@@ -23,7 +22,8 @@ async def async_main():
   print(Fore.GREEN + f"User Query: '{query}'")
   content = types.Content(role='user', parts=[types.Part(text=query)])
 
-  root_agent, toolset = await agents.get_rag_agent_async()
+  # Shared, memoized agent: built once per process, reused on later calls.
+  root_agent, toolset = await Agents().get_rag_agent_async()
 
   runner = Runner(
       app_name='mcp_filesystem_app',
@@ -55,6 +55,9 @@ async def async_main():
           print(Fore.BLUE + event.content.parts[0].text, flush=True, end="")
 
   # Crucial Cleanup: Ensure the MCP server process connection is closed.
+  metrics = toolset.metrics()
+  print(Fore.YELLOW + f"\nMCP pool: connect p50 {metrics['connect_ms']['p50']} ms, "
+        f"{metrics['calls']} calls, peak in-flight {metrics['peak_in_flight']}, reconnects {metrics['reconnects']}")
   print(Fore.YELLOW + "Closing MCP server connection...")
   await toolset.close()
   print("Cleanup complete.")
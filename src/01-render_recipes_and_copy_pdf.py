@@ -11,19 +11,29 @@ Pipeline:
        • integer + vulgar fraction → decimal (e.g., 3½ → 3.5)
        • standalone vulgar fraction → ASCII (e.g., ½ → 1/2)
        • normalize dashes, NBSP, quotes, fraction slash
-   - Render that temp file to PDF into quarto/_pdf/<subdir>/.
-     (We render each file with `cwd=out_dir` and `--output <name>.pdf`.)
-3) Copy PDFs from quarto/_pdf/** into data/**, preserving folder structure.
+   - Render that temp file to PDF into quarto/_pdf/<subdir>/, unless the
+     render cache says the augmented source (and Quarto config) is unchanged.
+     (We render each file with `cwd=out_dir` and `--output <name>.pdf`;
+     up to --workers renders run concurrently.)
+3) Copy new/changed PDFs from quarto/_pdf/** into data/**, preserving folder
+   structure, and delete PDFs whose recipe is gone.
 
 Usage:
-    python src/01-render_recipes_and_copy_pdf.py
+    python src/01-render_recipes_and_copy_pdf.py [--workers N] [--force]
 """
 
-import re
+import argparse
+import hashlib
+import json
+import os
 import shutil
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from quarto_text import normalize_text_for_pdf, split_front_matter
+
 # --- Paths (assumes this file lives in repo/src) ---
 ROOT = Path(__file__).resolve().parents[1]
 QUARTO_DIR = ROOT / "quarto"
@@ -35,9 +45,15 @@ DATA_DIR = ROOT / "data"
 # Which subfolders contain the documents you want PDFs for
 CONTENT_SUBDIRS = ["recipes"]
 
-# Optional: clean old PDFs in data before copying
+# Optional: remove PDFs from data/ whose source .qmd no longer exists
 CLEAN_DATA_PDF = True
 
+# Render cache: augmented-source hash per PDF, so unchanged recipes skip LaTeX.
+RENDER_CACHE = PDF_OUT_DIR / ".render_cache.json"
+RENDER_CACHE_VERSION = 1
+# Project-level files that can change every PDF's output.
+QUARTO_CONFIG_GLOBS = ["_quarto*.yml", "_metadata.yml"]
+
 def run(cmd, cwd=None):
     try:
         res = subprocess.run(
@@ -60,130 +76,9 @@ def render_html_site():
         raise SystemExit("❌ Expected HTML output directory not found: _site/")
     print("✅ HTML render complete.")
 
-YAML_RE = re.compile(r"^---\s*\n(.*?)\n---\s*\n?", re.DOTALL)
-
-def split_front_matter(text: str):
-    """Return (yaml_text, body_text). If no YAML is found, yaml_text=''."""
-    m = YAML_RE.match(text)
-    if not m:
-        return "", text
-    yaml_text = m.group(1)
-    body_text = text[m.end():]
-    return yaml_text, body_text
-
-# --- Normalization rules for PDF text extraction ---
-# Standalone ASCII replacements for vulgar fractions
-_VULGAR_TO_ASCII = {
-    "¼": "1/4",
-    "½": "1/2",
-    "¾": "3/4",
-    "⅐": "1/7",
-    "⅑": "1/9",
-    "⅒": "1/10",
-    "⅓": "1/3",
-    "⅔": "2/3",
-    "⅕": "1/5",
-    "⅖": "2/5",
-    "⅗": "3/5",
-    "⅘": "4/5",
-    "⅙": "1/6",
-    "⅚": "5/6",
-    "⅛": "1/8",
-    "⅜": "3/8",
-    "⅝": "5/8",
-    "⅞": "7/8",
-}
-
-# When a vulgar fraction directly follows an integer, convert to decimal part
-# Use readable decimals; exact where finite, otherwise common rounded approximations.
-_VULGAR_TO_DECIMAL_PART = {
-    "¼": ".25",
-    "½": ".5",
-    "¾": ".75",
-    "⅐": ".14",   # ~.142857
-    "⅑": ".11",   # ~.111...
-    "⅒": ".1",
-    "⅓": ".33",
-    "⅔": ".67",
-    "⅕": ".2",
-    "⅖": ".4",
-    "⅗": ".6",
-    "⅘": ".8",
-    "⅙": ".17",
-    "⅚": ".83",
-    "⅛": ".125",
-    "⅜": ".375",
-    "⅝": ".625",
-    "⅞": ".875",
-}
-
-_VFRACS_CLASS = "".join(map(re.escape, _VULGAR_TO_ASCII.keys()))
-# Match an integer followed (optionally with a space) by a vulgar fraction
-_RE_INT_VFRAC = re.compile(rf"(?P<int>\d+)\s*(?P<vfrac>[{_VFRACS_CLASS}])")
-
-def _replace_int_vfrac_with_decimal(m: re.Match) -> str:
-    v = m.group("vfrac")
-    dec = _VULGAR_TO_DECIMAL_PART.get(v)
-    if dec is None:
-        # Fallback: leave as integer + ASCII fraction with a space
-        return f"{m.group('int')} {_VULGAR_TO_ASCII.get(v, '')}"
-    # Avoid things like "3.50" -> keep as "3.5" by not adding trailing zeros beyond mapping
-    return f"{m.group('int')}{dec}"
-
-def normalize_text_for_pdf(text: str) -> str:
-    """
-    Normalize text to ASCII-friendly forms for robust PDF text extraction:
-    - integer + vulgar fraction → decimal (3½ → 3.5)
-    - standalone vulgar fraction → ASCII (½ → 1/2)
-    - fraction slash: ⁄ → /
-    - dashes: –, — → -
-    - NBSP/narrow NBSP → space; remove zero-width characters
-    - smart quotes → straight; ellipsis → ...
+def augmented_qmd_text(src_qmd: Path) -> str:
     """
-    if not text:
-        return text
-
-    # Normalize spaces and remove zero-widths
-    text = (
-        text.replace("\u00A0", " ")  # NBSP
-            .replace("\u202F", " ")  # narrow NBSP
-            .replace("\u2009", " ")  # thin space
-            .replace("\u200A", " ")  # hair space
-            .replace("\u200B", "")   # zero-width space
-            .replace("\uFEFF", "")   # BOM / zero-width no-break space
-    )
-
-    # Fraction slash
-    text = text.replace("\u2044", "/")
-
-    # Integer + vulgar fraction → decimal (3½ → 3.5)
-    text = _RE_INT_VFRAC.sub(_replace_int_vfrac_with_decimal, text)
-
-    # Replace remaining standalone vulgar fractions with ASCII (½ → 1/2)
-    if _VFRACS_CLASS:
-        text = re.sub(
-            rf"[{_VFRACS_CLASS}]",
-            lambda m: _VULGAR_TO_ASCII[m.group(0)],
-            text,
-        )
-
-    # Normalize dashes
-    text = text.replace("–", "-").replace("—", "-")
-
-    # Normalize smart quotes and ellipsis
-    text = text.translate({
-        ord("“"): '"',
-        ord("”"): '"',
-        ord("‘"): "'",
-        ord("’"): "'",
-        ord("…"): "...",
-    })
-
-    return text
-
-def make_augmented_qmd(src_qmd: Path, dst_qmd: Path):
-    """
-    Copy a .qmd and append a visible YAML dump to the end as a code block,
+    A .qmd with a visible YAML dump appended to the end as a code block,
     so the PDF includes the YAML info in its text content.
 
     Important: Keep the original front matter unchanged for Quarto.
@@ -205,8 +100,46 @@ def make_augmented_qmd(src_qmd: Path, dst_qmd: Path):
         if yaml_text else ""
     )
 
-    dst_qmd.parent.mkdir(parents=True, exist_ok=True)
-    dst_qmd.write_text(fm_prefix + norm_body + meta_section, encoding="utf-8")
+    return fm_prefix + norm_body + meta_section
+
+def quarto_config_hash() -> str:
+    """Hash of the project config files and the Quarto version: a change re-renders everything."""
+    h = hashlib.sha256()
+    configs = sorted({p for pattern in QUARTO_CONFIG_GLOBS for p in QUARTO_DIR.glob(pattern)})
+    for path in configs:
+        h.update(path.name.encode("utf-8"))
+        h.update(path.read_bytes())
+    h.update(run(["quarto", "--version"]).strip().encode("utf-8"))
+    return h.hexdigest()
+
+def load_render_cache(config_hash: str) -> dict:
+    """{pdf rel path: source hash} from the last run, or {} if missing or the config changed."""
+    try:
+        data = json.loads(RENDER_CACHE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    if data.get("version") != RENDER_CACHE_VERSION or data.get("config") != config_hash:
+        return {}
+    return data.get("files", {})
+
+def save_render_cache(config_hash: str, files: dict):
+    RENDER_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = RENDER_CACHE.with_name(RENDER_CACHE.name + ".tmp")
+    tmp.write_text(
+        json.dumps({"version": RENDER_CACHE_VERSION, "config": config_hash, "files": files}, indent=1),
+        encoding="utf-8",
+    )
+    os.replace(tmp, RENDER_CACHE)
+
+def remove_orphans(root: Path, pattern: str, keep: set, label: str):
+    """Delete files under root matching pattern whose relative path is not in keep."""
+    if not root.exists():
+        return
+    removed = [p for p in root.rglob(pattern) if p.relative_to(root) not in keep]
+    for p in removed:
+        p.unlink(missing_ok=True)
+    if removed:
+        print(f"🧹 Removed {len(removed)} orphaned {label}.")
 
 def collect_source_qmds():
     """Yield all source .qmd files to render as PDFs (skip project root index.qmd)."""
@@ -214,93 +147,184 @@ def collect_source_qmds():
         for qmd in (QUARTO_DIR / sub).rglob("*.qmd"):
             yield qmd
 
-def render_pdfs():
+def render_pdf(tmp_qmd: Path):
+    """
+    Render one augmented .qmd to PDF with its output captured.
+    Returns (rel_pdf_path, seconds, error_text or None); never raises on a
+    render failure so one bad file doesn't hide the others.
+    """
+    rel = tmp_qmd.relative_to(PDF_TMP_DIR)
+    out_dir = PDF_OUT_DIR / rel.parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Output must be only a filename (no path) → set cwd=out_dir
+    output_name = rel.with_suffix(".pdf").name
+    # Use absolute path for the input qmd to be safe across cwd changes
+    input_qmd_abs = str(tmp_qmd.resolve())
+
+    start = time.perf_counter()
+    try:
+        res = subprocess.run(
+            [
+                "quarto",
+                "render",
+                input_qmd_abs,
+                "--to", "pdf",
+                "--output", output_name,  # filename only!
+            ],
+            cwd=out_dir,  # ensures the PDF is written into out_dir
+            text=True,
+            capture_output=True,
+        )
+    except FileNotFoundError:
+        raise SystemExit(
+            "Could not find the 'quarto' CLI. Make sure Quarto is installed and on PATH."
+        )
+    error = None
+    if res.returncode != 0:
+        error = f"exit code {res.returncode}\n{res.stdout}\n{res.stderr}".strip()
+    return rel.with_suffix(".pdf"), time.perf_counter() - start, error
+
+def render_pdfs(workers=None, force=False):
     """
     Create augmented temp .qmds with YAML embedded (and normalized text),
-    then render each to PDF.
+    then render to PDF the ones whose content changed.
+
+    A render cache (quarto/_pdf/.render_cache.json) keys each PDF on the
+    hash of its augmented source plus quarto_config_hash(); a PDF is only
+    re-rendered when that key changed or the PDF is missing (force=True
+    renders everything). PDFs and temp sources whose recipe was removed
+    are deleted. Returns the set of expected PDF paths (relative to _pdf/).
+
+    Each render is its own `quarto render` process (with its own LaTeX run),
+    so up to `workers` (default: CPU count) run at once; threads only wait
+    on the subprocesses. Failures are collected and reported per file after
+    every render has finished, followed by a per-file timing summary.
 
     NOTE: For single-file renders, Quarto forbids paths in --output.
     We set cwd=target_out_dir and pass only the filename to --output.
     """
     print("🛠️ Preparing augmented sources for PDF...")
-    if PDF_TMP_DIR.exists():
-        shutil.rmtree(PDF_TMP_DIR)
     PDF_TMP_DIR.mkdir(parents=True, exist_ok=True)
-
     PDF_OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    augmented_files = []
+    config_hash = quarto_config_hash()
+    cached = {} if force else load_render_cache(config_hash)
+    cache = {}
+    expected = set()
+    augmented_files, keys = [], {}
     for src in collect_source_qmds():
         rel = src.relative_to(QUARTO_DIR)
+        pdf_rel = rel.with_suffix(".pdf")
+        expected.add(pdf_rel)
+        text = augmented_qmd_text(src)
+        key = hashlib.sha256(f"{config_hash}\n{text}".encode("utf-8")).hexdigest()
+        if cached.get(str(pdf_rel)) == key and (PDF_OUT_DIR / pdf_rel).exists():
+            cache[str(pdf_rel)] = key
+            continue
         dst = PDF_TMP_DIR / rel  # mirror structure under _tmp_pdf
-        make_augmented_qmd(src, dst)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        dst.write_text(text, encoding="utf-8")
         augmented_files.append(dst)
+        keys[pdf_rel] = key
 
-    if not augmented_files:
-        print("⚠️ No content .qmd files found to render as PDF.")
-        return
-
-    print("📄 Rendering PDFs (single-file renders with cwd-outdir)...")
-    for tmp_qmd in augmented_files:
-        rel = tmp_qmd.relative_to(PDF_TMP_DIR)
-        out_dir = PDF_OUT_DIR / rel.parent
-        out_dir.mkdir(parents=True, exist_ok=True)
-
-        # Output must be only a filename (no path) → set cwd=out_dir
-        output_name = rel.with_suffix(".pdf").name
-        # Use absolute path for the input qmd to be safe across cwd changes
-        input_qmd_abs = str(tmp_qmd.resolve())
+    remove_orphans(PDF_OUT_DIR, "*.pdf", expected, "PDF(s) from quarto/_pdf")
+    remove_orphans(PDF_TMP_DIR, "*.qmd", {p.with_suffix(".qmd") for p in expected}, "temp source(s)")
 
-        run(
-            [
-                "quarto",
-                "render",
-                input_qmd_abs,
-                "--to", "pdf",
-                "--output", output_name,  # filename only!
-            ],
-            cwd=out_dir,  # ensures the PDF is written into out_dir
-        )
-        print(f"  ✓ {rel.with_suffix('.pdf')}")
+    if not expected:
+        print("⚠️ No content .qmd files found to render as PDF.")
+        save_render_cache(config_hash, cache)
+        return expected
+    print(f"♻️ {len(cache)} PDF(s) unchanged (render cache), {len(augmented_files)} to render.")
+    if not augmented_files:
+        save_render_cache(config_hash, cache)
+        return expected
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(augmented_files)))
+    print(f"📄 Rendering {len(augmented_files)} PDFs with {workers} worker(s)...")
+    start = time.perf_counter()
+    timings, failures = {}, {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_pdf, f) for f in augmented_files]
+        for future in as_completed(futures):
+            rel, seconds, error = future.result()
+            timings[rel] = seconds
+            if error:
+                failures[rel] = error
+                print(f"  ✗ {rel} ({seconds:.1f}s)")
+            else:
+                cache[str(rel)] = keys[rel]
+                print(f"  ✓ {rel} ({seconds:.1f}s)")
+    wall = time.perf_counter() - start
+    # Failed files stay out of the cache, so the next run retries them.
+    save_render_cache(config_hash, cache)
+
+    print("⏱️ Render times (slowest first):")
+    for rel, seconds in sorted(timings.items(), key=lambda kv: kv[1], reverse=True):
+        print(f"  {seconds:7.1f}s  {rel}")
+    print(
+        f"  {len(timings)} file(s) in {wall:.1f}s wall, {sum(timings.values()):.1f}s total render time "
+        f"({workers} worker(s))"
+    )
 
+    if failures:
+        for rel, error in failures.items():
+            print(f"\n❌ {rel} failed:\n{error}")
+        raise SystemExit(f"❌ {len(failures)} of {len(timings)} PDF render(s) failed: "
+                         + ", ".join(str(r) for r in failures))
     print("✅ PDF render complete.")
+    return expected
 
-def clean_old_pdfs_in_data():
-    if not DATA_DIR.exists():
-        return
-    count = 0
-    for p in DATA_DIR.rglob("*.pdf"):
-        p.unlink(missing_ok=True)
-        count += 1
-    print(f"🧹 Removed {count} old .pdf files from data/.")
+def clean_old_pdfs_in_data(expected):
+    """Delete PDFs in data/ that no rendered recipe maps to (others are left untouched)."""
+    remove_orphans(DATA_DIR, "*.pdf", expected, "PDF(s) from data/")
 
-def copy_pdfs_to_data():
-    print("📂 Copying PDFs from _pdf/ → data/ ...")
+def copy_pdfs_to_data(expected):
+    """
+    Copy PDFs from quarto/_pdf/** into data/** (preserving folder structure),
+    only where data/ is missing the file or holds a different version.
+    copy2 keeps the source mtime, so untouched PDFs keep theirs and
+    incremental ingestion skips them.
+    """
+    print("📂 Copying changed PDFs from _pdf/ → data/ ...")
     if not PDF_OUT_DIR.exists():
         raise SystemExit("❌ PDF output directory not found: quarto/_pdf")
 
     DATA_DIR.mkdir(exist_ok=True)
 
-    pdfs = list(PDF_OUT_DIR.rglob("*.pdf"))
-    if not pdfs:
-        print("⚠️ No PDFs found in quarto/_pdf.")
-        return
-
-    for src in pdfs:
-        rel = src.relative_to(PDF_OUT_DIR)   # preserve folder structure
+    copied = 0
+    for rel in sorted(expected):
+        src = PDF_OUT_DIR / rel
+        if not src.exists():
+            continue  # failed render
         dst = DATA_DIR / rel
+        if dst.exists():
+            s_st, d_st = src.stat(), dst.stat()
+            if s_st.st_size == d_st.st_size and s_st.st_mtime_ns == d_st.st_mtime_ns:
+                continue
         dst.parent.mkdir(parents=True, exist_ok=True)
         shutil.copy2(src, dst)
+        copied += 1
         print(f"  → {rel}")
 
-    print("✅ Copied PDFs into data/.")
+    print(f"✅ Copied {copied} PDF(s) into data/ ({len(expected) - copied} unchanged).")
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Render the Quarto site and export per-recipe PDFs into data/")
+    p.add_argument("--workers", type=int, default=None,
+                   help="Concurrent PDF renders (default: CPU count; 1 renders serially)")
+    p.add_argument("--force", action="store_true",
+                   help="Ignore the render cache and re-render every PDF")
+    return p.parse_args()
 
 def main():
+    args = parse_args()
     render_html_site()   # keep your website working
-    render_pdfs()        # build PDFs with YAML in body and normalized text
+    # build PDFs with YAML in body and normalized text (changed recipes only)
+    expected = render_pdfs(workers=args.workers, force=args.force)
     if CLEAN_DATA_PDF:
-        clean_old_pdfs_in_data()
-    copy_pdfs_to_data()
+        clean_old_pdfs_in_data(expected)
+    copy_pdfs_to_data(expected)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark normalize_text_for_pdf() (compiled rules) against the original
+multi-pass implementation on MB-scale text built from the recipe corpus.
+
+Usage:
+    python src/bench_quarto_text.py [--mb 8] [--repeat 5] [--chunk 800]
+
+--chunk also times the per-chunk case (ingestion/query time), where call
+overhead matters more than raw throughput.
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+from quarto_text import _VFRACS_CLASS, _VULGAR_TO_ASCII, _VULGAR_TO_DECIMAL_PART, normalize_text_for_pdf
+
+ROOT = Path(__file__).resolve().parents[1]
+RECIPES_DIR = ROOT / "quarto" / "recipes"
+
+# Match an integer followed (optionally with a space) by a vulgar fraction
+_RE_INT_VFRAC = re.compile(rf"(?P<int>\d+)\s*(?P<vfrac>[{_VFRACS_CLASS}])")
+
+
+def _replace_int_vfrac_with_decimal(m: re.Match) -> str:
+    v = m.group("vfrac")
+    dec = _VULGAR_TO_DECIMAL_PART.get(v)
+    if dec is None:
+        # Fallback: leave as integer + ASCII fraction with a space
+        return f"{m.group('int')} {_VULGAR_TO_ASCII.get(v, '')}"
+    # Avoid things like "3.50" -> keep as "3.5" by not adding trailing zeros beyond mapping
+    return f"{m.group('int')}{dec}"
+
+
+def normalize_text_multipass(text: str) -> str:
+    """Original rule-by-rule implementation; the reference for tests and benchmarks."""
+    if not text:
+        return text
+
+    # Normalize spaces and remove zero-widths
+    text = (
+        text.replace("\u00A0", " ")  # NBSP
+            .replace("\u202F", " ")  # narrow NBSP
+            .replace("\u2009", " ")  # thin space
+            .replace("\u200A", " ")  # hair space
+            .replace("\u200B", "")   # zero-width space
+            .replace("\uFEFF", "")   # BOM / zero-width no-break space
+    )
+
+    # Fraction slash
+    text = text.replace("\u2044", "/")
+
+    # Integer + vulgar fraction → decimal (3½ → 3.5)
+    text = _RE_INT_VFRAC.sub(_replace_int_vfrac_with_decimal, text)
+
+    # Replace remaining standalone vulgar fractions with ASCII (½ → 1/2)
+    if _VFRACS_CLASS:
+        text = re.sub(
+            rf"[{_VFRACS_CLASS}]",
+            lambda m: _VULGAR_TO_ASCII[m.group(0)],
+            text,
+        )
+
+    # Normalize dashes
+    text = text.replace("–", "-").replace("—", "-")
+
+    # Normalize smart quotes and ellipsis
+    text = text.translate({
+        ord("“"): '"',
+        ord("”"): '"',
+        ord("‘"): "'",
+        ord("’"): "'",
+        ord("…"): "...",
+    })
+
+    return text
+
+
+def build_text(mb: float) -> str:
+    corpus = "\n".join(p.read_text(encoding="utf-8") for p in sorted(RECIPES_DIR.glob("*.qmd")))
+    target = int(mb * 1024 * 1024)
+    return (corpus * (target // len(corpus.encode("utf-8")) + 1))[:target]
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the Quarto text normalizer")
+    p.add_argument("--mb", type=float, default=8.0, help="Size of the benchmark text in MiB (default: 8)")
+    p.add_argument("--repeat", type=int, default=5, help="Runs per implementation; best is reported (default: 5)")
+    p.add_argument("--chunk", type=int, default=800, help="Chunk size for the per-chunk run (default: 800)")
+    args = p.parse_args()
+
+    text = build_text(args.mb)
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    chunks = [text[i:i + args.chunk] for i in range(0, len(text), args.chunk)]
+    assert normalize_text_for_pdf(text) == normalize_text_multipass(text), "outputs differ"
+
+    print(f"{size_mb:.1f} MiB of recipe text, {len(chunks)} chunks of {args.chunk} chars, best of {args.repeat}")
+    results = {}
+    for name, fn in (("multi-pass", normalize_text_multipass), ("compiled", normalize_text_for_pdf)):
+        whole = best_of(lambda: fn(text), args.repeat)
+        per_chunk = best_of(lambda: [fn(c) for c in chunks], args.repeat)
+        results[name] = (whole, per_chunk)
+        print(
+            f"  {name:<12} whole text {whole * 1000:8.1f} ms ({size_mb / whole:7.1f} MiB/s)   "
+            f"per chunk {per_chunk / len(chunks) * 1e6:6.2f} µs ({size_mb / per_chunk:7.1f} MiB/s)"
+        )
+    (old_w, old_c), (new_w, new_c) = results["multi-pass"], results["compiled"]
+    print(f"  speed-up: {old_w / new_w:.1f}x whole text, {old_c / new_c:.1f}x per chunk")
+
+
+if __name__ == "__main__":
+    main()
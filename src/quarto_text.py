@@ -0,0 +1,145 @@
+"""
+Quarto source helpers shared by the PDF render script and the direct .qmd
+loader used for ingestion (local_vector_store/qmd_loader.py):
+
+- split_front_matter(): separate the YAML front matter from the body
+- parse_front_matter(): the front matter as a dict
+- normalize_text_for_pdf(): ASCII-friendly fractions, dashes, spaces, quotes
+"""
+
+import re
+
+YAML_RE = re.compile(r"^---\s*\n(.*?)\n---\s*\n?", re.DOTALL)
+
+def split_front_matter(text: str):
+    """Return (yaml_text, body_text). If no YAML is found, yaml_text=''."""
+    m = YAML_RE.match(text)
+    if not m:
+        return "", text
+    yaml_text = m.group(1)
+    body_text = text[m.end():]
+    return yaml_text, body_text
+
+def parse_front_matter(yaml_text: str) -> dict:
+    """YAML front matter as a dict ({} if empty or not a mapping)."""
+    import yaml  # only the loader needs it, not the render script
+
+    data = yaml.safe_load(yaml_text) if yaml_text.strip() else None
+    return data if isinstance(data, dict) else {}
+
+# --- Normalization rules for PDF text extraction ---
+# Standalone ASCII replacements for vulgar fractions
+_VULGAR_TO_ASCII = {
+    "¼": "1/4",
+    "½": "1/2",
+    "¾": "3/4",
+    "⅐": "1/7",
+    "⅑": "1/9",
+    "⅒": "1/10",
+    "⅓": "1/3",
+    "⅔": "2/3",
+    "⅕": "1/5",
+    "⅖": "2/5",
+    "⅗": "3/5",
+    "⅘": "4/5",
+    "⅙": "1/6",
+    "⅚": "5/6",
+    "⅛": "1/8",
+    "⅜": "3/8",
+    "⅝": "5/8",
+    "⅞": "7/8",
+}
+
+# When a vulgar fraction directly follows an integer, convert to decimal part
+# Use readable decimals; exact where finite, otherwise common rounded approximations.
+_VULGAR_TO_DECIMAL_PART = {
+    "¼": ".25",
+    "½": ".5",
+    "¾": ".75",
+    "⅐": ".14",   # ~.142857
+    "⅑": ".11",   # ~.111...
+    "⅒": ".1",
+    "⅓": ".33",
+    "⅔": ".67",
+    "⅕": ".2",
+    "⅖": ".4",
+    "⅗": ".6",
+    "⅘": ".8",
+    "⅙": ".17",
+    "⅚": ".83",
+    "⅛": ".125",
+    "⅜": ".375",
+    "⅝": ".625",
+    "⅞": ".875",
+}
+
+_VFRACS_CLASS = "".join(map(re.escape, _VULGAR_TO_ASCII.keys()))
+
+# --- Compiled engine ---
+# Every per-character rule (spaces, zero-widths, fraction slash, standalone
+# fractions, dashes, quotes, ellipsis) in one table, applied by one
+# character-class regex. (str.translate with a dict table falls off its
+# ASCII fast path on recipe text, which is never pure ASCII, and ends up
+# several times slower.)
+_ZERO_WIDTH = "\u200B\uFEFF"  # zero-width space, BOM / zero-width no-break space
+_CHAR_RULES = {
+    "\u00A0": " ",  # NBSP
+    "\u202F": " ",  # narrow NBSP
+    "\u2009": " ",  # thin space
+    "\u200A": " ",  # hair space
+    **{c: "" for c in _ZERO_WIDTH},
+    "\u2044": "/",  # fraction slash
+    **_VULGAR_TO_ASCII,
+    "–": "-",
+    "—": "-",
+    "“": '"',
+    "”": '"',
+    "‘": "'",
+    "’": "'",
+    "…": "...",
+}
+_RE_CHAR_RULES = re.compile("[" + "".join(map(re.escape, _CHAR_RULES)) + "]")
+_RE_VFRAC = re.compile(rf"[{_VFRACS_CLASS}]")
+
+def _char_rule(m: re.Match) -> str:
+    return _CHAR_RULES[m.group()]
+
+def _int_vfrac_to_decimal(text: str) -> str:
+    """
+    Integer + vulgar fraction → decimal, anchored on the (rare) fractions:
+    from each one, skip back over whitespace/zero-widths and check for a
+    digit. Same result as an integer + fraction regex after zero-width
+    removal, without trying a match at every digit in the text.
+    """
+    out, last = [], 0
+    for m in _RE_VFRAC.finditer(text):
+        end = m.start()
+        while end > last and (text[end - 1].isspace() or text[end - 1] in _ZERO_WIDTH):
+            end -= 1
+        if end > last and text[end - 1].isdecimal():
+            out.append(text[last:end])
+            out.append(_VULGAR_TO_DECIMAL_PART[m.group()])
+            last = m.end()
+    if not out:
+        return text
+    out.append(text[last:])
+    return "".join(out)
+
+def normalize_text_for_pdf(text: str) -> str:
+    """
+    Normalize text to ASCII-friendly forms for robust PDF text extraction:
+    - integer + vulgar fraction → decimal (3½ → 3.5)
+    - standalone vulgar fraction → ASCII (½ → 1/2)
+    - fraction slash: ⁄ → /
+    - dashes: –, — → -
+    - NBSP/narrow NBSP → space; remove zero-width characters
+    - smart quotes → straight; ellipsis → ...
+
+    Rules are compiled once at import: one scan for integer + fraction, one
+    regex pass for all per-character rules. Output is identical to the
+    original rule-by-rule normalize_text_multipass() kept in
+    bench_quarto_text.py (see test_quarto_text.py).
+    """
+    if not text:
+        return text
+    return _RE_CHAR_RULES.sub(_char_rule, _int_vfrac_to_decimal(text))
@@ -0,0 +1,72 @@
+"""Golden-output tests for the Quarto text helpers."""
+
+import pathlib
+import random
+
+import pytest
+
+from bench_quarto_text import normalize_text_multipass
+from quarto_text import (
+    _VULGAR_TO_ASCII,
+    normalize_text_for_pdf,
+    parse_front_matter,
+    split_front_matter,
+)
+
+RECIPES = sorted((pathlib.Path(__file__).resolve().parents[1] / "quarto" / "recipes").glob("*.qmd"))
+
+GOLDEN = [
+    ("1¼ cups", "1.25 cups"),
+    ("3 ½ tsp", "3.5 tsp"),
+    ("2 ⅓ cup", "2.33 cup"),
+    ("1​½", "1.5"),
+    ("10\n¾", "10.75"),
+    ("½ teaspoon", "1/2 teaspoon"),
+    ("a ⅞ b ⅐", "a 7/8 b 1/7"),
+    ("1⁄2 cup", "1/2 cup"),
+    ("40–50 minutes — or so", "40-50 minutes - or so"),
+    ("“Quoted” and ‘single’ isn’t…", "\"Quoted\" and 'single' isn't..."),
+    ("a b c d e", "a b c d e"),
+    ("zero​width﻿", "zerowidth"),
+    ("2½–3 hours", "2.5-3 hours"),
+    ("400°", "400°"),
+    ("plain ASCII 123", "plain ASCII 123"),
+]
+
+
+@pytest.mark.parametrize("text,expected", GOLDEN, ids=[g[0] for g in GOLDEN])
+def test_golden(text, expected):
+    assert normalize_text_for_pdf(text) == expected
+    assert normalize_text_multipass(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", None])
+def test_empty_passthrough(text):
+    assert normalize_text_for_pdf(text) == text
+
+
+@pytest.mark.parametrize("path", RECIPES, ids=lambda p: p.name)
+def test_recipes_match_multipass(path):
+    raw = path.read_text(encoding="utf-8")
+    assert normalize_text_for_pdf(raw) == normalize_text_multipass(raw)
+
+
+def test_random_strings_match_multipass():
+    alphabet = (
+        list("0123456789 ab.\n\t")
+        + list(_VULGAR_TO_ASCII)
+        + [" ", " ", " ", " ", "​", "﻿", "⁄"]
+        + ["–", "—", "“", "”", "‘", "’", "…", "٣"]
+    )
+    rng = random.Random(0)
+    for _ in range(20000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 16)))
+        assert normalize_text_for_pdf(text) == normalize_text_multipass(text), repr(text)
+
+
+def test_front_matter():
+    yaml_text, body = split_front_matter("---\ntitle: Cake\nservings: 8\n---\n## Blurb\n")
+    assert body == "## Blurb\n"
+    assert parse_front_matter(yaml_text) == {"title": "Cake", "servings": 8}
+    assert split_front_matter("no front matter") == ("", "no front matter")
+    assert parse_front_matter("") == {}